@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import messagebox
-from core.hint_evaluator import HintEvaluator
+from core.rules_engine import RulesEngine
+from utils.debug_utils import debug_log
+from utils.perf_monitor import PerfMonitor
 
 
 class PhaseHandler:
@@ -9,15 +11,24 @@ class PhaseHandler:
 
     役割：
     - プレイヤーがマスをクリックしたときに、現在フェーズに応じた処理を分岐する
-    - 探索や質問などのロジックの実行とUIの更新
-    - ターンの進行、勝利判定、探索アニメーションの制御
+    - ルール判定（質問・探索・配置・勝利判定）は RulesEngine に任せ、その結果をUIに反映する
+    - 質問相手の選択ダイアログ、探索アニメーションの制御
+    - 受理された操作ごとに GameEngine の取り消し履歴を積み、取り消し／やり直しを画面に反映する
 
     構成：
     - engine: ゲームの状態やプレイヤー情報を持つ GameEngine インスタンス
     - canvas: 描画領域（BoardRendererと連携）
     - renderer: ボード描画用の描画補助オブジェクト
+    - rules: 画面に依存しないルールエンジン（RulesEngine）
     """
 
+    # 受理されなかった操作の理由 → (種類, タイトル, 本文)
+    REJECTION_MESSAGES = {
+        RulesEngine.REASON_CUBE_PRESENT: ("info", "無効", "既にキューブが置かれているため選択できません"),
+        RulesEngine.REASON_HINT_MISMATCH: ("warning", "探索不可", "自分のヒントに合致しないマスは探索できません"),
+        RulesEngine.REASON_HINT_MATCHES: ("info", "配置不可", "ヒントに合致するマスにはキューブを置けません"),
+    }
+
     def __init__(self, engine, canvas, root, turn_label,
                  terrain_imgs, radius, rows, cols, renderer, update_labels=None):
         self.engine = engine                # ゲーム状態管理エンジン
@@ -34,6 +45,9 @@ class PhaseHandler:
         self.enable_buttons = None  # ボタン有効化関数（main.pyから注入）
         self.disable_buttons = None  # ボタン無効化関数
         self.search_active = False  # 探索中フラグ
+        self.history_changed = None  # 取り消し／やり直しの可否が変わったときの通知（main.pyから注入）
+        self.perf = PerfMonitor()  # 性能計測（main.py から有効なものを注入）
+        self.rules = RulesEngine(engine)  # ルール判定・状態遷移
 
     def handle_click(self, coord):
         """
@@ -45,47 +59,44 @@ class PhaseHandler:
 
         # ✅ 探索中は無視（クリック連打による多重探索防止）
         if self.search_active:
-            print("[DEBUG] 探索中 → クリック無効")
+            debug_log("探索中 → クリック無効")
             return
 
         # 無効なフェーズや選択処理中なら無視
         if state.current_action not in {"question", "search", "place_cube", "place_disc"}:
-            print(f"[DEBUG] 無効フェーズ: {state.current_action}")
+            debug_log(f"無効フェーズ: {state.current_action}")
             return
 
         if not self.engine.board.is_valid_coord(coord) or self.pending_dialog:
             return
 
-        cell = self.engine.board.get_tile(coord)
-
-        # キューブが既に置かれていたら探索／質問不可
-        if cell.get("cube"):
-            messagebox.showinfo("無効", "既にキューブが置かれているため選択できません")
-            return
-
         current = self.engine.current_player()
         action = state.current_action
 
-        # 現在のフェーズに応じて分岐
+        # 現在のフェーズに応じて分岐（判定・配置は RulesEngine が行う）
         if action == "question":
-            self._start_question(current, cell, coord)
+            self._start_question(current, coord)
         elif action == "place_disc":
-            self._place_disc(current, cell, coord)
+            self._show_result(self._apply(self.rules.place_disc, coord, step=True))
         elif action == "search":
-            self._start_search(current, cell, coord)
+            self._show_result(self._apply(self.rules.search, coord, step=True))
         elif action == "place_cube":
-            self._place_cube(current, cell, coord)
+            self._show_result(self._apply(self.rules.place_cube, coord))
 
-    def _start_question(self, current, cell, coord):
+    def _start_question(self, current, coord):
         """
         質問フェーズ：対象プレイヤーを選ぶためのダイアログ表示
         """
-        self._show_player_selector(current, cell, coord)
+        # キューブが既に置かれていたら質問不可（相手を選ぶ前に知らせる）
+        if self.engine.board.cube_at(coord) is not None:
+            self._show_rejection(RulesEngine.REASON_CUBE_PRESENT)
+            return
+        self._show_player_selector(current, coord)
 
-    def _show_player_selector(self, current, cell, coord):
+    def _show_player_selector(self, current, coord):
         """
         質問対象を選ぶUIポップアップ。
-        選択すると _evaluate_question() に渡して処理を継続。
+        選択すると RulesEngine.question() で判定して結果を表示する。
         """
         if self.disable_buttons:
             self.disable_buttons()
@@ -120,131 +131,128 @@ class PhaseHandler:
             label = selected.get()
             pid = next(k for k, v in self.engine.label_map.items()
                        if v == label)
-            target = self.engine.get_player_by_id(pid)
             if self.enable_buttons:
                 self.enable_buttons()
 
             selector.destroy()
             self.pending_dialog = None
-            self._evaluate_question(current, target, cell, coord)
+            self._show_result(self._apply(self.rules.question, current.id, pid, coord))
 
         selector.protocol("WM_DELETE_WINDOW", cancel)
         tk.Button(selector, text="決定", command=confirm).pack(pady=5)
 
-    def _evaluate_question(self, asker, target, cell, coord):
-        """
-        選ばれたプレイヤーのヒントが対象マスに適用されるか判定する。
-        - 合致すればディスク配置
-        - 不一致ならキューブ配置 → 質問者が自分のキューブを配置するフェーズへ移行
-        """
-        applies = HintEvaluator.hint_applies(
-            cell, target.hint, self.engine.board.tiles)
-
-        if applies:
-            self.engine.board.place_disc(coord, target.id)
-            target.add_disc()
-            self.engine.state.log(
-                f"{asker.display_name} → {target.display_name}: 合致 → ディスク")
-            self._advance_turn()
-        else:
-            self.engine.board.place_cube(coord, target.id)
-            target.add_cube()
-            self.engine.state.current_action = "place_cube"
-            self.engine.state.exploration_target = coord
-            self.update_turn_label()
-            self.engine.state.log(
-                f"{asker.display_name} → {target.display_name}: 非合致 → キューブ配置へ")
-
-            if self.disable_buttons:
-                self.disable_buttons()
-
-        self.renderer.render(self.engine.board.tiles, self.rows, self.cols)
-
-    def _place_disc(self, current, cell, coord):
-        """
-        探索中で既に対象マスにディスクが置かれていた場合、別マスに再配置する処理。
-        """
-        success = self.engine.board.place_disc(coord, current.id)
-        if success:
-            current.add_disc()
-            self.engine.state.log(f"{current.display_name}: 再配置 → {coord}")
-
-            target = self.engine.state.exploration_target
-            responder_ids = [current.id] + self._player_order_from(current.id)
-            self._animate_exploration(target, responder_ids)
+    def _apply(self, operation, *args, **kwargs):
+        """RulesEngine の操作を実行し、受理されたら直前の控えを取り消し履歴に積む"""
+        snapshot = self.engine.snapshot()
+        result = operation(*args, **kwargs)
+        if result.ok:
+            self.engine.commit(snapshot)
+            self._notify_history()
+        return result
+
+    def can_undo(self):
+        """取り消しできるか（探索アニメーション中・相手選択中は不可）"""
+        return bool(self.engine.undo_stack) and not self.search_active and not self.pending_dialog
+
+    def can_redo(self):
+        """やり直しできるか"""
+        return bool(self.engine.redo_stack) and not self.search_active and not self.pending_dialog
+
+    def undo(self):
+        """直前の操作を取り消して画面を戻す（誤クリックの訂正用）"""
+        if self.can_undo() and self.engine.undo():
+            self._refresh_after_history()
+
+    def redo(self):
+        """取り消した操作をやり直して画面を進める"""
+        if self.can_redo() and self.engine.redo():
+            self._refresh_after_history()
+
+    def _refresh_after_history(self):
+        """取り消し／やり直しの後に、ラベル・盤面・ボタンを現在の状態に合わせる"""
+        if self.update_labels:
+            self.update_labels()
+        self.update_turn_label()
+        self._render_board()
 
-    def _place_cube(self, current, cell, coord):
-        """
-        プレイヤーが自分のキューブを置く処理（質問の不一致時や探索失敗時）
-        """
-        if HintEvaluator.hint_applies(cell, current.hint, self.engine.board.tiles):
-            messagebox.showinfo("配置不可", "ヒントに合致するマスにはキューブを置けません")
-            return
+        # 追加の配置待ち・決着済みなら行動選択ボタンは使えない
+        state = self.engine.state
+        waiting = state.current_action in ("place_disc", "place_cube") or state.phase == "end"
+        toggle = self.disable_buttons if waiting else self.enable_buttons
+        if toggle:
+            toggle()
+        self._notify_history()
 
-        self.engine.board.place_cube(coord, current.id)
-        current.add_cube()
-        self._advance_turn()
+    def _notify_history(self):
+        if self.history_changed:
+            self.history_changed()
 
-    def _start_search(self, current, cell, coord):
+    def _show_result(self, result):
         """
-        探索フェーズ：探索者が対象マスにディスクを配置し、他プレイヤーが順に反応
+        RulesEngine の操作結果を画面に反映する。
+        - 不受理 → 理由に応じたメッセージ
+        - 探索の判定中 → アニメーション開始
+        - 勝利 → 勝利表示
+        - 追加の配置（ディスク再配置／キューブ配置）待ち → ボタンを無効化して案内表示
+        - 手番終了 → 次のプレイヤーの表示へ
         """
-        # ✅ 多重探索防止
-        if self.search_active:
-            print("[DEBUG] 探索アニメーション中 → 探索不可")
-            return
-
-        if cell.get("cube"):
-            messagebox.showwarning("無効", "既にキューブがあるため探索できません")
+        if not result.ok:
+            self._show_rejection(result.reason)
             return
 
-        if not HintEvaluator.hint_applies(cell, current.hint, self.engine.board.tiles):
-            messagebox.showwarning("探索不可", "自分のヒントに合致しないマスは探索できません")
-            return
-
-        if current.id in cell.get("discs", []):
-            self.engine.state.current_action = "place_disc"
-            self.engine.state.exploration_target = coord
+        if result.exploring:
+            # ✅ 探索開始 → フラグON
+            self.search_active = True
+            if self.disable_buttons:
+                self.disable_buttons()
+            self._notify_history()
+            self._animate_exploration()
+        elif result.winner is not None:
+            winner = self.engine.id_to_player[result.winner]
+            self.turn_label.config(text="探索成功！", fg=winner.color)
+            self._render_board()
+            if self.enable_buttons:
+                self.enable_buttons()
+            messagebox.showinfo("勝利！", f"{winner.display_name} の勝利！")
+        elif result.action in ("place_disc", "place_cube"):
             self.update_turn_label()
-            self.engine.state.log(f"{current.display_name}: 既にディスク済 → 再配置")
-
+            self._render_board()
             if self.disable_buttons:
                 self.disable_buttons()
-            return
-
-        # ✅ 探索開始 → フラグON
-        self.search_active = True
-
-        # 探索者のディスク配置
-        self.engine.board.place_disc(coord, current.id)
-        current.add_disc()
-        self.engine.state.log(f"{current.display_name}: 探索対象にディスク配置")
-
-        if self.disable_buttons:
-            self.disable_buttons()
+        else:
+            self._advance_turn()
 
-        # 探索順のプレイヤー並び（探索者 → 左隣から順）
-        responder_ids = [current.id] + self._player_order_from(current.id)
-        self._animate_exploration(coord, responder_ids)
+    def _show_rejection(self, reason):
+        """受理されなかった操作の理由を表示（表示文言の無い理由はデバッグ出力のみ）"""
+        message = PhaseHandler.REJECTION_MESSAGES.get(reason)
+        if message is None:
+            debug_log(f"操作不可: {reason}")
+            return
+        kind, title, text = message
+        if kind == "warning":
+            messagebox.showwarning(title, text)
+        else:
+            messagebox.showinfo(title, text)
 
     def _advance_turn(self):
         """
-        ターンを次のプレイヤーに進める。
-        - 現アクションを解除し、表示や描画も更新
+        ターンが次のプレイヤーに進んだ後の表示更新（状態は RulesEngine が進める）
         """
-        self.engine.next_turn()
-        self.engine.state.current_action = None
-        self.engine.state.set_phase("active")
-
         if self.update_labels:
             self.update_labels()
 
         self.update_turn_label()
-        self.renderer.render(self.engine.board.tiles, self.rows, self.cols)
+        self._render_board()
 
         if self.enable_buttons:
             self.enable_buttons()
 
+    def _render_board(self):
+        """トークンが変化したセルだけを再描画する"""
+        board = self.engine.board
+        self.renderer.render(board.tiles, self.rows, self.cols,
+                             dirty=board.take_dirty())
+
     def update_turn_label(self):
         """
         ターン表示ラベルを現在のプレイヤーとアクションに応じて更新する。
@@ -263,76 +271,26 @@ class PhaseHandler:
         label_text = f"{label} - {phase_map.get(action, '行動を選択してください')}"
         self.turn_label.config(text=label_text, fg=color)
 
-    def _player_order_from(self, start_pid):
-        """
-        探索時の順番：
-        - 探索者を起点に、左隣のプレイヤーから時計回りで並べる
-        """
-        order = self.engine.state.players
-        idx = order.index(start_pid)
-        return order[idx + 1:] + order[:idx]
-
-    def _animate_exploration(self, coord, responder_ids):
+    def _animate_exploration(self):
         """
         探索アニメーション処理：
-        - responder_ids の順にヒント判定を行い、対応するディスク／キューブを配置
-        - 誰かが非合致（キューブ）なら探索終了
-        - 全員が合致（ディスク）なら勝利処理に移行
+        - RulesEngine.reveal_next() で判定を1人ずつ進め、そのたびに盤面を描き直す
+        - 誰かが非合致（キューブ）なら探索終了、全員が合致（ディスク）なら勝利
         """
         interval_ms = 1000
-        board = self.engine.board
-        tiles = board.tiles
-        state = self.engine.state
-
-        def step(index):
-            if index >= len(responder_ids):
-                # ✅ 全員合致 → 勝利
-                current = self.engine.current_player()
-                state.set_phase("end")
-                state.current_action = None
-                self.turn_label.config(text="探索成功！", fg=current.color)
-                self.renderer.render(board.tiles, self.rows, self.cols)
-
-                # ✅ 探索完了 → フラグ解除
-                self.search_active = False
-
-                if self.enable_buttons:
-                    self.enable_buttons()
-                messagebox.showinfo("勝利！", f"{current.display_name} の勝利！")
-                return
 
-            pid = responder_ids[index]
-            player = self.engine.id_to_player[pid]
-            cell = tiles[coord]
-
-            if pid in cell.get("discs", []):
-                # 既にディスクがある → パス
-                state.log(f"{player.display_name}: 既にディスク済 → パス")
-            elif HintEvaluator.hint_applies(cell, player.hint, tiles):
-                board.place_disc(coord, pid)
-                player.add_disc()
-                state.log(f"{player.display_name}: 合致 → ディスク配置")
-            else:
-                # 非合致 → 探索失敗（キューブ配置へ）
-                board.place_cube(coord, pid)
-                player.add_cube()
-                state.log(f"{player.display_name}: 非合致 → キューブ配置 → 探索終了")
-
-                if self.disable_buttons:
-                    self.disable_buttons()
-
-                # ✅ 探索失敗 → フラグ解除
-                self.search_active = False
-
-                # 🔁 探索者がキューブを別マスに配置するフェーズへ
-                state.current_action = "place_cube"
-                state.exploration_target = coord
-                self.update_turn_label()
-                self.renderer.render(board.tiles, self.rows, self.cols)
+        def step():
+            with self.perf.timed("exploration_step"):
+                result = self.rules.reveal_next()
+            if result.exploring:
+                # 次のプレイヤーへ進行
+                self._render_board()
+                self.root.after(interval_ms, step)
                 return
 
-            # 次のプレイヤーへ進行
-            self.renderer.render(board.tiles, self.rows, self.cols)
-            self.root.after(interval_ms, lambda: step(index + 1))
+            # ✅ 探索完了 → フラグ解除
+            self.search_active = False
+            self._notify_history()
+            self._show_result(result)
 
-        step(0)
+        step()
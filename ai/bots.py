@@ -0,0 +1,150 @@
+from ai.recommender import InfoGainRecommender
+from core.game_state import GameState
+from core.zobrist import TranspositionTable
+
+
+class RandomBot:
+    """
+    合法手の中から一様ランダムに行動するボット（シミュレーションの基準用）。
+
+    - 質問・探索は自分のヒントに合致し、キューブの無いマスから選ぶ
+    - search_rate の確率で探索、それ以外は他プレイヤーへの質問
+    - choose() は (操作名, 引数...) のタプルを返し、実行は呼び出し側（シミュレータ）が行う
+    - 判断に使うのは盤面の公開情報（トークン）と自分のヒントだけ
+    """
+
+    name = "random"
+    uses_deduction = False  # True なら生成時に deduction（HintDeduction）を渡す
+
+    def __init__(self, player_id, rng, search_rate=0.3):
+        self.player_id = player_id
+        self.rng = rng
+        self.search_rate = search_rate
+
+    def choose(self, rules):
+        """
+        現在求められている操作を1つ選ぶ。
+        Returns:
+            ("question", target_id, coord) / ("search", coord) /
+            ("place_disc", coord) / ("place_cube", coord)
+        """
+        action = rules.legal_actions(self.player_id)[0]
+        if action == GameState.ACTION_PLACE_CUBE:
+            return action, self.choose_cube(rules)
+        if action == GameState.ACTION_PLACE_DISC:
+            return action, self.rng.choice(self._disc_cells(rules))
+        return self.choose_turn(rules)
+
+    def choose_turn(self, rules):
+        """手番の行動（質問 or 探索）を選ぶ"""
+        coord = self.rng.choice(self._candidate_cells(rules))
+        if self.rng.random() < self.search_rate:
+            return GameState.ACTION_SEARCH, coord
+        return GameState.ACTION_QUESTION, self.rng.choice(self._others(rules)), coord
+
+    def choose_cube(self, rules):
+        """キューブを置くマス（自分のヒントに合致せずキューブの無いマス）を選ぶ"""
+        return self.rng.choice(rules.answers.cube_cells(self.player_id, rules.board))
+
+    # ------------------------------------------------------------
+    # 補助
+    # ------------------------------------------------------------
+
+    def _player(self, rules):
+        return rules.engine.id_to_player[self.player_id]
+
+    def _others(self, rules):
+        return [pid for pid in rules.state.players if pid != self.player_id]
+
+    def _candidate_cells(self, rules):
+        """自分のヒントに合致し、キューブの無いマス（正解の可能性が残っているマス）"""
+        board = rules.board
+        return board.hint_index.coords_in(rules.answers.row(self.player_id) & ~board.cube_mask)
+
+    def _disc_cells(self, rules):
+        """ディスクを再配置できるマス（候補マスのうち自分のディスクが無いマス）"""
+        board = rules.board
+        return board.hint_index.coords_in(rules.answers.disc_mask(self.player_id, board))
+
+
+class HeuristicBot(RandomBot):
+    """
+    盤面のトークンから候補を絞り込むボット。
+
+    - 候補マスごとに「ディスクを置いている他プレイヤー数」を数え、最も多いマスに注目する
+    - 他プレイヤー全員のディスクが揃ったマスがあれば探索する
+    - そうでなければ、注目マスにまだディスクを置いていないプレイヤーに質問する
+    - 候補が search_threshold 個以下に絞れていれば、質問より探索を優先する
+    """
+
+    name = "heuristic"
+
+    def __init__(self, player_id, rng, search_threshold=2):
+        super().__init__(player_id, rng)
+        self.search_threshold = search_threshold
+
+    def choose_turn(self, rules):
+        board = rules.board
+        others = self._others(rules)
+        candidates = self._candidate_cells(rules)
+
+        def support(coord):
+            return sum(1 for pid in others if board.has_disc(coord, pid))
+
+        best = max(support(coord) for coord in candidates)
+        focus = [coord for coord in candidates if support(coord) == best]
+        coord = self.rng.choice(focus)
+
+        if best == len(others) or len(candidates) <= self.search_threshold:
+            return GameState.ACTION_SEARCH, coord
+
+        targets = [pid for pid in others if not board.has_disc(coord, pid)]
+        return GameState.ACTION_QUESTION, self.rng.choice(targets), coord
+
+
+class InfoGainBot(RandomBot):
+    """
+    InfoGainRecommender の最善手（正解候補マスのエントロピーを最も減らす質問／探索）を選ぶボット。
+    推理には盤面に登録済みの HintDeduction を使う。
+
+    - 推理状態はトークン配置だけで決まるので、選んだ手を局面ハッシュ（GameEngine.position_hash）を
+      キーに TranspositionTable へ登録し、手順が違っても同じ局面に来たら読み直さずに使う
+    """
+
+    name = "infogain"
+    uses_deduction = True
+
+    def __init__(self, player_id, rng, deduction=None, plies=1, time_budget=0.2, table=None):
+        """
+        table: 局面ハッシュ → 選んだ手の TranspositionTable（省略時はボットごとに新規作成）
+        """
+        super().__init__(player_id, rng)
+        if deduction is None:
+            raise ValueError("InfoGainBot には deduction（HintDeduction）が必要です")
+        self.deduction = deduction
+        self.plies = plies
+        self.time_budget = time_budget
+        self.table = table if table is not None else TranspositionTable(max_entries=1024)
+
+    def choose_turn(self, rules):
+        key = rules.engine.position_hash()
+        move = self.table.get(key)
+        if move is not None:
+            return move
+
+        recommender = InfoGainRecommender(
+            self.deduction, rules.board, self.player_id, self._player(rules).hint,
+            rules.state.players, plies=self.plies, time_budget=self.time_budget)
+        best = recommender.best()
+        if best is None:
+            return super().choose_turn(rules)
+        if best.action == GameState.ACTION_SEARCH:
+            move = GameState.ACTION_SEARCH, best.coord
+        else:
+            move = GameState.ACTION_QUESTION, best.target, best.coord
+        self.table.put(key, move)
+        return move
+
+
+# ボット名 → クラス（シミュレータの --bots 指定用）
+BOTS = {bot.name: bot for bot in (RandomBot, HeuristicBot, InfoGainBot)}
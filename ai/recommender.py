@@ -0,0 +1,251 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.game_state import GameState
+
+
+class Recommendation:
+    """推薦された行動1件（score: 正解候補マスのエントロピーの期待減少量［ビット］）"""
+
+    def __init__(self, action, coord, target=None, score=0.0, win_prob=0.0):
+        self.action = action      # "question" / "search"
+        self.coord = coord
+        self.target = target      # 質問相手のプレイヤーID（探索なら None）
+        self.score = score
+        self.win_prob = win_prob  # 探索でそのまま勝利する確率の見積もり
+
+    def __repr__(self):
+        target = f", target={self.target}" if self.target else ""
+        return (f"Recommendation({self.action}, {self.coord}{target}, "
+                f"score={self.score:.3f}, win_prob={self.win_prob:.3f})")
+
+
+class _Timeout(Exception):
+    """時間切れで探索を打ち切るための内部例外"""
+
+
+class InfoGainRecommender:
+    """
+    手番プレイヤー視点で、合法な質問 (マス, 相手) と探索 (マス) を
+    「正解候補マスのエントロピーの期待減少量」で順位付けする推薦エンジン。
+
+    - 推理状態は HintDeduction のヒント候補（ビットセット）を構築時にコピーして使う
+      （自分のヒントは既知として1つに固定する）。盤面はそれ以降参照しないので別スレッドで実行できる
+    - 各ヒント候補は等確率、正解候補マスも等確率とみなし、エントロピーは log2(候補マス数)
+    - 質問：相手のヒントが成り立つ確率で「ディスク」「キューブ」の2通りに分岐
+    - 探索：左隣から順に判定し、最初に成り立たなかった人で止まる分岐と、全員成り立つ（勝利）分岐
+    - plies > 1 なら各分岐の後の自分の最善手も（上位 beam_width 手に絞って）読む
+    - 同じ推理状態の評価はメモ化し、time_budget 秒を超えたら読み終えた深さの結果を返す
+    """
+
+    def __init__(self, deduction, board, player_id, own_hint, turn_order,
+                 plies=1, beam_width=8, time_budget=0.5):
+        self.player_id = player_id
+        self.plies = plies
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+
+        self.hint_masks = deduction.hint_masks
+        self.hints_true = deduction.hints_true
+        self.index = deduction.index
+        self.bit_of = deduction.index.bit_of
+        self._cover_memo = {}   # ヒント候補のビットセット → 合致セルのマスク
+        self._answer_memo = {}  # 推理状態 → 正解候補マスの数
+        self._value_memo = {}   # (推理状態, 深さ) → 最善の期待減少量
+        self._deadline = None
+
+        # 自分を除く判定順（探索時に左隣から判定する順）
+        idx = turn_order.index(player_id)
+        self.others = turn_order[idx + 1:] + turn_order[:idx]
+
+        # 推理状態（自分のヒントは既知）
+        own_bit = deduction.hint_bit(own_hint) & deduction.candidates[player_id]
+        candidates = dict(deduction.candidates)
+        candidates[player_id] = own_bit or deduction.candidates[player_id]
+        self.players = [player_id] + self.others
+        self.root_state = tuple(candidates[pid] for pid in self.players)
+
+        # 合法手の対象マス（キューブの無いマス）と、探索可能なマス（さらに自分のヒントに合致）
+        own_mask = self._cover(candidates[player_id])
+        self.free_cells = self.index.coords_in(self.index.full_mask & ~board.cube_mask)
+        self.search_cells = [coord for coord in self.free_cells
+                             if (own_mask >> self.bit_of[coord]) & 1]
+
+    @classmethod
+    def for_current_player(cls, engine, deduction, **options):
+        """手番プレイヤー視点の推薦エンジンを作る"""
+        player = engine.current_player()
+        return cls(deduction, engine.board, player.id, player.hint, engine.state.players,
+                   **options)
+
+    # ------------------------------------------------------------
+    # 推薦
+    # ------------------------------------------------------------
+
+    def rank(self, top_n=None):
+        """
+        合法な質問・探索を期待エントロピー減少量の大きい順に並べて返す。
+        読みの深さは1手から plies まで順に深め、時間切れなら直前の深さの結果を返す。
+        """
+        self._deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+        ranking = self._rank_at(self.root_state, 1, guard=False)
+        for depth in range(2, self.plies + 1):
+            try:
+                ranking = self._rank_at(self.root_state, depth, guard=True)
+            except _Timeout:
+                break
+        return ranking[:top_n] if top_n else ranking
+
+    def best(self):
+        """最善手（合法手が無ければ None）"""
+        ranking = self.rank(top_n=1)
+        return ranking[0] if ranking else None
+
+    # ------------------------------------------------------------
+    # 評価
+    # ------------------------------------------------------------
+
+    def _rank_at(self, state, depth, guard):
+        """
+        state での各手の評価。全手を1手読みで評価し、depth > 1 なら上位 beam_width 手だけ
+        depth 手先まで読み直す（読み直した手は1手読みの値以上になるので上位に残る）
+        """
+        scored = []
+        for move, outcomes, win_prob in self._moves(state):
+            scored.append([self._expected_gain(state, outcomes, 1, guard), move, outcomes, win_prob])
+        if depth > 1:
+            scored.sort(key=lambda item: -item[0])
+            for item in scored[:self.beam_width]:
+                item[0] = self._expected_gain(state, item[2], depth, guard)
+
+        recommendations = [Recommendation(action, coord, target, score, win_prob)
+                           for score, (action, coord, target), _, win_prob in scored]
+        recommendations.sort(key=lambda r: (-r.score, -r.win_prob, r.coord, r.target or ""))
+        return recommendations
+
+    def _expected_gain(self, state, outcomes, depth, guard):
+        """分岐ごとの (確率, 次の推理状態) からエントロピーの期待減少量を求める"""
+        base = self._entropy(state)
+        gain = 0.0
+        for prob, next_state in outcomes:
+            if prob <= 0:
+                continue
+            gain += prob * (base - self._entropy(next_state))
+            if depth > 1:
+                gain += prob * self._value(next_state, depth - 1, guard)
+        return gain
+
+    def _value(self, state, depth, guard):
+        """state から depth 手の最善の期待減少量（上位 beam_width 手だけ読む）"""
+        if guard and self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _Timeout()
+        key = (state, depth)
+        if key in self._value_memo:
+            return self._value_memo[key]
+        if self._entropy(state) == 0:
+            return 0.0
+
+        scored = [(self._expected_gain(state, outcomes, 1, guard), outcomes)
+                  for _, outcomes, _ in self._moves(state)]
+        scored.sort(key=lambda item: -item[0])
+        best = 0.0
+        for one_ply, outcomes in scored[:self.beam_width]:
+            value = one_ply if depth == 1 else self._expected_gain(state, outcomes, depth, guard)
+            best = max(best, value)
+        self._value_memo[key] = best
+        return best
+
+    def _moves(self, state):
+        """
+        合法手と分岐の一覧 [((action, coord, target), [(確率, 次の状態), ...], 勝利確率), ...]
+        情報の得られない質問（結果が確定している）は除く。
+        """
+        moves = []
+        answer = self._answer(state)
+
+        for coord in self.free_cells:
+            bit = self.bit_of[coord]
+            true_bits = self.hints_true[bit]
+            for i, pid in enumerate(self.others, start=1):
+                p = self._probability(state[i], true_bits)
+                if 0 < p < 1:
+                    outcomes = [(p, self._replace(state, i, state[i] & true_bits)),
+                                (1 - p, self._replace(state, i, state[i] & ~true_bits))]
+                    moves.append(((GameState.ACTION_QUESTION, coord, pid), outcomes, 0.0))
+
+        for coord in self.search_cells:
+            bit = self.bit_of[coord]
+            if not (answer >> bit) & 1:
+                continue  # 正解になり得ないマスの探索は必ず失敗する
+            true_bits = self.hints_true[bit]
+            outcomes = []
+            reach = 1.0        # ここまでの全員が成り立つ確率
+            current = state
+            for i in range(1, len(state)):
+                p = self._probability(current[i], true_bits)
+                if p < 1:
+                    outcomes.append(((1 - p) * reach,
+                                     self._replace(current, i, current[i] & ~true_bits)))
+                reach *= p
+                current = self._replace(current, i, current[i] & true_bits)
+            # 全員が成り立つ → 勝利（正解が確定するのでエントロピー 0 の状態として扱う）
+            outcomes.append((reach, None))
+            moves.append(((GameState.ACTION_SEARCH, coord, None), outcomes, reach))
+        return moves
+
+    @staticmethod
+    def _probability(bits, true_bits):
+        """ヒント候補 bits のうち true_bits に含まれる割合"""
+        total = bin(bits).count("1")
+        return bin(bits & true_bits).count("1") / total if total else 0.0
+
+    @staticmethod
+    def _replace(state, i, bits):
+        return state[:i] + (bits,) + state[i + 1:]
+
+    def _cover(self, bits):
+        """ヒント候補のどれかが成り立つセルのマスク（メモ化）"""
+        mask = self._cover_memo.get(bits)
+        if mask is None:
+            mask = 0
+            rest = bits
+            while rest:
+                low = rest & -rest
+                mask |= self.hint_masks[low.bit_length() - 1]
+                rest ^= low
+            self._cover_memo[bits] = mask
+        return mask
+
+    def _answer(self, state):
+        """推理状態 state での正解候補マスのマスク"""
+        mask = self.index.full_mask
+        for bits in state:
+            mask &= self._cover(bits)
+        return mask
+
+    def _entropy(self, state):
+        """正解候補マスのエントロピー（等確率とみなして log2(候補数)。メモ化）"""
+        if state is None:
+            return 0.0
+        count = self._answer_memo.get(state)
+        if count is None:
+            count = self._answer_memo[state] = bin(self._answer(state)).count("1")
+        return math.log2(count) if count > 1 else 0.0
+
+
+class RecommenderWorker:
+    """
+    推薦の計算を別スレッドで実行する（Tk のメインループを止めないため）。
+    推理状態の取り出しは呼び出し側スレッドで行い、計算だけをワーカーに渡す。
+    """
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recommender")
+
+    def submit(self, recommender, top_n=3):
+        """推薦を開始して Future を返す（結果は Recommendation の一覧）"""
+        return self._pool.submit(recommender.rank, top_n)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
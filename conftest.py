@@ -0,0 +1,67 @@
+"""
+テスト共通のフィクスチャ：CSV から組み立てたローダー、画面なしのゲームの用意、ボットによる対局。
+"""
+
+import os
+
+import pytest
+
+from core.asset_bundle import create_csv_loaders
+from core.game_engine import GameEngine
+from core.rules_engine import RulesEngine
+from utils.debug_utils import set_debug
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+@pytest.fixture(scope="session")
+def loaders():
+    """(MapConfigLoader, HintLoader)（テスト全体で1度だけ構築）"""
+    return create_csv_loaders(ASSETS_DIR)
+
+
+@pytest.fixture
+def new_game(loaders):
+    """new_game(map_id=0, player_count=4)：指定マップ・人数のゲーム（GameEngine, RulesEngine）を作る関数"""
+    map_loader, hint_loader = loaders
+    set_debug(False)
+
+    def factory(map_id=0, player_count=4):
+        players = hint_loader.get_players_for_map(map_id, player_count)
+        template = map_loader.load_template(map_id)  # 同じマップのゲームで共有する
+        engine = GameEngine([p["id"] for p in players], [p["hint"] for p in players], template)
+        engine.state.set_phase("active")
+        return engine, RulesEngine(engine)
+    return factory
+
+
+def _act(rules, choice):
+    """ボットの choose() の結果（操作名, 引数...）を手番プレイヤーの操作として実行する"""
+    name, *args = choice
+    if name == "question":
+        return rules.question(rules.state.current_player, *args)
+    return getattr(rules, name)(*args)
+
+
+def _play(rules, bots, after_step=None):
+    """
+    決着するまでボット（プレイヤーID → ボット）に操作させる。
+    after_step: 各操作の後に呼ぶ検証用の関数
+    """
+    while rules.state.phase != "end":
+        bot = bots[rules.state.current_player]
+        assert _act(rules, bot.choose(rules)).ok
+        if after_step:
+            after_step()
+
+
+@pytest.fixture
+def act():
+    """act(rules, choice)：ボットの選んだ操作を実行して結果を返す関数"""
+    return _act
+
+
+@pytest.fixture
+def play():
+    """play(rules, bots, after_step=None)：決着までボットに対局させる関数"""
+    return _play
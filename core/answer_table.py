@@ -0,0 +1,44 @@
+class AnswerTable:
+    """
+    1ゲーム分の「プレイヤー × セル」の回答表。
+
+    ゲーム中は各プレイヤーのヒントも盤面の地形も変わらないため、ゲーム開始時に
+    全プレイヤーのヒントを HintIndex で一括評価し、プレイヤーごとに「ヒントが成り立つセル」の
+    マスク（セル番号 = HintIndex のビット番号）として保持する。
+    質問・探索・キューブ配置の判定はすべてこの表の1ビット検査で済む。
+    """
+
+    def __init__(self, hint_index, players):
+        self.index = hint_index
+        self.bit_of = hint_index.bit_of
+        self.full_mask = hint_index.full_mask
+        # プレイヤーID → ヒントが成り立つセルのマスク
+        self.masks = {player.id: hint_index.mask_for(player.hint) for player in players}
+
+    def applies(self, player_id, coord):
+        """player のヒントが coord で成り立つか"""
+        bit = self.bit_of.get(coord)
+        return bit is not None and (self.masks[player_id] >> bit) & 1 == 1
+
+    def row(self, player_id):
+        """player の行（ヒントが成り立つセルのマスク）"""
+        return self.masks[player_id]
+
+    def cube_mask(self, player_id, board):
+        """player がキューブを置けるセル（ヒントが成り立たず、キューブの無いセル）のマスク"""
+        return self.full_mask & ~self.masks[player_id] & ~board.cube_mask
+
+    def disc_mask(self, player_id, board):
+        """player がディスクを置けるセル（ヒントが成り立ち、キューブも自分のディスクも無いセル）"""
+        return self.masks[player_id] & ~board.cube_mask & ~board.disc_mask(player_id)
+
+    def cube_cells(self, player_id, board):
+        """player がキューブを置けるセルの座標一覧"""
+        return self.index.coords_in(self.cube_mask(player_id, board))
+
+    def solution_mask(self):
+        """全プレイヤーのヒントが成り立つセル（正解候補）のマスク"""
+        mask = self.full_mask
+        for row in self.masks.values():
+            mask &= row
+        return mask
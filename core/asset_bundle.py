@@ -0,0 +1,115 @@
+"""
+アセットバンドル：assets/ 以下の CSV から組み立てた全データを1つのバイナリファイルにまとめたもの。
+
+- 収録内容：組み立て済みの全マップ（構造物込み）、コンパイル済みヒント、冊子順、
+  (map_id, プレイヤー数) ごとの解決済みヒントセット、マップごとの HintIndex マスク
+- 元 CSV の更新時刻とサイズを記録しておき、1つでも変わっていれば自動で再構築する
+- 最新であれば起動時の読込はバンドルファイル1回で済む
+"""
+
+import os
+import pickle
+
+from core.map_config_loader import MapConfigLoader
+from core.hint_loader import HintLoader
+from core.hint_index import HintIndex
+from core.vectorized_evaluator import VectorizedHintEvaluator, np
+
+BUNDLE_VERSION = 2  # 2: セル情報からトークン（discs / cube）を除いた
+DEFAULT_ASSETS_DIR = "assets"
+DEFAULT_BUNDLE_PATH = os.path.join("assets", ".cache", "assets.bundle")
+
+
+def source_stamps(assets_dir=DEFAULT_ASSETS_DIR):
+    """
+    assets_dir 以下の全 CSV の (更新時刻, サイズ) を相対パスをキーに返す。
+    """
+    stamps = {}
+    for dirpath, dirnames, filenames in os.walk(assets_dir):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]  # .cache 等は対象外
+        for name in filenames:
+            if name.lower().endswith(".csv"):
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                rel = os.path.relpath(path, assets_dir).replace(os.sep, "/")
+                stamps[rel] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def create_csv_loaders(assets_dir=DEFAULT_ASSETS_DIR):
+    """assets_dir 以下の CSV から直接 (MapConfigLoader, HintLoader) を構築する（バンドルを使わない）"""
+    configs_dir = os.path.join(assets_dir, "configs")
+    map_loader = MapConfigLoader(
+        map_csv=os.path.join(configs_dir, "map_config.csv"),
+        blocks_dir=os.path.join(assets_dir, "blocks"),
+        structures_csv=os.path.join(configs_dir, "structures.csv"))
+    hint_loader = HintLoader(
+        generic_hint_csv=os.path.join(configs_dir, "generic_hints.csv"),
+        book_order_csv=os.path.join(configs_dir, "book_orders.csv"),
+        player_hint_csv=os.path.join(configs_dir, "map_player_hints.csv"))
+    return map_loader, hint_loader
+
+
+def build_asset_bundle(assets_dir=DEFAULT_ASSETS_DIR, stamps=None):
+    """
+    CSV を読み込み、全マップの組み立てとヒント索引の構築まで済ませたバンドル dict を返す。
+    """
+    map_loader, hint_loader = create_csv_loaders(assets_dir)
+
+    hint_masks = {}
+    hints = list(hint_loader.generic_hints.values())
+    for map_id in map_loader.get_available_map_ids():
+        tiles = map_loader.load_map(map_id)
+        hint_masks[map_id] = build_hint_masks(tiles, hints)
+
+    return {
+        "version": BUNDLE_VERSION,
+        "sources": stamps if stamps is not None else source_stamps(assets_dir),
+        "maps": map_loader.export_bundle(),
+        "hints": hint_loader.export_bundle(),
+        "hint_masks": hint_masks,
+    }
+
+
+def build_hint_masks(tiles, hints):
+    """
+    1マップ分の「ヒントキー → 合致セルのマスク」を求める。
+    NumPy があれば全ヒントを VectorizedHintEvaluator でまとめて評価し、
+    無ければ HintIndex（セル配列上のマスク演算）で求める。
+    """
+    if np is None:
+        return HintIndex(tiles, hints).masks
+    evaluator = VectorizedHintEvaluator(tiles)
+    results = evaluator.evaluate_many(hints)
+    return {HintIndex.hint_key(hint): evaluator.to_bitmask(result)
+            for hint, result in zip(hints, results)}
+
+
+def load_asset_bundle(assets_dir=DEFAULT_ASSETS_DIR, bundle_path=DEFAULT_BUNDLE_PATH):
+    """
+    バンドルを読み込んで返す。
+    - バンドルが無い／壊れている／元 CSV が更新されている場合は再構築して書き出す
+    - 書き出しに失敗しても（読み取り専用環境など）構築したバンドルはそのまま返す
+    """
+    stamps = source_stamps(assets_dir)
+
+    try:
+        with open(bundle_path, "rb") as f:
+            bundle = pickle.load(f)
+        if bundle.get("version") == BUNDLE_VERSION and bundle.get("sources") == stamps:
+            return bundle
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        print(f"[Bundle Load Error] {e} → 再構築します")
+
+    bundle = build_asset_bundle(assets_dir, stamps)
+    try:
+        os.makedirs(os.path.dirname(bundle_path) or ".", exist_ok=True)
+        tmp_path = f"{bundle_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, bundle_path)  # 書き込み途中のファイルを読ませない
+    except OSError as e:
+        print(f"[Bundle Save Error] {e}")
+    return bundle
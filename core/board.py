@@ -1,12 +1,49 @@
+from collections.abc import Mapping
+
+from core.board_template import BoardTemplate
+from core.token_layer import TokenLayer
+from core.zobrist import ZobristKeys
+from utils.debug_utils import debug_log
+
+
 class Board:
     """
     盤面情報（地形／構造物／縄張り／トークン）を管理するクラス。
     - セル情報の取得・判定
     - トークンの配置処理
+
+    地形などは共有の BoardTemplate、トークンはゲームごとの TokenLayer に分けて持つ。
+    tiles は両者を合わせたセル情報（座標 → CellView の dict 互換ビュー）。
+
+    置いたトークンは journal（(kind, ビット番号, プレイヤーID) の列）にも記録し、
+    mark() の時点まで rollback() で戻せる（戻した分は replay() でやり直せる）。
+    どちらも盤面の大きさではなく変更数に比例する手間で済む。
+
+    hash はトークン配置の Zobrist ハッシュ（64 ビット）で、配置・取り消しのたびに差分更新する。
     """
 
-    def __init__(self, tile_data):
-        self.tiles = tile_data  # dict[(col, row)] → セル情報
+    def __init__(self, tile_data, hint_index=None, player_ids=()):
+        """
+        tile_data: BoardTemplate（複数ゲームで共有）またはセル情報の dict
+        hint_index: dict を渡す場合に共有する HintIndex（省略時は構築する）
+        player_ids: ディスクの表示順に使うプレイヤー順
+        """
+        if not isinstance(tile_data, BoardTemplate):
+            tile_data = BoardTemplate(tile_data, hint_index)
+        self.template = tile_data
+        # ヒント判定用のビットマスク索引（マップ単位で共有）
+        self.hint_index = tile_data.hint_index
+        self.bit_of = tile_data.bit_of
+        self.tokens = TokenLayer(player_ids)
+        self.tiles = TileView(self)  # dict[(col, row)] → セル情報
+        # 前回の描画以降にトークンが変化したセル（描画側の差分更新に使用）
+        self.dirty = set()
+        # トークン配置の通知先 fn(kind, coord, player_id)
+        # （kind: "disc" / "cube"、トークンを全て取り除いたときは "reset"、
+        #   rollback() でトークンを取り除いたときは "rollback"（coord・player_id は None））
+        self.token_listeners = []
+        self.journal = []  # 置いたトークンの記録 (kind, ビット番号, プレイヤーID)
+        self.hash = 0      # トークン配置の Zobrist ハッシュ
 
     def get_tile(self, coord):
         """指定座標のセル情報を取得（None安全）"""
@@ -14,33 +51,226 @@ class Board:
 
     def is_valid_coord(self, coord):
         """指定座標が盤面に存在するか判定"""
-        return coord in self.tiles
+        return coord in self.template
 
     def apply_hint(self, coord, hint):
-        """指定座標にヒントが適用されるか判定（HintEvaluatorへ委譲）"""
-        cell = self.get_tile(coord)
-        if not cell:
-            return False
-        from core.hint_evaluator import HintEvaluator
-        return HintEvaluator.hint_applies(cell, hint, self.tiles)
+        """指定座標にヒントが適用されるか判定（HintIndex のビット検査）"""
+        return self.hint_index.applies(coord, hint)
+
+    # ------------------------------------------------------------
+    # トークン
+    # ------------------------------------------------------------
 
     def place_disc(self, coord, player_id):
         """ディスク配置処理：重複配置不可。成功なら True を返す"""
-        print(f"[DEBUG] place_disc 呼び出し: coord={coord}, player_id={player_id}")
-        cell = self.get_tile(coord)
-        if not cell:
-            return False
-        discs = cell.setdefault("discs", [])
-        if player_id not in discs:
-            discs.append(player_id)
-            return True
-        return False  # すでに配置済み
+        debug_log(f"place_disc 呼び出し: coord={coord}, player_id={player_id}")
+        bit = self.bit_of.get(coord)
+        if bit is None or not self.tokens.add_disc(bit, player_id):
+            return False  # 盤面外 or すでに配置済み
+        self.journal.append(("disc", bit, player_id))
+        self.hash ^= self._zobrist("disc", player_id)[bit]
+        self.dirty.add(coord)
+        self._notify("disc", coord, player_id)
+        return True
 
     def place_cube(self, coord, player_id):
         """キューブ配置処理：既存キューブがある場合は失敗"""
-        print(f"[DEBUG] place_cube 呼び出し: coord={coord}, player_id={player_id}")
-        cell = self.get_tile(coord)
-        if not cell or cell.get("cube") is not None:
+        debug_log(f"place_cube 呼び出し: coord={coord}, player_id={player_id}")
+        bit = self.bit_of.get(coord)
+        if bit is None or not self.tokens.add_cube(bit, player_id):
             return False
-        cell["cube"] = player_id
+        self.journal.append(("cube", bit, player_id))
+        self.hash ^= self._zobrist("cube", player_id)[bit]
+        self.dirty.add(coord)
+        self._notify("cube", coord, player_id)
         return True
+
+    def reset_tokens(self):
+        """トークンをすべて取り除く（テンプレートは共有のまま）"""
+        self.dirty.update(self.tokens_coords())
+        self.tokens.reset()
+        self.journal.clear()
+        self.hash = 0
+        self._notify("reset", None, None)
+
+    def mark(self):
+        """現在のトークン配置の目印（rollback() に渡す）"""
+        return len(self.journal)
+
+    def rollback(self, mark):
+        """
+        mark() の時点より後に置いたトークンを取り除く。
+        Returns: 取り除いたトークンの記録（置いた順。replay() に渡すとやり直せる）
+        """
+        undone = self.journal[mark:]
+        if not undone:
+            return []
+        del self.journal[mark:]
+        coords = self.template.coords
+        for kind, bit, player_id in reversed(undone):
+            if kind == "disc":
+                self.tokens.remove_disc(bit, player_id)
+            else:
+                self.tokens.remove_cube(bit)
+            self.hash ^= self._zobrist(kind, player_id)[bit]
+            self.dirty.add(coords[bit])
+        self._notify("rollback", None, None)
+        return undone
+
+    def replay(self, entries):
+        """rollback() で取り除いたトークンを置き直す"""
+        coords = self.template.coords
+        for kind, bit, player_id in entries:
+            if kind == "disc":
+                self.place_disc(coords[bit], player_id)
+            else:
+                self.place_cube(coords[bit], player_id)
+
+    def clone(self):
+        """テンプレートを共有し、トークンだけを複製した盤面（リスナーは引き継がない）"""
+        board = Board.__new__(Board)
+        board.template = self.template
+        board.hint_index = self.hint_index
+        board.bit_of = self.bit_of
+        board.tokens = self.tokens.clone()
+        board.tiles = TileView(board)
+        board.dirty = set()
+        board.token_listeners = []
+        board.journal = []  # 複製した時点より前には戻せない
+        board.hash = self.hash
+        return board
+
+    def compute_hash(self):
+        """トークン配置の Zobrist ハッシュを最初から計算し直す（差分更新の検証用）"""
+        value = 0
+        for kind, coord, player_id in self.iter_tokens():
+            value ^= self._zobrist(kind, player_id)[self.bit_of[coord]]
+        return value
+
+    def _zobrist(self, kind, player_id):
+        return ZobristKeys.cell_keys(kind, player_id, len(self.template.coords))
+
+    def discs_at(self, coord):
+        """coord にディスクを置いたプレイヤーID一覧"""
+        return self.tokens.discs_at(self.bit_of[coord])
+
+    def has_disc(self, coord, player_id):
+        """coord に player のディスクがあるか"""
+        return self.tokens.has_disc(self.bit_of[coord], player_id)
+
+    def cube_at(self, coord):
+        """coord にキューブを置いたプレイヤーID（無ければ None）"""
+        return self.tokens.cube_at(self.bit_of[coord])
+
+    def disc_mask(self, player_id):
+        """player のディスクがあるセルのマスク（HintIndex と同じビット番号）"""
+        return self.tokens.discs.get(player_id, 0)
+
+    @property
+    def cube_mask(self):
+        """キューブがあるセルのマスク"""
+        return self.tokens.cube_mask
+
+    def iter_tokens(self):
+        """置かれている全トークン (kind, coord, player_id)（ディスク → キューブの順）"""
+        coords = self.template.coords
+        for pid, bits in self.tokens.discs.items():
+            for coord in self.hint_index.coords_in(bits):
+                yield "disc", coord, pid
+        for bit, pid in self.tokens.cube_owner.items():
+            yield "cube", coords[bit], pid
+
+    def tokens_coords(self):
+        """トークンが置かれているセルの座標集合"""
+        mask = self.tokens.cube_mask
+        for bits in self.tokens.discs.values():
+            mask |= bits
+        return set(self.hint_index.coords_in(mask))
+
+    def add_token_listener(self, listener):
+        """トークン配置の通知先を登録する（HintDeduction など）"""
+        self.token_listeners.append(listener)
+
+    def _notify(self, kind, coord, player_id):
+        for listener in self.token_listeners:
+            listener(kind, coord, player_id)
+
+    def take_dirty(self):
+        """トークンが変化したセル集合を取り出してクリアする"""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+
+class TileView(Mapping):
+    """
+    Board.tiles：座標 → CellView の dict 互換の読み取り専用ビュー（描画側との互換用）。
+    """
+
+    def __init__(self, board):
+        self._board = board
+        self._bit_of = board.bit_of
+
+    def __getitem__(self, coord):
+        return CellView(self._board, self._bit_of[coord])
+
+    def __contains__(self, coord):
+        return coord in self._bit_of
+
+    def __iter__(self):
+        return iter(self._board.template.coords)
+
+    def __len__(self):
+        return len(self._bit_of)
+
+
+class CellView:
+    """
+    1セル分の読み取り専用ビュー（テンプレートの配列とトークン層を参照するだけで値は持たない）。
+    従来のセル dict と同じキー（col / row / terrain / territories / structure /
+    structure_color / discs / cube）で参照できる。
+    """
+
+    __slots__ = ("_board", "index")
+
+    KEYS = ("col", "row", "terrain", "territories", "structure", "structure_color",
+            "discs", "cube")
+
+    def __init__(self, board, index):
+        self._board = board
+        self.index = index  # セル番号（HintIndex のビット番号）
+
+    def __getitem__(self, key):
+        cells = self._board.template.cells
+        i = self.index
+        if key == "col":
+            return cells.coords[i][0]
+        if key == "row":
+            return cells.coords[i][1]
+        if key in cells.codes:
+            return cells.value(key, i)
+        if key == "territories":
+            return cells.territories_of(i)
+        if key == "discs":
+            return self._board.tokens.discs_at(i)
+        if key == "cube":
+            return self._board.tokens.cube_at(i)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in CellView.KEYS else default
+
+    def __contains__(self, key):
+        return key in CellView.KEYS
+
+    def keys(self):
+        return CellView.KEYS
+
+    def items(self):
+        return [(key, self[key]) for key in CellView.KEYS]
+
+    def to_dict(self):
+        """従来形式のセル dict に変換する"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"CellView({self.to_dict()})"
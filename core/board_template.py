@@ -0,0 +1,23 @@
+from core.hint_index import HintIndex
+
+
+class BoardTemplate:
+    """
+    マップ単位の読み取り専用の盤面（地形・構造物・縄張り）。
+    - セル情報は HintIndex の CompactCells（セル番号ごとの並列配列）で共有し、書き換えない
+    - トークン（ディスク・キューブ）は持たない（ゲームごとの TokenLayer が保持する）
+    - HintIndex も同じマップの全ゲームで共有する
+    同じテンプレートから何ゲーム作ってもコピーは発生しない。
+    """
+
+    def __init__(self, tile_data, hint_index=None):
+        self.hint_index = hint_index or HintIndex(tile_data)
+        self.cells = self.hint_index.cells     # CompactCells
+        self.coords = self.hint_index.coords   # ビット番号 → 座標
+        self.bit_of = self.hint_index.bit_of   # 座標 → ビット番号
+
+    def __contains__(self, coord):
+        return coord in self.bit_of
+
+    def __len__(self):
+        return len(self.coords)
@@ -0,0 +1,121 @@
+import sys
+from array import array
+
+from core.hex_neighborhood import HexNeighborhood
+
+
+class CompactCells:
+    """
+    盤面のセル情報を密な整数インデックスと並列配列で持つ読み取り専用の表現。
+
+    - セル番号は座標順（HintIndex のビット番号と同じ）
+    - terrain / structure / structure_color: 語彙表の整数コード（array('b')、該当なし = -1）
+    - territories: 縄張り種別ごとに1ビットを割り当てたビットフィールド
+    - 語彙の文字列は sys.intern 済み（全マップ・全ゲームで同じ文字列オブジェクトを共有）
+    - 「属性値 → 該当セルのマスク」と「セルごとの距離 d 以内の近傍マスク」を持ち、
+      ヒント判定（CompiledHint.mask_on）はマスク演算だけで済む
+    """
+
+    CODE_ATTRIBUTES = ("terrain", "structure", "structure_color")
+
+    def __init__(self, tile_data):
+        self.coords = sorted(tile_data.keys())  # セル番号 → 座標
+        self.index_of = {coord: i for i, coord in enumerate(self.coords)}
+        n = len(self.coords)
+
+        self.vocab = {attr: [] for attr in CompactCells.CODE_ATTRIBUTES}  # コード → 値
+        self.codes = {attr: array("b", [-1]) * n for attr in CompactCells.CODE_ATTRIBUTES}
+        self.territory_names = []                                 # ビット番号 → 縄張り種別
+        self.territories = array("B", [0]) * n
+
+        self.present_mask = 0  # セル情報があるセル（None のセルを除く）
+        # 属性 → 小文字化した値 → 該当セルのマスク（縄張りは "territories" で引く）
+        self.value_masks = {attr: {} for attr in CompactCells.CODE_ATTRIBUTES + ("territories",)}
+        code_of = {attr: {} for attr in CompactCells.CODE_ATTRIBUTES}
+
+        for i, coord in enumerate(self.coords):
+            cell = tile_data[coord]
+            if cell is None:
+                continue
+            self.present_mask |= 1 << i
+
+            for attr in CompactCells.CODE_ATTRIBUTES:
+                value = cell.get(attr)
+                if not isinstance(value, str):
+                    continue
+                code = code_of[attr].get(value)
+                if code is None:
+                    code = code_of[attr][value] = len(self.vocab[attr])
+                    self.vocab[attr].append(sys.intern(value))
+                self.codes[attr][i] = code
+                masks = self.value_masks[attr]
+                masks[value.lower()] = masks.get(value.lower(), 0) | 1 << i
+
+            bits = 0
+            for name in cell.get("territories") or ():
+                if not isinstance(name, str):
+                    continue
+                if name not in self.territory_names:
+                    self.territory_names.append(sys.intern(name))
+                bits |= 1 << self.territory_names.index(name)
+                masks = self.value_masks["territories"]
+                masks[name.lower()] = masks.get(name.lower(), 0) | 1 << i
+            self.territories[i] = bits
+
+        self._within = {}  # 距離 → セル番号ごとの「距離以内のセル」のマスク
+
+    def __len__(self):
+        return len(self.coords)
+
+    # ------------------------------------------------------------
+    # セル属性
+    # ------------------------------------------------------------
+
+    def value(self, attr, i):
+        """セル i の属性値（terrain / structure / structure_color。無ければ None）"""
+        code = self.codes[attr][i]
+        return self.vocab[attr][code] if code >= 0 else None
+
+    def territories_of(self, i):
+        """セル i の縄張り種別の一覧"""
+        bits = self.territories[i]
+        return [name for b, name in enumerate(self.territory_names) if (bits >> b) & 1]
+
+    # ------------------------------------------------------------
+    # マスク
+    # ------------------------------------------------------------
+
+    def mask_of(self, attr, targets):
+        """属性値（小文字）が targets のいずれかであるセルのマスク"""
+        masks = self.value_masks.get(attr, {})
+        mask = 0
+        for name in targets:
+            mask |= masks.get(name, 0)
+        return mask
+
+    def within_masks(self, distance):
+        """セル番号ごとの「距離 distance 以内（自マスを含む）のセル」のマスク"""
+        masks = self._within.get(distance)
+        if masks is None:
+            neighborhood = HexNeighborhood.shared()
+            index_of = self.index_of
+            masks = []
+            for coord in self.coords:
+                mask = 0
+                for other in neighborhood.within(coord, distance):
+                    i = index_of.get(other)
+                    if i is not None:
+                        mask |= 1 << i
+                masks.append(mask & self.present_mask)
+            self._within[distance] = masks
+        return masks
+
+    def dilate(self, mask, distance):
+        """mask のいずれかのセルから距離 distance 以内にあるセルのマスク"""
+        within = self.within_masks(distance)
+        result = 0
+        while mask:
+            low = mask & -mask
+            result |= within[low.bit_length() - 1]
+            mask ^= low
+        return result
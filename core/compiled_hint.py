@@ -0,0 +1,138 @@
+from core.hex_neighborhood import HexNeighborhood
+
+
+class CompiledHint:
+    """
+    generic_hints の1行を判定しやすい形に前処理したヒント述語。
+
+    - パラメータは読込時に小文字化・数値化済み（判定のたびに parse しない）
+    - hint_type ごとの判定関数を直接保持し、判定時の文字列分岐を省く
+    - mask_on() は CompactCells 上で全セル分の判定結果をマスクで一度に求める（高速経路）
+    - 従来のヒント dict と同じキー（hint_type / param1 / param2 / text）でも参照可能
+    """
+
+    __slots__ = ("hint_id", "hint_type", "param1", "param2", "text",
+                 "negate", "attribute", "targets", "distance", "_evaluate")
+
+    FIELDS = ("hint_type", "param1", "param2", "text")
+
+    # 近接系ヒント（neg_ を除いた種別） → 判定に使うセル属性
+    NEARBY_ATTRIBUTES = {
+        "adjacent_terrain": "terrain",
+        "adjacent_structure": "structure",
+        "adjacent_structure_by_color": "structure_color",
+        "adjacent_territory": "territories",
+    }
+
+    def __init__(self, hint_type, param1, param2, text="", hint_id=None):
+        self.hint_id = hint_id
+        self.hint_type = hint_type
+        self.param1 = param1
+        self.param2 = param2
+        self.text = text
+
+        # neg_ 付きは肯定版の判定結果を反転する
+        self.negate = hint_type.startswith("neg_")
+        base_type = hint_type[4:] if self.negate else hint_type
+
+        if base_type == "terrain_choice":
+            self.attribute = "terrain"
+            self.targets = frozenset((param1.lower(), param2.lower()))
+            self.distance = 0
+            self._evaluate = CompiledHint._match_terrain
+        elif base_type in CompiledHint.NEARBY_ATTRIBUTES:
+            self.attribute = CompiledHint.NEARBY_ATTRIBUTES[base_type]
+            if base_type == "adjacent_territory":
+                # 縄張りは「eagle,bear」のように複数指定できる
+                self.targets = frozenset(t.strip().lower() for t in param1.split(","))
+            else:
+                self.targets = frozenset((param1.lower(),))
+            self.distance = int(param2)
+            self._evaluate = CompiledHint._match_nearby
+        else:
+            # 未定義ヒントタイプは常に不一致
+            self.attribute = None
+            self.targets = frozenset()
+            self.distance = 0
+            self._evaluate = None
+
+    @classmethod
+    def from_dict(cls, hint, hint_id=None):
+        """ヒント dict（{hint_type, param1, param2, text}）から生成"""
+        return cls(hint["hint_type"], hint["param1"], hint["param2"],
+                   hint.get("text", ""), hint_id=hint_id)
+
+    # ------------------------------------------------------------
+    # 判定
+    # ------------------------------------------------------------
+
+    def applies(self, cell, board_data):
+        """セル `cell` にこのヒントが適用されるか判定する"""
+        if self._evaluate is None:
+            return False
+        return self._evaluate(self, cell, board_data)
+
+    def mask_on(self, cells):
+        """
+        CompactCells の全セルについての判定結果をマスクで返す（applies() と同じ結果）
+        - 地形2択：対象地形のマスク（neg_ なら地形を持つセルのうち対象外）
+        - 近接：対象属性を持つセルを距離 distance だけ膨張させたマスク（neg_ なら補集合）
+        """
+        if self._evaluate is None:
+            return 0
+        targets = cells.mask_of(self.attribute, self.targets)
+        if self._evaluate is CompiledHint._match_terrain:
+            if self.negate:
+                return cells.mask_of("terrain", cells.value_masks["terrain"]) & ~targets
+            return targets
+        found = cells.dilate(targets, self.distance)
+        return cells.present_mask & ~found if self.negate else found
+
+    def _match_terrain(self, cell, board_data):
+        """地形2択（neg_ なら「どちらでもない」）"""
+        terrain = cell.get("terrain", "")
+        if not isinstance(terrain, str):
+            return False
+        return (terrain.lower() in self.targets) != self.negate
+
+    def _match_nearby(self, cell, board_data):
+        """距離 distance 以内に対象属性を持つセルがあるか（neg_ なら「ない」）"""
+        found = False
+        coord = (cell["col"], cell["row"])
+        for other_coord in HexNeighborhood.shared().within(coord, self.distance):
+            other = board_data.get(other_coord)
+            if other is not None and self._has_target(other):
+                found = True
+                break
+        return found != self.negate
+
+    def _has_target(self, cell):
+        """セルの対象属性が targets のいずれかに一致するか"""
+        value = cell.get(self.attribute)
+        if isinstance(value, str):
+            return value.lower() in self.targets
+        if isinstance(value, list):
+            return any(isinstance(v, str) and v.lower() in self.targets for v in value)
+        return False
+
+    # ------------------------------------------------------------
+    # dict 互換アクセス
+    # ------------------------------------------------------------
+
+    def __getitem__(self, key):
+        if key in CompiledHint.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in CompiledHint.FIELDS:
+            return getattr(self, key)
+        return default
+
+    def to_dict(self):
+        """従来形式のヒント dict に戻す"""
+        return {key: getattr(self, key) for key in CompiledHint.FIELDS}
+
+    def __repr__(self):
+        return (f"CompiledHint(id={self.hint_id}, {self.hint_type}, "
+                f"{self.param1!r}, {self.param2!r})")
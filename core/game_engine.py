@@ -1,6 +1,8 @@
+from core.answer_table import AnswerTable
 from core.board import Board
 from core.player import Player
 from core.game_state import GameState
+from core.hint_loader import HintLoader
 
 
 class GameEngine:
@@ -11,24 +13,34 @@ class GameEngine:
     - ターン・アクション状態の保持（GameStateと連携）
     """
 
-    def __init__(self, player_ids, hints, board_data, label_map=None, color_map=None):
-        # 🧱 ボード構築
-        self.board = Board(board_data)
+    def __init__(self, player_ids, hints, board_data, label_map=None, color_map=None,
+                 hint_index=None):
+        # 🧱 ボード構築（board_data: 共有の BoardTemplate かセル情報の dict。
+        #    hint_index: dict を渡す場合にマップ読込時に構築済みの HintIndex を共有可能）
+        self.board = Board(board_data, hint_index, player_ids)
 
-        # 🎭 プレイヤー構築（ID → ヒント → ラベル／カラー）
+        # 🎭 プレイヤー構築（ID → コンパイル済みヒント → ラベル／カラー）
         self.players = []
         self.id_to_player = {}
         for i, pid in enumerate(player_ids):
             display = label_map.get(pid, pid) if label_map else pid
             color = color_map.get(pid, "gray") if color_map else "gray"
-            player = Player(pid, hints[i], display_name=display, color=color)
+            hint = HintLoader.compile_hint(hints[i])
+            player = Player(pid, hint, display_name=display, color=color)
             self.players.append(player)
             self.id_to_player[pid] = player
 
+        # ✅ 回答表（プレイヤー × セル）：ヒントと盤面はゲーム中変わらないので開始時に一括評価
+        self.answers = AnswerTable(self.board.hint_index, self.players)
+
         # 🎯 ゲーム状態（フェーズ・ターンなど）初期化
         self.state = GameState(player_ids)
         self.label_map = label_map or {}
 
+        # ↩️ 取り消し／やり直し用の履歴
+        self.undo_stack = []  # 取り消せる操作の直前の控え（snapshot()）
+        self.redo_stack = []  # 取り消した操作 (取り消し前の控え, トークンの記録, 進行ログ)
+
     def current_player(self):
         """現在手番のプレイヤーインスタンスを取得"""
         return self.id_to_player[self.state.current_player]
@@ -43,6 +55,65 @@ class GameEngine:
 
     def reset_game(self):
         """ゲームの再初期化（トークン・状態のリセット）"""
+        self.board.reset_tokens()
         for player in self.players:
             player.reset()
         self.state.reset()
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def position_hash(self):
+        """局面（トークン配置・手番・操作・フェーズ）の 64 ビット Zobrist ハッシュ"""
+        return self.board.hash ^ self.state.hash
+
+    # ------------------------------------------------------------
+    # 控え・取り消し・やり直し
+    # ------------------------------------------------------------
+
+    def snapshot(self):
+        """
+        盤面（トークン記録の位置）・ゲーム状態・各プレイヤーのトークン数の控え。
+        restore() でこの時点に戻せる（ボットや分析での「試して戻す」用）。
+        """
+        return (self.board.mark(), self.state.snapshot(),
+                tuple((p.disc_count, p.cube_count) for p in self.players))
+
+    def restore(self, snapshot):
+        """
+        snapshot() の時点に戻す（手間は控えの後に置いたトークン数に比例）。
+        Returns: 取り除いたトークンの記録
+        """
+        mark, state, counts = snapshot
+        undone = self.board.rollback(mark)
+        self.state.restore(state)
+        for player, (discs, cubes) in zip(self.players, counts):
+            player.disc_count = discs
+            player.cube_count = cubes
+        return undone
+
+    def commit(self, snapshot):
+        """操作の直前に取った控えを取り消し履歴に積む（やり直し履歴は破棄）"""
+        self.undo_stack.append(snapshot)
+        self.redo_stack.clear()
+
+    def undo(self):
+        """直前の操作を取り消す（取り消せなければ False）"""
+        if not self.undo_stack:
+            return False
+        current = self.snapshot()
+        target = self.undo_stack.pop()
+        history = self.state.log_since(target[1])
+        undone = self.restore(target)
+        self.redo_stack.append((current, undone, history))
+        return True
+
+    def redo(self):
+        """取り消した操作をやり直す（やり直せなければ False）"""
+        if not self.redo_stack:
+            return False
+        current, undone, history = self.redo_stack.pop()
+        self.undo_stack.append(self.snapshot())
+        self.board.replay(undone)
+        self.state.history.extend(history)
+        self.restore(current)
+        return True
@@ -1,9 +1,15 @@
+from core.zobrist import ZobristKeys
+
+
 class GameState:
     """
     ゲームの状態管理クラス。
     - 現在のフェーズ（init / active / end）
     - プレイヤーのアクション（質問 / 探索 / キューブ配置 等）
     - ターン順・進行ログ・探索進行フラグなど
+
+    hash は手番・操作・フェーズの Zobrist ハッシュ（64 ビット）。next_player()・set_phase()・
+    current_action への代入のたびに差分更新する（盤面のハッシュと XOR すると局面のハッシュ）。
     """
 
     # ゲーム全体の進行フェーズ
@@ -28,8 +34,9 @@ class GameState:
 
         # 🎯 ゲーム状態フィールド
         self.phase = GameState.PHASE_INIT
-        self.current_action = None
+        self._current_action = None
         self.target_player = None
+        self.hash = self.compute_hash()
 
         # 🧩 各プレイヤーのトークン配置履歴
         self.cube_count = {p: 0 for p in player_ids}
@@ -48,9 +55,27 @@ class GameState:
         """現在のターンプレイヤーIDを取得"""
         return self.players[self.current_index]
 
+    @property
+    def current_action(self):
+        """ターン内のプレイヤー操作（None なら行動選択中）"""
+        return self._current_action
+
+    @current_action.setter
+    def current_action(self, action_name):
+        self.hash ^= (ZobristKeys.key("action", self._current_action)
+                      ^ ZobristKeys.key("action", action_name))
+        self._current_action = action_name
+
+    def compute_hash(self):
+        """手番・操作・フェーズの Zobrist ハッシュを最初から計算する"""
+        return (ZobristKeys.key("turn", self.current_index)
+                ^ ZobristKeys.key("action", self._current_action)
+                ^ ZobristKeys.key("phase", self.phase))
+
     def set_phase(self, phase_name):
         """ゲームフェーズを変更（init / active / end）"""
         if phase_name in GameState.ALLOWED_PHASES:
+            self.hash ^= ZobristKeys.key("phase", self.phase) ^ ZobristKeys.key("phase", phase_name)
             self.phase = phase_name
         else:
             raise ValueError(f"[GameState] 不正なフェーズ: '{phase_name}'")
@@ -64,7 +89,9 @@ class GameState:
 
     def next_player(self):
         """次のプレイヤーにターンを移す"""
-        self.current_index = (self.current_index + 1) % self.n_players
+        following = (self.current_index + 1) % self.n_players
+        self.hash ^= ZobristKeys.key("turn", self.current_index) ^ ZobristKeys.key("turn", following)
+        self.current_index = following
         self.current_action = None
         self.target_player = None
 
@@ -81,6 +108,31 @@ class GameState:
         """プレイ履歴に1件追加"""
         self.history.append(message)
 
+    def snapshot(self):
+        """
+        現在の状態の控え（restore() に渡す）。
+        進行ログは件数だけを控えるので、大きさはプレイヤー数に比例する。
+        """
+        return (self.current_index, self.phase, self.current_action, self.target_player,
+                dict(self.cube_count), dict(self.disk_count), len(self.history),
+                list(self.pending_explore) if self.pending_explore is not None else None,
+                self.exploration_target, self.reveal_index)
+
+    def restore(self, snapshot):
+        """snapshot() の時点の状態に戻す（進行ログはその時点より後の分を切り捨てる）"""
+        (self.current_index, self.phase, self.current_action, self.target_player,
+         cube_count, disk_count, history_len, pending_explore,
+         self.exploration_target, self.reveal_index) = snapshot
+        self.cube_count = dict(cube_count)
+        self.disk_count = dict(disk_count)
+        del self.history[history_len:]
+        self.pending_explore = list(pending_explore) if pending_explore is not None else None
+        self.hash = self.compute_hash()
+
+    def log_since(self, snapshot):
+        """snapshot() の時点より後に追加された進行ログ"""
+        return self.history[snapshot[6]:]
+
     def reset(self):
         """ゲーム状態全体を初期化（ゲーム再スタート時）"""
         self.current_index = 0
@@ -92,3 +144,4 @@ class GameState:
         self.pending_explore = None
         self.exploration_target = None
         self.reveal_index = 0
+        self.hash = self.compute_hash()
@@ -0,0 +1,92 @@
+class HexNeighborhood:
+    """
+    Hex 座標（offset 形式）の近傍リング索引。
+
+    - MapConfigLoader と同じ配置（flat-top・奇数列が半マス下にずれる）を前提とする
+    - (col, row) ごとに距離1〜3のリング（ちょうどその距離にある座標のリスト）を事前計算
+    - 「距離 d 以内」の問い合わせは最大36マス＋自マスを走査するだけで済む
+
+    coords を指定した場合は、その座標集合（盤面）に含まれるセルだけにリングを絞り込む。
+    省略した場合は盤面範囲を考慮せず、問い合わせ時に遅延計算してキャッシュする。
+    """
+
+    MAX_RING = 3
+
+    # Cube 座標の6方向（隣接する方向が連続する順序）
+    CUBE_DIRECTIONS = [(1, -1, 0), (1, 0, -1), (0, 1, -1),
+                       (-1, 1, 0), (-1, 0, 1), (0, -1, 1)]
+
+    _shared = None
+
+    def __init__(self, coords=None, max_ring=MAX_RING):
+        self.max_ring = max_ring
+        self.coords = set(coords) if coords is not None else None
+        self.rings = {}  # (col, row) → (ring1, ring2, ..., ring{max_ring})
+
+        for coord in self.coords or ():
+            self.rings_of(coord)
+
+    @classmethod
+    def shared(cls):
+        """盤面範囲に依存しない共有インスタンス（プロセス内で1つ）"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def ring(coord, distance):
+        """
+        中心 coord からちょうど distance マス離れた座標のリストを返す。
+        Cube 座標上でリングを一周たどり、offset 座標に戻して列挙する（範囲外も含む）。
+        """
+        if distance <= 0:
+            return [coord] if distance == 0 else []
+
+        col, row = coord
+        x = col
+        z = row - ((col - (col & 1)) // 2)
+        y = -x - z
+
+        dx, dy, dz = HexNeighborhood.CUBE_DIRECTIONS[4]
+        x, y, z = x + dx * distance, y + dy * distance, z + dz * distance
+
+        results = []
+        for dx, dy, dz in HexNeighborhood.CUBE_DIRECTIONS:
+            for _ in range(distance):
+                results.append((x, z + ((x - (x & 1)) // 2)))
+                x, y, z = x + dx, y + dy, z + dz
+        return results
+
+    def rings_of(self, coord):
+        """指定座標の距離1〜max_ring のリングを返す（初回のみ計算）"""
+        rings = self.rings.get(coord)
+        if rings is None:
+            rings = []
+            for distance in range(1, self.max_ring + 1):
+                ring = HexNeighborhood.ring(coord, distance)
+                if self.coords is not None:
+                    ring = [c for c in ring if c in self.coords]
+                rings.append(tuple(ring))
+            rings = tuple(rings)
+            self.rings[coord] = rings
+        return rings
+
+    def within(self, coord, distance):
+        """
+        中心 coord から distance マス以内の座標リスト（自マスを含む）を返す。
+        max_ring を超える距離はその場でリングを計算する。
+        """
+        if distance < 0:
+            return []
+
+        result = [coord]
+        rings = self.rings_of(coord)
+        for d in range(1, distance + 1):
+            if d <= self.max_ring:
+                result.extend(rings[d - 1])
+            else:
+                ring = HexNeighborhood.ring(coord, d)
+                if self.coords is not None:
+                    ring = [c for c in ring if c in self.coords]
+                result.extend(ring)
+        return result
@@ -0,0 +1,151 @@
+class HintDeduction:
+    """
+    公開情報（盤面のディスク・キューブ）から各プレイヤーのヒント候補と正解候補マスを推理するサービス。
+
+    - 各プレイヤーのヒントは汎用ヒント（generic_hints.csv の各行）のいずれか
+    - ヒント候補はプレイヤーごとのビットセット（ヒント番号 → ビット）で保持する
+    - マスごとに「そのマスで成り立つヒント」のビットセットを事前計算しておき、
+      ディスクなら AND、キューブなら AND NOT するだけで候補を絞り込む（履歴の再走査はしない）
+    - 正解候補マス = 全プレイヤーについて「残っているヒント候補のどれかが成り立つマス」の AND
+      （マスの集合は HintIndex と同じビット番号のマスクで表す）
+    - Board.add_token_listener() で盤面に登録すると、トークンが置かれるたびに自動で更新される
+    """
+
+    def __init__(self, hint_index, hints, player_ids):
+        """
+        hint_index: 盤面の HintIndex（ヒント → 合致セルのマスク）
+        hints: 候補となるヒント一覧（通常は HintLoader.generic_hints の全ヒント）
+        player_ids: 推理対象のプレイヤーID一覧
+        """
+        self.index = hint_index
+        self.hints = list(hints)
+        self.player_ids = list(player_ids)
+        self.all_hints = (1 << len(self.hints)) - 1
+
+        # ヒント番号 → 合致セルのマスク
+        self.hint_masks = [hint_index.mask_for(hint) for hint in self.hints]
+
+        # セルのビット番号 → そのマスで成り立つヒントのビットセット
+        self.hints_true = [0] * len(hint_index.coords)
+        for i, mask in enumerate(self.hint_masks):
+            while mask:
+                low = mask & -mask
+                self.hints_true[low.bit_length() - 1] |= 1 << i
+                mask ^= low
+
+        self.candidates = {}   # プレイヤーID → ヒント候補のビットセット
+        self._cover = {}       # プレイヤーID → ヒント候補のどれかが成り立つセルのマスク
+        self._answer = None    # 正解候補マスのマスク（キャッシュ）
+        self._board = None     # attach() した盤面
+        self.reset()
+
+    def reset(self):
+        """推理を初期状態（全ヒントが候補）に戻す"""
+        for pid in self.player_ids:
+            self.candidates[pid] = self.all_hints
+            self._cover[pid] = self.index.full_mask if self.hints else 0
+        self._answer = None
+
+    # ------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------
+
+    def observe(self, kind, coord, player_id):
+        """
+        トークン1個分の情報を反映する（Board のトークンリスナーとしても使う）
+        kind: "disc"（player のヒントが coord で成り立つ）/ "cube"（成り立たない）/
+              "reset"（盤面のトークンが全て取り除かれた → 初期状態に戻す）/
+              "rollback"（トークンが取り消された → 盤面から推理し直す）
+        """
+        if kind == "reset":
+            self.reset()
+            return
+        if kind == "rollback":
+            # 絞り込みは取り消せないので、盤面に残っているトークンから推理し直す
+            self._replay(self._board)
+            return
+        before = self.candidates.get(player_id)
+        bit = self.index.bit_of.get(coord)
+        if before is None or bit is None:
+            return
+
+        if kind == "disc":
+            after = before & self.hints_true[bit]
+        elif kind == "cube":
+            after = before & ~self.hints_true[bit]
+        else:
+            return
+
+        if after != before:
+            self.candidates[player_id] = after
+            self._cover[player_id] = self._union(after)
+            self._answer = None
+
+    def attach(self, board):
+        """盤面の現在のトークンを反映し、以降のトークン配置を自動で反映するよう登録する"""
+        self._board = board
+        self._replay(board)
+        board.add_token_listener(self.observe)
+
+    def _replay(self, board):
+        """初期状態から盤面の全トークンを反映し直す"""
+        self.reset()
+        for kind, coord, pid in board.iter_tokens():
+            self.observe(kind, coord, pid)
+
+    def _union(self, hint_bits):
+        """ヒント候補のどれかが成り立つセルのマスク"""
+        mask = 0
+        while hint_bits:
+            low = hint_bits & -hint_bits
+            mask |= self.hint_masks[low.bit_length() - 1]
+            hint_bits ^= low
+        return mask
+
+    # ------------------------------------------------------------
+    # 問い合わせ
+    # ------------------------------------------------------------
+
+    def candidate_hints(self, player_id):
+        """player のヒント候補（ヒントオブジェクトの一覧）"""
+        return self.hints_in(self.candidates[player_id])
+
+    def candidate_count(self, player_id):
+        """player のヒント候補数"""
+        return bin(self.candidates[player_id]).count("1")
+
+    def hints_in(self, hint_bits):
+        """ビットセットに含まれるヒントの一覧"""
+        return [hint for i, hint in enumerate(self.hints) if (hint_bits >> i) & 1]
+
+    def answer_mask(self, extra=None):
+        """
+        正解候補マスのマスク。
+        extra: {プレイヤーID: ヒント候補のビットセット} で一部のプレイヤーの候補を差し替えて求める
+               （自分のヒントを知っているプレイヤー視点の推理など）
+        """
+        if extra:
+            mask = self.index.full_mask
+            for pid in self.player_ids:
+                bits = extra.get(pid)
+                mask &= self._cover[pid] if bits is None else self._union(bits)
+            return mask
+
+        if self._answer is None:
+            mask = self.index.full_mask
+            for pid in self.player_ids:
+                mask &= self._cover[pid]
+            self._answer = mask
+        return self._answer
+
+    def answer_cells(self, extra=None):
+        """正解候補マスの座標一覧"""
+        return self.index.coords_in(self.answer_mask(extra))
+
+    def hint_bit(self, hint):
+        """ヒントのビット（候補一覧に無ければ 0）"""
+        key = self.index.hint_key(hint)
+        for i, candidate in enumerate(self.hints):
+            if self.index.hint_key(candidate) == key:
+                return 1 << i
+        return 0
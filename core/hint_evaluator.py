@@ -1,3 +1,7 @@
+from core.compiled_hint import CompiledHint
+from core.hex_neighborhood import HexNeighborhood
+
+
 class HintEvaluator:
     """
     ヒントが盤面セルに合致するかどうかを判定するユーティリティクラス。
@@ -34,10 +38,12 @@ class HintEvaluator:
         """
         指定座標 `match` の周囲に `target` 条件に合致するセルが存在するか判定
         - `target` は判定用のラムダ関数
+        - 近傍リング索引（HexNeighborhood）で距離以内のセルだけを走査する
         """
         coord = (match["col"], match["row"])
-        for (cx, cy), other in board_data.items():
-            if other is not None and target(other) and HintEvaluator.hex_distance(coord, (cx, cy)) <= distance:
+        for other_coord in HexNeighborhood.shared().within(coord, distance):
+            other = board_data.get(other_coord)
+            if other is not None and target(other):
                 return True
         return False
 
@@ -45,91 +51,9 @@ class HintEvaluator:
     def hint_applies(cell, hint, board_data):
         """
         与えられたヒントがセル `cell` に適用されるか判定する。
-        ヒント形式：{hint_type, param1, param2, text}
+        ヒント形式：CompiledHint（HintLoader でコンパイル済み）または
+        {hint_type, param1, param2, text} の dict（その場でコンパイル）
         """
-        hint_type = hint["hint_type"]
-        p1 = hint["param1"]
-        p2 = hint["param2"]
-
-        # 地形2択（大文字小文字考慮）
-        if hint_type == "terrain_choice":
-            terrain = cell.get("terrain", "")
-            return isinstance(terrain, str) and terrain.lower() in [p1.lower(), p2.lower()]
-
-        elif hint_type == "neg_terrain_choice":
-            terrain = cell.get("terrain", "")
-            return isinstance(terrain, str) and terrain.lower() not in [p1.lower(), p2.lower()]
-
-        # 地形近接
-        elif hint_type == "adjacent_terrain":
-            return HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("terrain"), str) and
-                c.get("terrain").lower() == p1.lower(),
-                int(p2), board_data
-            )
-
-        elif hint_type == "neg_adjacent_terrain":
-            return not HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("terrain"), str) and
-                c.get("terrain").lower() == p1.lower(),
-                int(p2), board_data
-            )
-
-        # 構造物の種類による近接
-        elif hint_type == "adjacent_structure":
-            return HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("structure"), str) and
-                c.get("structure").lower() == p1.lower(),
-                int(p2), board_data
-            )
-
-        elif hint_type == "neg_adjacent_structure":
-            return not HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("structure"), str) and
-                c.get("structure").lower() == p1.lower(),
-                int(p2), board_data
-            )
-
-        # 構造物の色による近接
-        elif hint_type == "adjacent_structure_by_color":
-            return HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("structure_color"), str) and
-                c.get("structure_color").lower() == p1.lower(),
-                int(p2), board_data
-            )
-
-        elif hint_type == "neg_adjacent_structure_by_color":
-            return not HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("structure_color"), str) and
-                c.get("structure_color").lower() == p1.lower(),
-                int(p2), board_data
-            )
-
-        # 縄張りの近接（配列比較）
-        elif hint_type == "adjacent_territory":
-            targets = [t.strip().lower() for t in p1.split(",")]
-            return HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("territories"), list) and
-                any(t in [tt.lower() for tt in c.get("territories")
-                    if isinstance(tt, str)] for t in targets),
-                int(p2), board_data
-            )
-
-        elif hint_type == "neg_adjacent_territory":
-            targets = [t.strip().lower() for t in p1.split(",")]
-            return not HintEvaluator.is_nearby(
-                cell,
-                lambda c: isinstance(c, dict) and isinstance(c.get("territories"), list) and
-                any(t in [tt.lower() for tt in c.get("territories")
-                    if isinstance(tt, str)] for t in targets),
-                int(p2), board_data
-            )
-
-        return False  # 未定義ヒントタイプは常に不一致
+        if not isinstance(hint, CompiledHint):
+            hint = CompiledHint.from_dict(hint)
+        return hint.applies(cell, board_data)
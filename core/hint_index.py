@@ -0,0 +1,68 @@
+from core.compact_cells import CompactCells
+from core.compiled_hint import CompiledHint
+
+
+class HintIndex:
+    """
+    マップ単位のヒント充足ビットマスク索引。
+    - 盤面の各セルに座標順でビット番号を割り当てる（108マス → 108ビット）
+    - ヒントごとに「合致するセル」のビットを立てた整数マスクを保持
+    - 判定は1ビットの検査、正解探索はマスク同士の AND で済む
+
+    ヒントの判定結果は地形・構造物・縄張りのみに依存し、トークン配置では変化しないため、
+    マップ読込時に一度だけ構築すればゲーム中ずっと再利用できる。
+    未登録ヒントのマスクは CompactCells 上のマスク演算（CompiledHint.mask_on）で求める。
+    """
+
+    def __init__(self, board_data, hints=(), masks=None):
+        self.board_data = board_data
+        self.cells = CompactCells(board_data)  # セル情報の配列表現（ビット番号 = セル番号）
+        self.coords = self.cells.coords        # ビット番号 → 座標
+        self.bit_of = self.cells.index_of      # 座標 → ビット番号
+        self.full_mask = (1 << len(self.coords)) - 1
+        # ヒントキー → 合致セルのビットマスク（masks: アセットバンドル等で構築済みのもの）
+        self.masks = dict(masks) if masks else {}
+
+        for hint in hints:
+            self.mask_for(hint)
+
+    @staticmethod
+    def hint_key(hint):
+        """ヒントを一意に識別するキー（種別＋パラメータ）"""
+        return hint["hint_type"], hint["param1"], hint["param2"]
+
+    def mask_for(self, hint):
+        """
+        ヒントに合致するセルのビットマスクを返す。
+        未登録のヒントはその場でマスク演算により求めて索引に追加する。
+        """
+        key = HintIndex.hint_key(hint)
+        mask = self.masks.get(key)
+        if mask is None:
+            if not isinstance(hint, CompiledHint):
+                hint = CompiledHint.from_dict(hint)
+            mask = self.masks[key] = hint.mask_on(self.cells)
+        return mask
+
+    def applies(self, coord, hint):
+        """指定座標にヒントが適用されるか（1ビット検査）"""
+        bit = self.bit_of.get(coord)
+        if bit is None:
+            return False
+        return (self.mask_for(hint) >> bit) & 1 == 1
+
+    def combined_mask(self, hints):
+        """全ヒントに同時に合致するセルのマスク（各マスクの AND）"""
+        mask = self.full_mask
+        for hint in hints:
+            mask &= self.mask_for(hint)
+        return mask
+
+    def coords_in(self, mask):
+        """マスクで立っているビットに対応する座標のリストを返す"""
+        coords = []
+        while mask:
+            low = mask & -mask
+            coords.append(self.coords[low.bit_length() - 1])
+            mask ^= low
+        return coords
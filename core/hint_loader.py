@@ -1,5 +1,7 @@
 import csv
 
+from core.compiled_hint import CompiledHint
+
 
 class HintLoader:
     """
@@ -13,6 +15,8 @@ class HintLoader:
     主な用途：マップIDとプレイヤー数からプレイヤーごとのヒントを生成
     """
 
+    BOOK_ORDER = ["alpha", "beta", "gamma", "delta", "epsilon"]  # 冊子（プレイヤー席）の順序
+
     def __init__(self,
                  generic_hint_csv="assets/configs/generic_hints.csv",
                  book_order_csv="assets/configs/book_orders.csv",
@@ -21,10 +25,12 @@ class HintLoader:
         self.book_order_csv = book_order_csv
         self.player_hint_csv = player_hint_csv
 
-        self.generic_hints = {}           # hint_id → hint dict
+        self.generic_hints = {}           # hint_id → CompiledHint
         self.book_orders = {}             # position → {alpha, beta...: hint_id}
-        self.map_hint_mapping = {}        # map_id → {alpha, beta...: position}
-        self.map_player_count = {}        # map_id → プレイヤー数
+        self.map_hint_mapping = {}        # (map_id, プレイヤー数) → {alpha, beta...: position}
+        self.map_player_count = {}        # map_id → 定義済みプレイヤー数のリスト
+        self.player_sets = {}             # (map_id, プレイヤー数) → 解決済みプレイヤー情報
+        self.player_set_errors = {}       # (map_id, プレイヤー数) → 構成エラーの内容
 
         self._load_generic_hints()
         self._load_book_orders()
@@ -32,22 +38,49 @@ class HintLoader:
 
     def _load_generic_hints(self):
         """
-        generic_hints.csv を読み込み、hint_id をキーにヒント内容を保持
+        generic_hints.csv を読み込み、hint_id をキーにコンパイル済みヒントを保持
         """
         with open(self.generic_hint_csv, encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 try:
                     hid = int(row["hint_id"].strip())
-                    self.generic_hints[hid] = {
+                    self.generic_hints[hid] = HintLoader.compile_hint({
                         "hint_type": row["hint_type"].strip(),
                         "param1": row["param1"].strip(),
                         "param2": row["param2"].strip(),
                         "text": row["text"].strip()
-                    }
+                    }, hint_id=hid)
                 except Exception as e:
                     print(f"[Hint Load Error] {e} → 行: {row}")
 
+    # バンドルに収録する属性（CSV パスと読込結果）
+    BUNDLE_FIELDS = ("generic_hint_csv", "book_order_csv", "player_hint_csv",
+                     "generic_hints", "book_orders", "map_hint_mapping",
+                     "map_player_count", "player_sets", "player_set_errors")
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """アセットバンドル（core.asset_bundle）から CSV を読まずに構築する"""
+        loader = cls.__new__(cls)
+        for name in HintLoader.BUNDLE_FIELDS:
+            setattr(loader, name, bundle["hints"][name])
+        return loader
+
+    def export_bundle(self):
+        """バンドルに収録するデータを返す"""
+        return {name: getattr(self, name) for name in HintLoader.BUNDLE_FIELDS}
+
+    @staticmethod
+    def compile_hint(hint, hint_id=None):
+        """
+        ヒント dict を判定用の CompiledHint に変換する（コンパイル済みならそのまま返す）
+        - パラメータの小文字化・数値化と判定関数の選択をここで一度だけ行う
+        """
+        if isinstance(hint, CompiledHint):
+            return hint
+        return CompiledHint.from_dict(hint, hint_id=hint_id)
+
     def _load_book_orders(self):
         """
         book_orders.csv を読み込み、position（冊子ページ）ごとの冊子ごとの hint_id を格納
@@ -58,7 +91,7 @@ class HintLoader:
                 try:
                     position = int(row["position"].strip())
                     hint_map = {}
-                    for pid in ["alpha", "beta", "gamma", "delta", "epsilon"]:
+                    for pid in HintLoader.BOOK_ORDER:
                         val = row.get(pid, "").strip()
                         if val.isdigit():
                             hint_map[pid] = int(val)
@@ -68,7 +101,8 @@ class HintLoader:
 
     def _load_player_hints(self):
         """
-        map_player_hints.csv を読み込み、マップIDごとの冊子使用ページとプレイヤー数を保持
+        map_player_hints.csv を読み込み、(マップID, プレイヤー数) ごとの冊子使用ページを保持し、
+        book_orders → generic_hints を辿ったプレイヤー情報まで解決した索引を構築する
         """
         with open(self.player_hint_csv, encoding="utf-8") as f:
             reader = csv.DictReader(f)
@@ -77,62 +111,72 @@ class HintLoader:
                     map_id = int(row["map_id"].strip())
                     players = int(row["players"].strip())
                     hint_positions = {}
-                    for pid in ["alpha", "beta", "gamma", "delta", "epsilon"]:
+                    for pid in HintLoader.BOOK_ORDER:
                         val = row.get(pid, "").strip()
                         if val.isdigit():
                             hint_positions[pid] = int(val)
-                    self.map_hint_mapping[map_id] = hint_positions
-                    self.map_player_count[map_id] = players
                 except Exception as e:
                     print(f"[Map Hint Load Error] {e} → 行: {row}")
+                    continue
+
+                key = (map_id, players)
+                if key in self.map_hint_mapping:
+                    continue  # 同じ組み合わせの行が重複した場合は先頭行を優先
+                self.map_hint_mapping[key] = hint_positions
+                self.map_player_count.setdefault(map_id, []).append(players)
+
+                try:
+                    self.player_sets[key] = self._resolve_players(hint_positions, players)
+                except ValueError as e:
+                    self.player_set_errors[key] = str(e)
+
+    def _resolve_players(self, hint_positions, player_count):
+        """
+        冊子ページ指定をプレイヤー順のヒント情報に解決する。
+        冊子ページやヒントIDが見つからない場合は ValueError。
+        """
+        players = []
+        for book in HintLoader.BOOK_ORDER:
+            if book not in hint_positions:
+                continue
+            position = hint_positions[book]
+            if position not in self.book_orders:
+                raise ValueError(
+                    f"冊子ページ {position} が book_orders に存在しません")
+            hint_id = self.book_orders[position].get(book)
+            if hint_id not in self.generic_hints:
+                raise ValueError(
+                    f"ヒントID {hint_id} が generic_hints に存在しません")
+
+            players.append({
+                "id": f"player{len(players) + 1}",
+                "book": book,
+                "hint": self.generic_hints[hint_id]
+            })
+
+        if len(players) != player_count:
+            raise ValueError(f"{player_count}人分のプレイヤーデータが構成されませんでした")
+        return players
 
     def get_players_for_map(self, map_id, player_count):
         """
         指定マップIDとプレイヤー数に対応するプレイヤー情報のリストを返す。
+        読込時に構築した索引を引くだけなので、ファイルI/Oは発生しない。
 
         形式：
         [
-            {"id": "player1", "book": "alpha", "hint": {...}},
-            {"id": "player2", "book": "beta", "hint": {...}},
+            {"id": "player1", "book": "alpha", "hint": CompiledHint},
+            {"id": "player2", "book": "beta", "hint": CompiledHint},
             ...
         ]
         """
-        order = ["alpha", "beta", "gamma", "delta", "epsilon"]
-
-        with open(self.player_hint_csv, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                m_id = int(row["map_id"].strip())
-                p_count = int(row["players"].strip())
-                if m_id != map_id or p_count != player_count:
-                    continue
-
-                players = []
-                idx = 0
-                for book in order:
-                    val = row.get(book, "").strip()
-                    if val.isdigit():
-                        position = int(val)
-                        if position not in self.book_orders:
-                            raise ValueError(
-                                f"冊子ページ {position} が book_orders に存在しません")
-                        hint_id = self.book_orders[position].get(book)
-                        if hint_id not in self.generic_hints:
-                            raise ValueError(
-                                f"ヒントID {hint_id} が generic_hints に存在しません")
-
-                        hint = self.generic_hints[hint_id]
-                        players.append({
-                            "id": f"player{idx + 1}",
-                            "book": book,
-                            "hint": hint
-                        })
-                        idx += 1
-
-                if len(players) != player_count:
-                    raise ValueError(f"{player_count}人分のプレイヤーデータが構成されませんでした")
-
-                return players
-
-        raise ValueError(
-            f"map_id={map_id}, player_count={player_count} に一致する行が見つかりません")
+        key = (map_id, player_count)
+        players = self.player_sets.get(key)
+        if players is None:
+            if key in self.player_set_errors:
+                raise ValueError(self.player_set_errors[key])
+            raise ValueError(
+                f"map_id={map_id}, player_count={player_count} に一致する行が見つかりません")
+
+        # 呼び出し側での書き換えが索引に波及しないよう、要素 dict は複製して返す
+        return [dict(p) for p in players]
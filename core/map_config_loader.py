@@ -1,6 +1,9 @@
 import csv
 import os
 
+from core.board_template import BoardTemplate
+from core.hint_index import HintIndex
+
 
 class MapConfigLoader:
     """
@@ -8,8 +11,16 @@ class MapConfigLoader:
     - map_config.csv: 各マップIDに対応するブロック配置と回転情報
     - assets/blocks/*.csv: 各ブロックの地形・縄張り情報
     - structures.csv: 構造物の種類と配置座標を追加
+
+    起動時に読むのは map_config.csv だけで、盤面は load_map() の初回呼び出し時に組み立てる。
+    load_map() が返すセル情報はローダーのキャッシュそのものなので書き換えないこと
+    （トークンは Board の TokenLayer が持つ）。
+    ブロックCSVは1ブロックにつき1回だけ解析し、回転済みの形と合わせて不変のタプルで保持する。
     """
 
+    BLOCK_COLS = 6  # ブロック1枚の列数
+    BLOCK_ROWS = 3  # ブロック1枚の行数
+
     def __init__(self,
                  map_csv="assets/configs/map_config.csv",
                  blocks_dir="assets/blocks/",
@@ -17,14 +28,18 @@ class MapConfigLoader:
         self.map_csv = map_csv
         self.blocks_dir = blocks_dir
         self.structures_csv = structures_csv
-        self.maps = {}  # map_id → {positions, tiles}
+        self.maps = {}  # map_id → {positions, tiles}（tiles は初回 load_map 時に生成）
+
+        self._block_files = None  # 小文字ファイル名 → 実ファイル名
+        self._block_cache = {}    # ブロック名 → (rot0 のタイル列, rot1 のタイル列)
+        self._structures = None   # map_id → [((col, row), type, color), ...]
+        self._templates = {}      # map_id → BoardTemplate（load_template で生成）
 
         self._load_maps()
-        self._load_structures()
 
     def _load_maps(self):
         """
-        マップ構成CSVからブロック配置と回転を読み込み、全マップの盤面を生成する。
+        マップ構成CSVからブロック配置と回転だけを読み込む（盤面の生成は遅延）。
         """
         with open(self.map_csv, encoding="utf-8") as f:
             reader = csv.DictReader(f)
@@ -35,76 +50,140 @@ class MapConfigLoader:
                     block = row[f"pos{i}"].strip().lower()
                     rot = int(row[f"pos{i}_rot"])
                     positions.append((block, rot))
-                self.maps[mid] = {"positions": positions, "tiles": {}}
-
-        # 🔁 各マップごとの構成からブロックデータ読込 → タイル展開
-        for mid, map_info in self.maps.items():
-            for i, (block, rot) in enumerate(map_info["positions"]):
-                path = os.path.join(self.blocks_dir, f"{block}.csv")
-                if not os.path.isfile(path):
-                    continue
-
-                with open(path, encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    tiles = []
-                    for row in reader:
-                        col = int(row["col"])
-                        row_ = int(row["row"])
-                        terrain = row["terrain"].strip()
-                        territory = row.get("territory", "").strip()
-                        tiles.append({
-                            "col": col,
-                            "row": row_,
-                            "terrain": terrain,
-                            "territory": territory
-                        })
-
-                # 🔄 rot==1 の場合は180度反転（左右＋上下反転）
-                if rot == 1:
-                    tiles = [{
-                        "col": 5 - t["col"],  # 最大col=5（0-indexed）
-                        "row": 2 - t["row"],  # 最大row=2
-                        "terrain": t["terrain"],
-                        "territory": t["territory"]
-                    } for t in tiles]
-
-                # 🧮 ブロック配置位置のオフセット計算
-                col_offset = (i % 2) * 6  # 偶奇で横方向：0 or 6
-                row_offset = (i // 2) * 3  # 3行ブロックごとに上下方向：0, 3, 6
-
-                for t in tiles:
-                    col = t["col"] + col_offset
-                    row_ = t["row"] + row_offset
-                    key = (col, row_)
-                    cell = {
-                        "col": col,
-                        "row": row_,
-                        "terrain": t["terrain"],
-                        "territories": [t["territory"]] if t["territory"] else [],
-                        "structure": None,
-                        "structure_color": None,
-                        "discs": [],
-                        "cube": None
-                    }
-                    map_info["tiles"][key] = cell
+                self.maps[mid] = {"positions": positions, "tiles": None}
+
+    def _get_block(self, block):
+        """
+        ブロックの (回転なし, 180度回転) のタイル列を返す。
+        各タイルは (col, row, terrain, territory) のタプル。ファイルが無ければ None。
+        """
+        if block in self._block_cache:
+            return self._block_cache[block]
+
+        # 📁 ブロックファイル名は大文字小文字を区別しない（block_a → block_A.csv）
+        if self._block_files is None:
+            self._block_files = {}
+            if os.path.isdir(self.blocks_dir):
+                self._block_files = {name.lower(): name
+                                     for name in os.listdir(self.blocks_dir)}
+
+        filename = self._block_files.get(f"{block}.csv", f"{block}.csv")
+        path = os.path.join(self.blocks_dir, filename)
+        if not os.path.isfile(path):
+            self._block_cache[block] = None
+            return None
+
+        with open(path, encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            tiles = tuple(
+                (int(row["col"]), int(row["row"]),
+                 row["terrain"].strip(), row.get("territory", "").strip())
+                for row in reader
+            )
+
+        # 🔄 rot==1 は180度反転（左右＋上下反転）
+        rotated = tuple(
+            (MapConfigLoader.BLOCK_COLS - 1 - col, MapConfigLoader.BLOCK_ROWS - 1 - row,
+             terrain, territory)
+            for col, row, terrain, territory in tiles
+        )
+
+        self._block_cache[block] = (tiles, rotated)
+        return self._block_cache[block]
 
     def _load_structures(self):
         """
-        構造物CSVから、各マップの該当セルに構造物情報（種類／色）を追加する。
+        構造物CSVを読み込み、マップIDごとの構造物（座標／種類／色）一覧を保持する。
         """
+        self._structures = {}
         with open(self.structures_csv, encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 mid = int(row["map_id"])
                 key = (int(row["col"]), int(row["row"]))
-                if mid in self.maps and key in self.maps[mid]["tiles"]:
-                    self.maps[mid]["tiles"][key]["structure"] = row["type"].strip()
-                    self.maps[mid]["tiles"][key]["structure_color"] = row["color"].strip()
+                self._structures.setdefault(mid, []).append(
+                    (key, row["type"].strip(), row["color"].strip()))
+
+    def _assemble_map(self, map_info, map_id):
+        """ブロック配置からタイルを展開し、構造物を追加した盤面を生成する"""
+        tiles = {}
+        for i, (block, rot) in enumerate(map_info["positions"]):
+            shapes = self._get_block(block)
+            if shapes is None:
+                continue
+
+            # 🧮 ブロック配置位置のオフセット計算
+            col_offset = (i % 2) * MapConfigLoader.BLOCK_COLS  # 偶奇で横方向：0 or 6
+            row_offset = (i // 2) * MapConfigLoader.BLOCK_ROWS  # 上下方向：0, 3, 6
+
+            for col, row_, terrain, territory in shapes[1 if rot == 1 else 0]:
+                col += col_offset
+                row_ += row_offset
+                tiles[(col, row_)] = {
+                    "col": col,
+                    "row": row_,
+                    "terrain": terrain,
+                    "territories": [territory] if territory else [],
+                    "structure": None,
+                    "structure_color": None,
+                }
+
+        if self._structures is None:
+            self._load_structures()
+        for key, type_, color in self._structures.get(map_id, ()):
+            if key in tiles:
+                tiles[key]["structure"] = type_
+                tiles[key]["structure_color"] = color
+
+        return tiles
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """アセットバンドル（core.asset_bundle）から CSV を読まずに構築する"""
+        loader = cls.__new__(cls)
+        data = bundle["maps"]
+        loader.map_csv = data["map_csv"]
+        loader.blocks_dir = data["blocks_dir"]
+        loader.structures_csv = data["structures_csv"]
+        loader.maps = data["maps"]
+        loader._block_files = None
+        loader._block_cache = {}
+        loader._structures = None
+        loader._templates = {}
+        return loader
+
+    def export_bundle(self):
+        """全マップを組み立てた上で、バンドルに収録するデータを返す"""
+        for map_id in self.maps:
+            self.load_map(map_id)
+        return {
+            "map_csv": self.map_csv,
+            "blocks_dir": self.blocks_dir,
+            "structures_csv": self.structures_csv,
+            "maps": self.maps,
+        }
 
     def get_available_map_ids(self):
         """使用可能なマップID一覧を返す"""
         return sorted(self.maps.keys())
 
     def load_map(self, map_id):
-        """指定マップIDに対応するタイル情報を返す"""
-        return self.maps.get(map_id, {}).get("tiles", {})
+        """指定マップIDに対応するタイル情報を返す（初回のみ盤面を組み立てる）"""
+        map_info = self.maps.get(map_id)
+        if map_info is None:
+            return {}
+        if map_info["tiles"] is None:
+            map_info["tiles"] = self._assemble_map(map_info, map_id)
+        return map_info["tiles"]
+
+    def load_template(self, map_id, masks=None):
+        """
+        指定マップIDの BoardTemplate を返す（マップごとに1つを全ゲームで共有する）
+        masks: 初回構築時に HintIndex へ渡す構築済みのヒントマスク（アセットバンドル収録分など）
+        """
+        template = self._templates.get(map_id)
+        if template is None:
+            tiles = self.load_map(map_id)
+            template = BoardTemplate(tiles, HintIndex(tiles, masks=masks))
+            self._templates[map_id] = template
+        return template
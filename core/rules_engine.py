@@ -0,0 +1,312 @@
+from core.game_state import GameState
+
+
+class ActionResult:
+    """
+    ルールエンジンの操作結果。
+    - ok: 操作が受理されたか（False なら盤面・状態は変化していない）
+    - reason: 受理されなかった理由（RulesEngine.REASON_*）
+    - events: 操作によって起きた出来事の一覧（発生順の dict。"type" キーで種類を表す）
+    - action: 操作後にプレイヤーが行うべき操作（None なら次の行動選択）
+    - exploring: 探索の判定が途中か（RulesEngine.reveal_next() で1人ずつ進める）
+    - winner: 勝者のプレイヤーID（勝敗が決まっていなければ None）
+    """
+
+    def __init__(self, ok, reason=None, events=None):
+        self.ok = ok
+        self.reason = reason
+        self.events = events if events is not None else []
+        self.action = None
+        self.exploring = False
+        self.winner = None
+
+    def __repr__(self):
+        return (f"ActionResult(ok={self.ok}, reason={self.reason}, action={self.action}, "
+                f"exploring={self.exploring}, winner={self.winner}, events={len(self.events)})")
+
+
+class RulesEngine:
+    """
+    ターン進行のルール（質問・探索・ディスク再配置・キューブ配置・勝利判定）を
+    画面表示に依存せず処理するエンジン。GameEngine / GameState の上で動作する。
+
+    - 各操作は ActionResult（受理されたか・起きたイベント・次に行うべき操作）を返す
+    - 探索の判定は GameState.pending_explore（判定するプレイヤー順）と reveal_index で進行を保持し、
+      search(coord, step=True) なら reveal_next() で1人ずつ進められる（UI のアニメーション用）
+    - 操作ログは従来どおり GameState.log() に記録する
+    """
+
+    # 操作が受理されなかった理由
+    REASON_GAME_OVER = "game_over"              # 勝敗が決まっている
+    REASON_INVALID_COORD = "invalid_coord"      # 盤面外の座標
+    REASON_WRONG_ACTION = "wrong_action"        # 今は行えない操作
+    REASON_NOT_YOUR_TURN = "not_your_turn"      # 手番でないプレイヤーの操作
+    REASON_INVALID_TARGET = "invalid_target"    # 質問相手が不正（自分自身・存在しない）
+    REASON_CUBE_PRESENT = "cube_present"        # 既にキューブがあるマス
+    REASON_HINT_MISMATCH = "hint_mismatch"      # 自分のヒントに合致しないマスは探索できない
+    REASON_HINT_MATCHES = "hint_matches"        # 自分のヒントに合致するマスにはキューブを置けない
+    REASON_DISC_PRESENT = "disc_present"        # 既に自分のディスクがあるマス
+    REASON_EXPLORING = "exploring"              # 探索の判定中
+    REASON_NOT_EXPLORING = "not_exploring"      # 判定中の探索がない
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.board = engine.board
+        self.state = engine.state
+        self.answers = engine.answers  # 判定はすべて回答表の参照で行う
+
+    # ------------------------------------------------------------
+    # 行動
+    # ------------------------------------------------------------
+
+    def question(self, asker_id, target_id, coord):
+        """
+        質問：target のヒントが coord に当てはまるか尋ねる。
+        - 合致 → target のディスクを置いて手番終了
+        - 非合致 → target のキューブを置き、質問者が自分のキューブを置く操作（place_cube）へ
+        """
+        result = self._check(coord, GameState.ACTION_QUESTION, asker_id)
+        if result is not None:
+            return result
+        if target_id == asker_id or target_id not in self.engine.id_to_player:
+            return ActionResult(False, RulesEngine.REASON_INVALID_TARGET)
+
+        asker = self.engine.id_to_player[asker_id]
+        target = self.engine.id_to_player[target_id]
+        result = ActionResult(True)
+        result.events.append({"type": "question", "player": asker.id,
+                              "target": target.id, "coord": coord})
+
+        if self.answers.applies(target.id, coord):
+            self._place_disc(target, coord, result)
+            self.state.log(f"{asker.display_name} → {target.display_name}: 合致 → ディスク")
+            self._advance_turn(result)
+        else:
+            self._place_cube(target, coord, result)
+            self.state.log(
+                f"{asker.display_name} → {target.display_name}: 非合致 → キューブ配置へ")
+            self._require(GameState.ACTION_PLACE_CUBE, coord, result)
+        return self._finish(result)
+
+    def search(self, coord, step=False):
+        """
+        探索：手番プレイヤーが coord にディスクを置き、左隣から順に他プレイヤーが判定する。
+        - 自分のディスクが既にあるマスなら、別のマスにディスクを置く操作（place_disc）へ
+        - step=False なら判定を最後まで進める。step=True なら判定は reveal_next() で1人ずつ進める
+        """
+        current = self.engine.current_player()
+        result = self._check(coord, GameState.ACTION_SEARCH, current.id)
+        if result is not None:
+            return result
+        if not self.answers.applies(current.id, coord):
+            return ActionResult(False, RulesEngine.REASON_HINT_MISMATCH)
+
+        result = ActionResult(True)
+        result.events.append({"type": "search", "player": current.id, "coord": coord})
+
+        if self.board.has_disc(coord, current.id):
+            if self._has_disc_cell(current):
+                self.state.log(f"{current.display_name}: 既にディスク済 → 再配置")
+                self._require(GameState.ACTION_PLACE_DISC, coord, result)
+            else:
+                # 再配置できるマスが無ければそのまま判定へ
+                self.state.log(f"{current.display_name}: 既にディスク済 → 再配置先が無いため判定へ")
+                self._begin_exploration(coord, result, step)
+            return self._finish(result)
+
+        self._place_disc(current, coord, result)
+        self.state.log(f"{current.display_name}: 探索対象にディスク配置")
+        self._begin_exploration(coord, result, step)
+        return self._finish(result)
+
+    def place_disc(self, coord, step=False):
+        """
+        ディスク再配置：探索対象に既に自分のディスクがあった場合に、自分のヒントに合致する
+        別のマスへディスクを置く。置けたら探索対象（exploration_target）の判定を始める
+        （step の意味は search と同じ）。
+        """
+        current = self.engine.current_player()
+        result = self._check(coord, GameState.ACTION_PLACE_DISC, current.id)
+        if result is not None:
+            return result
+        if self.board.has_disc(coord, current.id):
+            return ActionResult(False, RulesEngine.REASON_DISC_PRESENT)
+        if not self.answers.applies(current.id, coord):
+            return ActionResult(False, RulesEngine.REASON_HINT_MISMATCH)
+
+        result = ActionResult(True)
+        self._place_disc(current, coord, result)
+        self.state.log(f"{current.display_name}: 再配置 → {coord}")
+        self._begin_exploration(self.state.exploration_target, result, step)
+        return self._finish(result)
+
+    def place_cube(self, coord):
+        """
+        キューブ配置：質問の非合致・探索の失敗の後、手番プレイヤーが
+        自分のヒントに合致しないマスにキューブを置いて手番を終える。
+        """
+        current = self.engine.current_player()
+        result = self._check(coord, GameState.ACTION_PLACE_CUBE, current.id)
+        if result is not None:
+            return result
+        if self.answers.applies(current.id, coord):
+            return ActionResult(False, RulesEngine.REASON_HINT_MATCHES)
+
+        result = ActionResult(True)
+        self._place_cube(current, coord, result)
+        self._advance_turn(result)
+        return self._finish(result)
+
+    def reveal_next(self):
+        """
+        探索の判定を1人分進める。
+        - 既にディスクがある → パス／合致 → ディスク
+        - 非合致 → キューブを置いて探索失敗、探索者のキューブ配置（place_cube）へ
+        - 全員の判定が済めば探索者の勝利
+        """
+        if self.state.pending_explore is None:
+            return ActionResult(False, RulesEngine.REASON_NOT_EXPLORING)
+        result = ActionResult(True)
+        self._reveal(result)
+        return self._finish(result)
+
+    def legal_actions(self, player_id=None):
+        """手番プレイヤー（player_id 指定時はそのプレイヤーが手番の場合のみ）が今行える操作の種類"""
+        if self.state.phase == GameState.PHASE_END or self.state.pending_explore is not None:
+            return []
+        if player_id is not None and player_id != self.state.current_player:
+            return []
+        if self.state.current_action in (GameState.ACTION_PLACE_DISC, GameState.ACTION_PLACE_CUBE):
+            return [self.state.current_action]
+        return [GameState.ACTION_QUESTION, GameState.ACTION_SEARCH]
+
+    def turn_order_from(self, start_pid):
+        """
+        探索時の順番：
+        - 探索者を起点に、左隣のプレイヤーから時計回りで並べる
+        """
+        order = self.state.players
+        idx = order.index(start_pid)
+        return order[idx + 1:] + order[:idx]
+
+    # ------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------
+
+    def _check(self, coord, action, player_id):
+        """共通の前提条件（問題なければ None、あれば不受理の ActionResult）"""
+        state = self.state
+        if state.phase == GameState.PHASE_END:
+            return ActionResult(False, RulesEngine.REASON_GAME_OVER)
+        if state.pending_explore is not None:
+            return ActionResult(False, RulesEngine.REASON_EXPLORING)
+        if player_id != state.current_player:
+            return ActionResult(False, RulesEngine.REASON_NOT_YOUR_TURN)
+
+        # 質問・探索は行動選択中（または同じ行動を選択済み）のときだけ、配置は指示されたときだけ
+        if action in (GameState.ACTION_QUESTION, GameState.ACTION_SEARCH):
+            allowed = state.current_action in (None, action)
+        else:
+            allowed = state.current_action == action
+        if not allowed:
+            return ActionResult(False, RulesEngine.REASON_WRONG_ACTION)
+
+        if not self.board.is_valid_coord(coord):
+            return ActionResult(False, RulesEngine.REASON_INVALID_COORD)
+        if self.board.cube_at(coord) is not None:
+            return ActionResult(False, RulesEngine.REASON_CUBE_PRESENT)
+        return None
+
+    def _place_disc(self, player, coord, result):
+        self.board.place_disc(coord, player.id)
+        player.add_disc()
+        result.events.append({"type": "disc", "player": player.id, "coord": coord})
+
+    def _place_cube(self, player, coord, result):
+        self.board.place_cube(coord, player.id)
+        player.add_cube()
+        result.events.append({"type": "cube", "player": player.id, "coord": coord})
+
+    def _require(self, action, coord, result):
+        """
+        手番プレイヤーに追加の操作（ディスク再配置／キューブ配置）を求める。
+        キューブを置けるマス（キューブが無く自分のヒントに合致しないマス）が1つも無ければ
+        配置を省略して手番を終える（そのままでは進行できなくなるため）。
+        """
+        self.state.exploration_target = coord
+        current = self.engine.current_player()
+        if action == GameState.ACTION_PLACE_CUBE and not self._has_cube_cell(current):
+            self.state.log(f"{current.display_name}: キューブを置けるマスが無い → 配置省略")
+            result.events.append({"type": "cube_skipped", "player": current.id})
+            self._advance_turn(result)
+            return
+        self.state.current_action = action
+        result.events.append({"type": "action", "player": current.id, "action": action})
+
+    def _has_disc_cell(self, player):
+        """player がディスクを再配置できるマスが残っているか"""
+        return self.answers.disc_mask(player.id, self.board) != 0
+
+    def _has_cube_cell(self, player):
+        """player がキューブを置けるマスが残っているか"""
+        return self.answers.cube_mask(player.id, self.board) != 0
+
+    def _advance_turn(self, result):
+        """ターンを次のプレイヤーに進める"""
+        self.engine.next_turn()
+        self.state.current_action = None
+        self.state.set_phase(GameState.PHASE_ACTIVE)
+        result.events.append({"type": "turn", "player": self.state.current_player})
+
+    def _begin_exploration(self, coord, result, step):
+        """探索対象 coord の判定を始める（探索者 → 左隣から順）"""
+        current = self.state.current_player
+        self.state.exploration_target = coord
+        self.state.pending_explore = [current] + self.turn_order_from(current)
+        self.state.reveal_index = 0
+        self.state.current_action = GameState.ACTION_SEARCH
+        if not step:
+            while self.state.pending_explore is not None:
+                self._reveal(result)
+
+    def _reveal(self, result):
+        """探索の判定を1人分進める（判定が尽きたら勝利）"""
+        state = self.state
+        coord = state.exploration_target
+        responders = state.pending_explore
+
+        if state.reveal_index >= len(responders):
+            # ✅ 全員合致 → 勝利
+            winner = self.engine.current_player()
+            state.pending_explore = None
+            state.set_phase(GameState.PHASE_END)
+            state.current_action = None
+            state.log(f"{winner.display_name}: 探索成功 → 勝利")
+            result.events.append({"type": "win", "player": winner.id, "coord": coord})
+            return
+
+        player = self.engine.id_to_player[responders[state.reveal_index]]
+        state.reveal_index += 1
+
+        if self.board.has_disc(coord, player.id):
+            # 既にディスクがある → パス
+            state.log(f"{player.display_name}: 既にディスク済 → パス")
+            result.events.append({"type": "pass", "player": player.id, "coord": coord})
+        elif self.answers.applies(player.id, coord):
+            self._place_disc(player, coord, result)
+            state.log(f"{player.display_name}: 合致 → ディスク配置")
+        else:
+            # 非合致 → 探索失敗（探索者がキューブを別マスに配置するフェーズへ）
+            self._place_cube(player, coord, result)
+            state.log(f"{player.display_name}: 非合致 → キューブ配置 → 探索終了")
+            state.pending_explore = None
+            self._require(GameState.ACTION_PLACE_CUBE, coord, result)
+
+    def _finish(self, result):
+        """操作後の状態を結果に書き込む"""
+        result.action = self.state.current_action
+        result.exploring = self.state.pending_explore is not None
+        for event in result.events:
+            if event["type"] == "win":
+                result.winner = event["player"]
+        return result
@@ -0,0 +1,75 @@
+class TokenLayer:
+    """
+    1ゲーム分のトークン配置（BoardTemplate と同じビット番号を使う）。
+    - ディスク：プレイヤーID → 置いたセルのビットセット
+    - キューブ：置かれたセルのビットセットと、ビット番号 → 置いたプレイヤーID
+    リセットはプレイヤー数、複製はプレイヤー数＋キューブ数に比例する手間で済む。
+    """
+
+    def __init__(self, player_ids=()):
+        self.player_ids = list(player_ids)
+        self.discs = {pid: 0 for pid in self.player_ids}
+        self.cube_mask = 0
+        self.cube_owner = {}
+
+    def reset(self):
+        """トークンをすべて取り除く"""
+        self.discs = {pid: 0 for pid in self.player_ids}
+        self.cube_mask = 0
+        self.cube_owner = {}
+
+    def clone(self):
+        """同じ配置の独立したコピー"""
+        layer = TokenLayer.__new__(TokenLayer)
+        layer.player_ids = list(self.player_ids)
+        layer.discs = dict(self.discs)
+        layer.cube_mask = self.cube_mask
+        layer.cube_owner = dict(self.cube_owner)
+        return layer
+
+    # ------------------------------------------------------------
+    # 配置
+    # ------------------------------------------------------------
+
+    def add_disc(self, bit, player_id):
+        """ディスクを置く（既に置いてあれば False）"""
+        bits = self.discs.get(player_id)
+        if bits is None:
+            self.player_ids.append(player_id)  # 事前に登録されていないプレイヤーは末尾に追加
+            bits = 0
+        if (bits >> bit) & 1:
+            return False
+        self.discs[player_id] = bits | (1 << bit)
+        return True
+
+    def add_cube(self, bit, player_id):
+        """キューブを置く（既に置いてあれば False）"""
+        if (self.cube_mask >> bit) & 1:
+            return False
+        self.cube_mask |= 1 << bit
+        self.cube_owner[bit] = player_id
+        return True
+
+    def remove_disc(self, bit, player_id):
+        """ディスクを取り除く（取り消し用）"""
+        self.discs[player_id] = self.discs.get(player_id, 0) & ~(1 << bit)
+
+    def remove_cube(self, bit):
+        """キューブを取り除く（取り消し用）"""
+        self.cube_mask &= ~(1 << bit)
+        self.cube_owner.pop(bit, None)
+
+    # ------------------------------------------------------------
+    # 問い合わせ
+    # ------------------------------------------------------------
+
+    def has_disc(self, bit, player_id):
+        return (self.discs.get(player_id, 0) >> bit) & 1 == 1
+
+    def discs_at(self, bit):
+        """ビット番号のセルにディスクを置いたプレイヤー（プレイヤー順）"""
+        return [pid for pid, bits in self.discs.items() if (bits >> bit) & 1]
+
+    def cube_at(self, bit):
+        """ビット番号のセルにキューブを置いたプレイヤー（無ければ None）"""
+        return self.cube_owner.get(bit)
@@ -0,0 +1,88 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy は任意依存（盤面一括評価を使う場合のみ必要）
+    np = None
+
+from core.compact_cells import CompactCells
+from core.compiled_hint import CompiledHint
+
+
+class VectorizedHintEvaluator:
+    """
+    盤面全体を NumPy 配列に載せ、ヒントを全セル一括で評価するバックエンド。
+
+    セル情報の符号化（属性コード・縄張りビット・属性値ごとのセルマスク）は CompactCells を
+    そのまま使い、ここで持つのは全セル間の Hex 距離行列（108×108）だけ。
+    セルは座標順に並ぶ（HintIndex のビット番号と同じ順序）。
+
+    evaluate() の結果はセルごとの HintEvaluator.hint_applies と完全に一致する。
+    分析・ソルバー・アセットバンドル構築など、多数のヒントをまとめて判定する用途向け。
+    """
+
+    def __init__(self, board_data):
+        if np is None:
+            raise ImportError("VectorizedHintEvaluator を使うには NumPy が必要です")
+
+        self.cells = CompactCells(board_data)
+        self.coords = self.cells.coords
+        self.index_of = self.cells.index_of
+        self.present = self._to_array(self.cells.present_mask)
+        # 地形を持つセル（地形2択はどちらの形式でも地形が文字列でないセルでは不一致）
+        self.has_terrain = np.array(self.cells.codes["terrain"], dtype=np.int16) >= 0
+
+        # 📏 全セル間の Hex 距離行列（offset → cube 変換してから各軸差分の最大値）
+        cols = np.array([c for c, _ in self.coords], dtype=np.int64)
+        rows = np.array([r for _, r in self.coords], dtype=np.int64)
+        x = cols
+        z = rows - ((cols - (cols & 1)) // 2)
+        y = -x - z
+        self.distances = np.maximum(
+            np.maximum(np.abs(x[:, None] - x[None, :]), np.abs(y[:, None] - y[None, :])),
+            np.abs(z[:, None] - z[None, :])
+        ).astype(np.int16)
+
+    def _to_array(self, mask):
+        """セルのマスク → 座標順の真偽配列"""
+        return np.array([(mask >> i) & 1 for i in range(len(self.coords))], dtype=bool)
+
+    def _target_mask(self, hint):
+        """ヒントの対象属性を持つセルの真偽配列"""
+        return self._to_array(self.cells.mask_of(hint.attribute, hint.targets))
+
+    def evaluate(self, hint):
+        """
+        ヒントを全セルに対して一括評価し、座標順の真偽配列を返す。
+        ヒントは CompiledHint / dict のどちらでもよい。
+        """
+        if not isinstance(hint, CompiledHint):
+            hint = CompiledHint.from_dict(hint)
+
+        n = len(self.coords)
+        if hint.attribute is None:
+            return np.zeros(n, dtype=bool)  # 未定義ヒントタイプは常に不一致
+
+        targets = self._target_mask(hint)
+
+        if hint.hint_type.endswith("terrain_choice"):
+            return self.has_terrain & (targets != hint.negate)
+
+        found = (self.distances[:, targets] <= hint.distance).any(axis=1)
+        return self.present & (found != hint.negate)
+
+    def evaluate_many(self, hints):
+        """複数ヒントをまとめて評価（ヒント数 × セル数 の真偽配列）"""
+        hints = list(hints)
+        if not hints:
+            return np.zeros((0, len(self.coords)), dtype=bool)
+        return np.stack([self.evaluate(hint) for hint in hints])
+
+    def to_coords(self, result):
+        """真偽配列 → 真のセル座標リスト"""
+        return [self.coords[i] for i in np.flatnonzero(result)]
+
+    def to_bitmask(self, result):
+        """真偽配列 → HintIndex と同じビット配置の整数マスク"""
+        mask = 0
+        for i in np.flatnonzero(result):
+            mask |= 1 << int(i)
+        return mask
@@ -0,0 +1,75 @@
+import random
+from collections import OrderedDict
+
+
+class ZobristKeys:
+    """
+    Zobrist ハッシュ用の 64 ビット乱数キー表（プロセス内で共有）。
+
+    - キーは (種別, 値...) の文字列から決まる乱数で、プロセスや実行をまたいでも同じ値になる
+    - トークン：("disc" / "cube", プレイヤーID) ごとにセル番号 → キーの一覧
+    - ゲーム状態：("turn", 手番インデックス) / ("action", 操作名) / ("phase", フェーズ名)
+    局面のハッシュは、該当するキーをすべて XOR したもの（置く・戻すは同じキーの XOR）。
+    """
+
+    _keys = {}        # (種別, 値...) → キー
+    _cell_keys = {}   # (種別, プレイヤーID, セル数) → セル番号ごとのキー
+
+    @classmethod
+    def key(cls, *parts):
+        """(種別, 値...) のキー"""
+        key = cls._keys.get(parts)
+        if key is None:
+            key = cls._keys[parts] = random.Random(":".join(map(str, parts))).getrandbits(64)
+        return key
+
+    @classmethod
+    def cell_keys(cls, kind, player_id, cell_count):
+        """トークン種別とプレイヤーごとの、セル番号 → キーの一覧"""
+        lookup = (kind, player_id, cell_count)
+        keys = cls._cell_keys.get(lookup)
+        if keys is None:
+            rng = random.Random(f"{kind}:{player_id}")
+            keys = cls._cell_keys[lookup] = [rng.getrandbits(64) for _ in range(cell_count)]
+        return keys
+
+
+class TranspositionTable:
+    """
+    局面ハッシュ → 評価結果の上限付きキャッシュ（最も長く使われていないものから捨てる LRU）。
+    手順が違っても同じ局面に来たときに、探索や推薦の結果を再利用するために使う。
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """key の評価結果（無ければ default）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, value):
+        """評価結果を登録する（上限を超えたら古いものを捨てる）"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,25 +1,52 @@
+import argparse
 import random
 import tkinter as tk
 from tkinter import messagebox
+from core.answer_table import AnswerTable
+from core.asset_bundle import load_asset_bundle
 from core.map_config_loader import MapConfigLoader
 from core.hint_loader import HintLoader
 from core.game_engine import GameEngine
+from core.hint_index import HintIndex
+from core.hint_deduction import HintDeduction
+from core.zobrist import TranspositionTable
+from ai.recommender import InfoGainRecommender, RecommenderWorker
 from ui.board_renderer import BoardRenderer
+from ui.board_view import BoardViewport
 from actions.phase_handler import PhaseHandler
-from utils.canvas_utils import pixel_to_cell_coord
-from ui.image_loader import load_terrain_images
-from utils.debug_utils import find_solution_tiles
-
-
-def main():
-    # 🧩 データローダーの準備
-    map_loader = MapConfigLoader()
-    hint_loader = HintLoader()
+from ui.image_loader import TerrainImageCache
+from utils.debug_utils import debug_log, find_solution_tiles
+from utils.perf_monitor import PerfMonitor
+
+
+def parse_args(argv=None):
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(description="Cryptid（ローカル対戦）")
+    parser.add_argument("--composite-static", action="store_true",
+                        help="地形・縄張り・構造物を1枚の画像に合成して描画する（Pillow が必要）")
+    parser.add_argument("--perf", action="store_true",
+                        help=f"性能計測オーバーレイを表示する（環境変数 {PerfMonitor.ENV_VAR}=1 でも可）")
+    parser.add_argument("--perf-dump", default="perf_dump.json",
+                        help="計測結果の出力先（--perf 有効時、終了時とダンプボタンで出力）")
+    parser.add_argument("--advisor", action="store_true",
+                        help="手番プレイヤー向けの推薦（ヒント）ボタンを表示する")
+    parser.add_argument("--advisor-plies", type=int, default=2,
+                        help="推薦の読みの深さ（時間切れなら浅い読みの結果を使う）")
+    return parser.parse_args(argv)
+
+
+def main(args=None):
+    args = args or parse_args()
+
+    # 🧩 データローダーの準備（CSV 更新時のみバンドルを再構築）
+    bundle = load_asset_bundle()
+    map_loader = MapConfigLoader.from_bundle(bundle)
+    hint_loader = HintLoader.from_bundle(bundle)
 
     # 🎲 使用マップとプレイヤー数の指定
     map_id = map_loader.get_available_map_ids()
     map_id = random.choice(map_id)
-    print(f"[DEBUG] 使用マップ: {map_id}")
+    debug_log(f"使用マップ: {map_id}")
     player_count = 5
     board_data = map_loader.load_map(map_id)
     raw_players = hint_loader.get_players_for_map(map_id, player_count)
@@ -36,14 +63,24 @@ def main():
         "player5": "dark magenta",
     }
 
+    # 🧮 ヒント充足索引（バンドル収録のマスクを再利用）
+    hint_index = HintIndex(board_data, hint_loader.generic_hints.values(),
+                           masks=bundle["hint_masks"].get(map_id))
+
+    # 📈 性能計測（--perf / CRYPTID_PERF=1 のときのみ。無効時は計測処理を差し込まない）
+    #    ヒントの評価はゲーム開始時の回答表の構築でだけ行うため、その所要時間を hint_eval として計る
+    perf = PerfMonitor.from_env(force=args.perf)
+    perf.instrument(AnswerTable, "__init__", "hint_eval")
+
     # 🎮 ゲームエンジンを初期化
     engine = GameEngine(player_ids, hints, board_data,
-                        label_map, color_map=preset_colors)
+                        label_map, color_map=preset_colors,
+                        hint_index=hint_index)
     engine.state.set_phase("active")
     engine.state.current_action = None
 
     sol = find_solution_tiles(engine)  # デバッグ：正解候補探索
-    print(f"[DEBUG] 正解マス:", sol)
+    debug_log(f"正解マス: {sol}")
 
     # 🖼️ TkinterウィンドウとUIの初期化
     bg_color = "gray15"
@@ -51,22 +88,19 @@ def main():
     root.title("Cryptid")
     root.configure(bg=bg_color)
 
-    # 🔧 マップサイズとUI幅の設定
-    terrain_imgs = load_terrain_images()
+    # 🔧 マップサイズとUI幅の設定（半径は初期値。ウィンドウサイズとズームに合わせて変わる）
+    image_cache = TerrainImageCache()
     radius = 50
     rows, cols = 9, 12
-    map_width_px = radius * 3/2 * cols + radius / 2
-    map_height_px = radius * (3**0.5) * (rows + 1)
-    margin_x = int(map_width_px * 0.1)
-    margin_y = int(map_height_px * 0.1)
-    canvas_width = int(map_width_px + margin_x * 2)
-    canvas_height = int(map_height_px + margin_y * 2)
+    canvas_width, canvas_height = BoardViewport.canvas_size_for(radius, rows, cols)
     info_frame_width = 200
     total_width = canvas_width + info_frame_width
     total_height = canvas_height
 
     # 🎨 ウィンドウサイズ設定
     root.geometry(f"{total_width}x{total_height}")
+    root.grid_columnconfigure(0, weight=1)
+    root.grid_rowconfigure(1, weight=1)
 
     # 🔤 ターン表示ラベル（画面上部）
     turn_label = tk.Label(root, text="", font=("Helvetica", 20), bg=bg_color)
@@ -74,7 +108,7 @@ def main():
 
     # 🧱 メイン描画フレームの定義
     main_frame = tk.Frame(root, bg=bg_color)
-    main_frame.grid(row=1, column=0, columnspan=2)
+    main_frame.grid(row=1, column=0, columnspan=2, sticky="nsew")
     main_frame.grid_columnconfigure(0, weight=1)
     main_frame.grid_rowconfigure(0, weight=1)
 
@@ -83,11 +117,24 @@ def main():
                        bg=bg_color, highlightthickness=0)
     canvas.grid(row=0, column=0, sticky="nsew")
 
-    # 🎮 BoardRenderer 初期化 → 初期描画
-    renderer = BoardRenderer(canvas=canvas, terrain_imgs=terrain_imgs,
-                             radius=radius, margin_x=margin_x, margin_y=margin_y,
-                             player_lookup=engine.id_to_player)
-    renderer.render(engine.board.tiles, rows, cols)
+    # 🎮 BoardRenderer 初期化 → 初期描画（半径・余白・地形画像はビューポートが設定する）
+    renderer = BoardRenderer(canvas=canvas, terrain_imgs={},
+                             radius=radius, player_lookup=engine.id_to_player,
+                             composite_static=args.composite_static, image_cache=image_cache)
+
+    # 🔍 ズーム・パン・ウィンドウサイズ変更（配置し直すたびに当たり判定も作り直す）
+    viewport = BoardViewport(canvas, renderer, image_cache, engine.board.tiles.keys(),
+                             rows, cols,
+                             redraw=lambda: renderer.render(engine.board.tiles, rows, cols))
+    viewport.layout(canvas_width, canvas_height)
+    viewport.bind(root)
+
+    def on_layout(view):
+        # 初回の配置は上で済んでいるので、ここに来るのはハンドラー生成後のサイズ変更・ズームのみ
+        handler.radius = view.radius
+        handler.terrain_imgs = renderer.terrain_imgs
+
+    viewport.on_layout = on_layout
 
     # 📋 情報パネル（右側：ボタンとラベル群）
     info_frame = tk.Frame(main_frame, width=info_frame_width, bg=bg_color)
@@ -108,6 +155,18 @@ def main():
         state = tk.NORMAL if enabled else tk.DISABLED
         question_btn.config(state=state)
         search_btn.config(state=state)
+        update_advice_button()
+
+    def update_advice_button():
+        """
+        推薦（ヒント）ボタンは行動選択中（質問・探索を選べる状態）で、計算中でないときだけ有効
+        """
+        if advisor is None:
+            return
+        state = engine.state
+        allowed = (state.phase == "active" and state.current_action is None
+                   and not handler.search_active and not advice_pending["future"])
+        advice_btn.config(state=tk.NORMAL if allowed else tk.DISABLED)
 
     def set_phase(phase_type):
         """
@@ -117,6 +176,7 @@ def main():
 
         engine.state.current_action = phase_type
         handler.update_turn_label()
+        update_advice_button()
 
         pid = engine.state.current_player
         turn_label.config(text=f"{label_map[pid]} - {phase_type}フェーズ",
@@ -133,6 +193,22 @@ def main():
     question_btn.pack(pady=5)
     search_btn.pack(pady=5)
 
+    # ↩️ 取り消し／やり直し（誤クリックの訂正用。Ctrl+Z / Ctrl+Y でも可）
+    history_frame = tk.Frame(button_frame, bg=bg_color)
+    history_frame.pack(pady=5)
+    undo_btn = tk.Button(history_frame, text="元に戻す", state=tk.DISABLED,
+                         command=lambda: handler.undo(),
+                         width=7, bg="alice blue",
+                         relief="flat", borderwidth=0, highlightthickness=0)
+    redo_btn = tk.Button(history_frame, text="やり直し", state=tk.DISABLED,
+                         command=lambda: handler.redo(),
+                         width=7, bg="alice blue",
+                         relief="flat", borderwidth=0, highlightthickness=0)
+    undo_btn.pack(side="left", padx=2)
+    redo_btn.pack(side="left", padx=2)
+    root.bind("<Control-z>", lambda event: handler.undo())
+    root.bind("<Control-y>", lambda event: handler.redo())
+
     # 🎤 プレイヤーラベル生成関数と表示群
     def create_label(pid, is_active):
         weight = "bold" if is_active else "normal"
@@ -159,30 +235,152 @@ def main():
 
     # 🧭 フェーズハンドラー初期化（ターン制御）
     handler = PhaseHandler(engine, canvas, root, turn_label,
-                           terrain_imgs, radius, rows, cols,
+                           renderer.terrain_imgs, radius, rows, cols,
                            renderer, update_labels=update_player_labels)
     handler.enable_buttons = lambda: set_buttons_enabled(True)
     handler.disable_buttons = lambda: set_buttons_enabled(False)
 
+    def update_history_buttons():
+        undo_btn.config(state=tk.NORMAL if handler.can_undo() else tk.DISABLED)
+        redo_btn.config(state=tk.NORMAL if handler.can_redo() else tk.DISABLED)
+        if advisor is not None:
+            renderer.mark_cell(None)  # 盤面が変わったので推薦は消す
+            advice_label.config(text="")
+        update_advice_button()
+
+    handler.history_changed = update_history_buttons
+
+    advisor = None  # 推薦の計算ワーカー（--advisor 有効時に用意）
+    advice_pending = {"future": None}  # 計算中の推薦
+
+    # 📈 描画・クリック処理の計測
+    perf.instrument(renderer, "render")
+    perf.instrument(handler, "handle_click")
+    handler.perf = perf
+
+    if perf.enabled:
+        perf_label = tk.Label(inner_wrapper, text="", font=("Courier", 8),
+                              fg="gray70", bg=bg_color, justify="left",
+                              wraplength=info_frame_width - 10)
+        perf_label.pack(pady=(10, 0))
+        tk.Button(inner_wrapper, text="計測ダンプ",
+                  command=lambda: perf.dump(args.perf_dump),
+                  width=10, bg="alice blue",
+                  relief="flat", borderwidth=0, highlightthickness=0).pack(pady=5)
+
+        def refresh_perf_overlay():
+            perf.set_gauge("canvas_items", len(canvas.find_all()))
+            perf_label.config(text="\n".join(perf.report_lines()))
+            root.after(500, refresh_perf_overlay)
+
+        refresh_perf_overlay()
+
+    # 💡 推薦（--advisor のときのみ。計算は別スレッドで行い、結果は after() で受け取る）
+    #    結果は局面ハッシュごとに保持し、取り消し等で同じ局面に戻ったら計算し直さない
+    if args.advisor:
+        deduction = HintDeduction(hint_index, hint_loader.generic_hints.values(), player_ids)
+        deduction.attach(engine.board)
+        advisor = RecommenderWorker()
+        advice_cache = TranspositionTable(max_entries=256)
+        advice_label = tk.Label(inner_wrapper, text="", font=("Helvetica", 10),
+                                fg="cyan", bg=bg_color, justify="left",
+                                wraplength=info_frame_width - 10)
+
+        def wait_advice(future, position):
+            if not future.done():
+                root.after(50, wait_advice, future, position)
+                return
+            advice_pending["future"] = None
+            update_advice_button()
+            advice_cache.put(position, future.result())
+            if advice_key() == position:  # 計算中に局面が変わっていなければ表示
+                show_advice(future.result())
+
+        def show_advice(ranking):
+            if not ranking:
+                advice_label.config(text="推薦できる行動がありません")
+                return
+            lines = []
+            for rank, r in enumerate(ranking, start=1):
+                if r.target:
+                    action = f"質問 {label_map[r.target]}"
+                else:
+                    action = f"探索（勝率 {r.win_prob * 100:.0f}%）"
+                lines.append(f"{rank}. {action} {r.coord} +{r.score:.2f}bit")
+            advice_label.config(text="\n".join(lines))
+            renderer.mark_cell(ranking[0].coord)
+
+        def advice_key():
+            # トークン配置・手番・操作・フェーズを含む局面ハッシュで引く
+            return engine.position_hash()
+
+        def request_advice():
+            state = engine.state
+            if (state.phase != "active" or state.current_action is not None
+                    or handler.search_active or advice_pending["future"]):
+                return  # 質問・探索を選べる状態でなければ推薦しない
+            position = advice_key()
+            ranking = advice_cache.get(position)
+            if ranking is not None:
+                show_advice(ranking)
+                return
+            recommender = InfoGainRecommender.for_current_player(
+                engine, deduction, plies=args.advisor_plies)
+            advice_pending["future"] = advisor.submit(recommender)
+            update_advice_button()
+            advice_label.config(text="計算中…")
+            wait_advice(advice_pending["future"], position)
+
+        advice_btn = tk.Button(inner_wrapper, text="ヒント", command=request_advice,
+                               width=10, bg="alice blue",
+                               relief="flat", borderwidth=0, highlightthickness=0)
+        advice_btn.pack(pady=5)
+        advice_label.pack(pady=(0, 10))
+        update_advice_button()
+
     # 🖱️ マスクリック処理（座標変換 → フェーズ処理へ委譲）
     def on_click(event):
-        coord = pixel_to_cell_coord(event.x, event.y,
-                                    radius, margin_x=margin_x, margin_y=margin_y)
-        print(f"[DEBUG] マスクリック: ({event.x}, {event.y}) → {coord}")
-        handler.handle_click(coord)
+        coord = viewport.pixel_to_coord(event.x, event.y)
+        debug_log(f"マスクリック: ({event.x}, {event.y}) → {coord}")
+        if coord is not None:
+            if advisor is not None:
+                renderer.mark_cell(None)
+                advice_label.config(text="")
+            perf.mark_input()
+            handler.handle_click(coord)
+            canvas.after_idle(perf.mark_painted)
 
     canvas.bind("<Button-1>", on_click)
 
     # 🖱️ ホバー処理（マス座標に応じてハイライト表示）
-    def on_motion(event):
-        coord = pixel_to_cell_coord(event.x, event.y,
-                                    radius, margin_x=margin_x, margin_y=margin_y)
-        if engine.board.is_valid_coord(coord):
+    # モーションイベントは最新位置だけを保持し、1フレームに1回だけ反映する
+    frame_ms = 16
+    pending_motion = {"pos": None, "job": None}
+
+    def apply_motion():
+        pending_motion["job"] = None
+        if pending_motion["pos"] is None:
+            renderer.clear_highlight()
+            return
+        coord = viewport.pixel_to_coord(*pending_motion["pos"])
+        if coord is not None:
             renderer.highlight_cell(coord)
         else:
             renderer.clear_highlight()
 
+    def schedule_motion(pos):
+        pending_motion["pos"] = pos
+        if pending_motion["job"] is None:
+            pending_motion["job"] = canvas.after(frame_ms, apply_motion)
+
+    def on_motion(event):
+        schedule_motion((event.x, event.y))
+
+    def on_leave(event):
+        schedule_motion(None)
+
     canvas.bind("<Motion>", on_motion)
+    canvas.bind("<Leave>", on_leave)
 
     # 🧠 初期ターン表示
     pid = engine.state.current_player
@@ -193,6 +391,11 @@ def main():
     # 🚀 メインループ開始
     root.mainloop()
 
+    if advisor is not None:
+        advisor.shutdown()
+    if perf.enabled:
+        perf.dump(args.perf_dump)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,248 @@
+"""
+モンテカルロ自己対戦シミュレータ：画面なしのルールエンジン（RulesEngine）でボット同士に
+最後まで対戦させ、処理性能（ゲーム数／秒）と各パズルのバランス統計を集計する。
+
+- 対象は各マップID × プレイヤー人数（3〜5人）の組み合わせ
+- 組み合わせ・ゲーム番号・シードからゲームごとの乱数を決めるため、並列数によらず結果は再現する
+- 組み合わせ単位でプロセスプールに分散する
+
+使用例:
+    python simulate.py --games 50
+    python simulate.py --games 20 --bots heuristic,random --players 4 --workers 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from ai.bots import BOTS
+from core.asset_bundle import load_asset_bundle
+from core.game_engine import GameEngine
+from core.game_state import GameState
+from core.hint_deduction import HintDeduction
+from core.hint_loader import HintLoader
+from core.map_config_loader import MapConfigLoader
+from core.rules_engine import RulesEngine
+from utils.debug_utils import set_debug
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+BUNDLE_PATH = os.path.join(ASSETS_DIR, ".cache", "assets.bundle")
+MAX_ACTIONS = 2000  # 1ゲームの操作数の上限（決着しないボットの暴走防止）
+
+# ワーカープロセスごとに1度だけ読み込むデータ
+_bundle = None
+_map_loader = None
+_hint_loader = None
+
+
+def _init_worker():
+    """プロセスプールの初期化：アセットバンドルを読み込み、デバッグ出力を止める"""
+    global _bundle, _map_loader, _hint_loader
+    set_debug(False)
+    _bundle = load_asset_bundle(ASSETS_DIR, BUNDLE_PATH)
+    _map_loader = MapConfigLoader.from_bundle(_bundle)
+    _hint_loader = HintLoader.from_bundle(_bundle)
+
+
+def list_combinations(maps=None, player_counts=None):
+    """シミュレーション対象の (map_id, プレイヤー数) 一覧"""
+    if _hint_loader is None:
+        _init_worker()
+    return sorted((map_id, players) for map_id, players in _hint_loader.map_hint_mapping
+                  if (maps is None or map_id in maps)
+                  and (player_counts is None or players in player_counts))
+
+
+def play_game(map_id, player_count, bot_names, rng):
+    """
+    1ゲームを最後まで対戦させる。
+    Returns:
+        dict: winner_seat（0始まり。決着しなければ None）/ turns / actions
+    """
+    players = _hint_loader.get_players_for_map(map_id, player_count)
+    # 盤面テンプレートはマップごとに共有（トークンはゲームごとの TokenLayer に載る）
+    template = _map_loader.load_template(map_id, masks=_bundle["hint_masks"].get(map_id))
+    hint_index = template.hint_index
+    engine = GameEngine([p["id"] for p in players], [p["hint"] for p in players], template)
+    engine.state.set_phase(GameState.PHASE_ACTIVE)
+    rules = RulesEngine(engine)
+
+    seats = {pid: seat for seat, pid in enumerate(engine.state.players)}
+    bot_classes = {pid: BOTS[bot_names[seat % len(bot_names)]] for pid, seat in seats.items()}
+
+    # 推理を使うボットがいれば、盤面に推理サービスを登録して共有する
+    deduction = None
+    if any(cls.uses_deduction for cls in bot_classes.values()):
+        deduction = HintDeduction(hint_index, _hint_loader.generic_hints.values(),
+                                  engine.state.players)
+        deduction.attach(engine.board)
+    bots = {pid: cls(pid, rng, deduction=deduction) if cls.uses_deduction else cls(pid, rng)
+            for pid, cls in bot_classes.items()}
+
+    turns = 1
+    for actions in range(1, MAX_ACTIONS + 1):
+        pid = engine.state.current_player
+        name, *args = bots[pid].choose(rules)
+        if name == GameState.ACTION_QUESTION:
+            result = rules.question(pid, *args)
+        else:
+            result = getattr(rules, name)(*args)
+        if not result.ok:
+            raise RuntimeError(f"ボット {bots[pid].name} の不正な操作: {name}{tuple(args)} → {result.reason}")
+
+        turns += sum(1 for event in result.events if event["type"] == "turn")
+        if result.winner is not None:
+            return {"winner_seat": seats[result.winner], "turns": turns, "actions": actions}
+    return {"winner_seat": None, "turns": turns, "actions": MAX_ACTIONS}
+
+
+def simulate_combination(task):
+    """
+    1つの (map_id, プレイヤー数) について games 回対戦させる（プロセスプールのワーカーで実行）。
+    ゲームごとの乱数は (seed, map_id, プレイヤー数, ゲーム番号) から決める。
+    """
+    (map_id, player_count), games, bot_names, seed = task
+    if _hint_loader is None:
+        _init_worker()
+
+    start = time.perf_counter()
+    results = []
+    for game in range(games):
+        rng = random.Random(f"{seed}:{map_id}:{player_count}:{game}")
+        results.append(play_game(map_id, player_count, bot_names, rng))
+    return {"map_id": map_id, "players": player_count, "games": results,
+            "elapsed": time.perf_counter() - start}
+
+
+def percentile(ordered, p):
+    """昇順に並んだ値の p パーセンタイル"""
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def summarize(combo_results, wall_time):
+    """組み合わせごとの結果を集計する"""
+    games = [g for r in combo_results for g in r["games"]]
+    turns = sorted(g["turns"] for g in games)
+
+    wins_by_count = defaultdict(Counter)   # プレイヤー数 → 席順ごとの勝利数
+    games_by_count = Counter()
+    for r in combo_results:
+        games_by_count[r["players"]] += len(r["games"])
+        for g in r["games"]:
+            if g["winner_seat"] is not None:
+                wins_by_count[r["players"]][g["winner_seat"]] += 1
+
+    per_combo = []
+    for r in combo_results:
+        combo_turns = sorted(g["turns"] for g in r["games"])
+        per_combo.append({
+            "map_id": r["map_id"], "players": r["players"], "games": len(r["games"]),
+            "mean_turns": sum(combo_turns) / len(combo_turns) if combo_turns else 0,
+            "p90_turns": percentile(combo_turns, 90),
+            "unfinished": sum(1 for g in r["games"] if g["winner_seat"] is None),
+        })
+
+    return {
+        "games": len(games),
+        "wall_time": wall_time,
+        "games_per_sec": len(games) / wall_time if wall_time else 0.0,
+        "actions_per_sec": sum(g["actions"] for g in games) / wall_time if wall_time else 0.0,
+        "unfinished": sum(1 for g in games if g["winner_seat"] is None),
+        "turns": {
+            "mean": sum(turns) / len(turns) if turns else 0,
+            "p10": percentile(turns, 10), "p50": percentile(turns, 50),
+            "p90": percentile(turns, 90), "max": turns[-1] if turns else 0,
+            "histogram": dict(sorted(Counter(turns).items())),
+        },
+        "seat_win_rates": {
+            count: [wins_by_count[count][seat] / games_by_count[count] for seat in range(count)]
+            for count in sorted(games_by_count)
+        },
+        "combinations": per_combo,
+    }
+
+
+def run_simulation(games=20, bot_names=("heuristic",), seed=0, maps=None, player_counts=None,
+                   workers=None):
+    """全組み合わせで games 回ずつ対戦させて集計結果を返す（workers=1 なら逐次実行）"""
+    for name in bot_names:
+        if name not in BOTS:
+            raise ValueError(f"不明なボット: '{name}'（{', '.join(BOTS)} から選択）")
+
+    combos = list_combinations(maps, player_counts)
+    tasks = [(combo, games, list(bot_names), seed) for combo in combos]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [simulate_combination(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(simulate_combination, tasks))
+    return summarize(results, time.perf_counter() - start)
+
+
+def print_report(summary):
+    """集計結果の表示"""
+    t = summary["turns"]
+    print(f"🎲 {summary['games']} ゲーム / {summary['wall_time']:.2f} 秒 → "
+          f"{summary['games_per_sec']:.1f} ゲーム/秒（{summary['actions_per_sec']:.0f} 操作/秒）")
+    if summary["unfinished"]:
+        print(f"⚠️ 上限 {MAX_ACTIONS} 操作で決着しなかったゲーム: {summary['unfinished']}")
+    print(f"⏱ ターン数: 平均 {t['mean']:.1f} / p10 {t['p10']} / p50 {t['p50']} / "
+          f"p90 {t['p90']} / 最大 {t['max']}")
+
+    print("🏆 席順ごとの勝率:")
+    for count, rates in summary["seat_win_rates"].items():
+        cells = "  ".join(f"{seat + 1}番手 {rate * 100:5.1f}%" for seat, rate in enumerate(rates))
+        print(f"  {count}人: {cells}")
+
+    print("🗺 組み合わせごとの平均ターン数:")
+    for c in summary["combinations"]:
+        note = f"（未決着 {c['unfinished']}）" if c["unfinished"] else ""
+        print(f"  map_id={c['map_id']:>2}, players={c['players']} → "
+              f"平均 {c['mean_turns']:.1f} / p90 {c['p90_turns']}{note}")
+
+
+def parse_args(argv=None):
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(description="ボット同士の自己対戦シミュレーション")
+    parser.add_argument("--games", type=int, default=20,
+                        help="組み合わせごとの対戦数")
+    parser.add_argument("--bots", default="heuristic",
+                        help=f"席順に割り当てるボット（カンマ区切り、足りない席は繰り返し。{', '.join(BOTS)}）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("--maps", type=int, nargs="*", default=None, help="対象のマップID（省略時は全て）")
+    parser.add_argument("--players", type=int, nargs="*", default=None,
+                        help="対象のプレイヤー人数（省略時は 3〜5 人すべて）")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="並列ワーカー数（1 なら逐次実行、省略時は CPU 数）")
+    parser.add_argument("--json", default=None, help="集計結果を JSON で書き出すパス")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        summary = run_simulation(args.games, args.bots.split(","), args.seed,
+                                 args.maps, args.players, args.workers)
+    except ValueError as e:
+        print(f"[Simulate Error] {e}")
+        return 2
+
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return 1 if summary["unfinished"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from ai.bots import HeuristicBot, InfoGainBot
+from ai.recommender import InfoGainRecommender
+from core.hint_deduction import HintDeduction
+from utils.debug_utils import find_solution_tiles
+
+
+@pytest.fixture
+def new_deduction(loaders):
+    """new_deduction(engine)：汎用ヒント全体を候補とした推理サービスを盤面に登録する関数"""
+    _, hint_loader = loaders
+
+    def factory(engine):
+        deduction = HintDeduction(engine.board.hint_index, hint_loader.generic_hints.values(),
+                                  engine.state.players)
+        deduction.attach(engine.board)
+        return deduction
+    return factory
+
+
+def test_tokens_narrow_candidates(new_game, new_deduction):
+    engine, rules = new_game(map_id=2, player_count=3)
+    deduction = new_deduction(engine)
+    board = engine.board
+    target = engine.players[1]
+    total = len(deduction.hints)
+    assert deduction.candidate_count(target.id) == total
+    assert len(deduction.answer_cells()) == len(board.tiles)
+
+    # ディスク → そのマスで成り立つヒントだけが残る
+    coord = next(c for c in sorted(board.tiles) if board.apply_hint(c, target.hint))
+    board.place_disc(coord, target.id)
+    remaining = deduction.candidate_hints(target.id)
+    assert 0 < len(remaining) < total
+    assert all(board.apply_hint(coord, hint) for hint in remaining)
+
+    # キューブ → そのマスで成り立たないヒントだけが残り、正解候補からも外れる
+    other = next(c for c in sorted(board.tiles) if not board.apply_hint(c, target.hint))
+    board.place_cube(other, target.id)
+    assert all(not board.apply_hint(other, hint) for hint in deduction.candidate_hints(target.id))
+    assert other not in deduction.answer_cells()
+
+    # トークンを全て取り除くと推理も初期状態に戻る
+    engine.reset_game()
+    assert deduction.candidate_count(target.id) == total
+
+
+def test_deduction_stays_consistent_through_games(new_game, new_deduction, play):
+    for map_id, player_count in ((1, 3), (7, 4), (12, 5)):
+        engine, rules = new_game(map_id=map_id, player_count=player_count)
+        deduction = new_deduction(engine)
+        solution = find_solution_tiles(engine)[0]
+        rng = random.Random(map_id)
+        bots = {pid: HeuristicBot(pid, rng) for pid in engine.state.players}
+
+        def check():
+            # 本当のヒントと正解マスは常に候補に残っている
+            for player in engine.players:
+                assert deduction.candidates[player.id] & deduction.hint_bit(player.hint)
+            assert solution in deduction.answer_cells()
+
+        play(rules, bots, after_step=check)
+
+        # 途中から登録しても、逐次更新した結果と一致する
+        replay = new_deduction(engine)
+        assert replay.candidates == deduction.candidates
+        assert replay.answer_mask() == deduction.answer_mask()
+
+
+def test_recommender_ranks_legal_moves(new_game, new_deduction):
+    engine, rules = new_game(map_id=4, player_count=4)
+    deduction = new_deduction(engine)
+    recommender = InfoGainRecommender.for_current_player(engine, deduction, plies=2, time_budget=2.0)
+    ranking = recommender.rank()
+    assert ranking
+    assert all(a.score >= b.score for a, b in zip(ranking, ranking[1:]))
+
+    # 推薦手はすべてルールエンジンが受け付ける
+    pid = engine.state.current_player
+    for r in ranking:
+        if r.action == "question":
+            assert r.target != pid and not engine.board.tiles[r.coord].get("cube")
+        else:
+            assert engine.board.apply_hint(r.coord, engine.current_player().hint)
+    best = ranking[0]
+    result = rules.question(pid, best.target, best.coord) if best.target else rules.search(best.coord)
+    assert result.ok
+
+
+def test_rollback_restores_candidates(new_game, new_deduction, act):
+    engine, rules = new_game(map_id=8, player_count=4)
+    deduction = new_deduction(engine)
+    rng = random.Random(3)
+    bots = {pid: HeuristicBot(pid, rng) for pid in engine.state.players}
+
+    # 試して戻す：控えに戻すと推理の候補も元通りになる
+    while engine.state.phase != "end":
+        choice = bots[engine.state.current_player].choose(rules)
+        snapshot = engine.snapshot()
+        before = dict(deduction.candidates)
+        assert act(rules, choice).ok
+        engine.restore(snapshot)
+        assert deduction.candidates == before
+
+        assert act(rules, choice).ok
+
+
+def test_infogain_bot_reuses_moves_for_repeated_positions(new_game, new_deduction, act):
+    engine, rules = new_game(map_id=4, player_count=3)
+    deduction = new_deduction(engine)
+    pid = engine.state.current_player
+    bot = InfoGainBot(pid, random.Random(0), deduction=deduction)
+
+    # 試して戻すと同じ局面に戻るので、2回目は表から同じ手を返す
+    choice = bot.choose(rules)
+    snapshot = engine.snapshot()
+    assert act(rules, choice).ok
+    engine.restore(snapshot)
+    assert bot.choose(rules) == choice
+    assert bot.table.hits == 1 and len(bot.table) == 1
@@ -1,92 +1,176 @@
+import argparse
+import os
+import sys
+import time
 from collections import defaultdict
-from core.board_loader import load_blocks, assemble_board
-from core.map_config_loader import load_map_configs
-from core.hint_loader import load_book_orders, load_generic_hints, load_map_player_hints
-from core.hint_engine import apply_hint
+from concurrent.futures import ProcessPoolExecutor
 
-# 定数定義：ブロック構成やディレクトリパス
-BLOCK_DIR = "assets/blocks"
-CONFIG_DIR = "assets/configs"
-BLOCK_COLS = 2
-BLOCK_ROWS = 3
+from core.asset_bundle import build_hint_masks, create_csv_loaders
+from core.compiled_hint import CompiledHint
+from core.game_engine import GameEngine
+from core.hint_evaluator import HintEvaluator
+from core.hint_index import HintIndex
+from core.vectorized_evaluator import VectorizedHintEvaluator, np
 
+# 定数定義：アセットのディレクトリパス（実行時のカレントディレクトリに依存しない）
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 
-def validate_all_map_hints():
+# ワーカープロセスごとに1度だけ構築するローダー
+_map_loader = None
+_hint_loader = None
+
+
+def _init_worker():
+    """プロセスプールの初期化：ワーカーごとにローダーを用意"""
+    global _map_loader, _hint_loader
+    _map_loader, _hint_loader = create_csv_loaders(ASSETS_DIR)
+
+
+def list_combinations():
+    """map_player_hints.csv に定義された (map_id, プレイヤー数) の組み合わせ一覧"""
+    if _hint_loader is None:
+        _init_worker()
+    return sorted(_hint_loader.map_hint_mapping)
+
+
+def check_combination(combo):
+    """
+    1つの (map_id, プレイヤー数) について、全プレイヤーのヒントに合致する
+    正解候補セルを求める。
+
+    Returns:
+        dict: map_id / players / hint_ids / solutions / error / elapsed（秒）
+    """
+    map_id, player_count = combo
+    if _map_loader is None:
+        _init_worker()
+
+    start = time.perf_counter()
+    result = {"map_id": map_id, "players": player_count,
+              "hint_ids": [], "solutions": [], "error": None}
+    try:
+        players = _hint_loader.get_players_for_map(map_id, player_count)
+        board_data = _map_loader.load_map(map_id)
+        if not board_data:
+            raise ValueError(f"map_id={map_id} の盤面が空です")
+
+        hints = [p["hint"] for p in players]
+        index = HintIndex(board_data)
+        result["hint_ids"] = [getattr(h, "hint_id", None) for h in hints]
+        result["solutions"] = index.coords_in(index.combined_mask(hints))
+    except ValueError as e:
+        result["error"] = str(e)
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def validate_all_map_hints(workers=None, verbose=True):
     """
     各マップID × プレイヤー人数の組み合わせに対して、
-    ヒントを順に適用し、最終的な正解候補タイル数を検証する。
+    ヒントを適用した最終的な正解候補タイル数を検証する。
 
-    - 候補数が1でないケースを収集して報告する。
-    - 想定通りにヒントが定義・機能しているかどうかを確認できる。
+    - 組み合わせごとの判定はプロセスプールで並列実行する（workers=1 なら逐次実行）
+    - 候補数が1でないケース・構成エラーを収集して報告する
+
+    Returns:
+        list[dict]: 正解が1つでない（またはエラーになった）組み合わせの結果
     """
-    blocks = load_blocks(BLOCK_DIR)
-    maps = load_map_configs(CONFIG_DIR)
-    book_orders = load_book_orders(CONFIG_DIR)
-    hints_def = load_generic_hints(CONFIG_DIR)
-    mp_hints = load_map_player_hints(CONFIG_DIR)
-
-    summary = defaultdict(list)  # 候補数 → [(map_id, players, hint_ids), ...]
-
-    for row in mp_hints:
-        map_id = row["map_id"]
-        players = row["players"]
-        map_info = maps.get(map_id)
-        if not map_info:
-            continue  # 無効な map_id はスキップ
-
-        # 冊子位置(position)と対応する列(label)を順に取得
-        labels = ["alpha", "beta", "gamma", "delta", "epsilon"]
-        pos_col_pairs = []
-        for label in labels:
-            if len(pos_col_pairs) >= players:
-                break
-            pos = row.get(label)
-            if pos is not None:
-                pos_col_pairs.append((pos, label))
-
-        # 各プレイヤーから使用するヒントIDを取得
-        hint_ids = []
-        for pos, col in pos_col_pairs:
-            book = book_orders.get(pos)
-            if book and col in book and book[col]:
-                hint_ids.append(book[col])
-
-        # ヒントIDに対応するヒント定義を取得
-        hints = []
-        for hid in hint_ids:
-            h = next((h for h in hints_def if h["hint_id"] == hid), None)
-            if h:
-                hints.append(h)
-
-        # 盤面データ生成（構造物含む）
-        board_data = assemble_board(
-            blocks, map_info["blocks"], BLOCK_COLS, BLOCK_ROWS)
-        for s in map_info.get("structures", []):
-            key = (s["col"], s["row"])
-            if key in board_data:
-                board_data[key]["structure"] = s["type"]
-                board_data[key]["structure_color"] = s["color"]
-
-        # ヒントを順次適用して候補を絞り込む
-        candidates = set(board_data.keys())
-        for h in hints:
-            candidates = apply_hint(board_data, h, candidates)
-
-        # 結果を記録：正解タイルが一意でなければログに追加
-        n = len(candidates)
-        if n != 1:
-            summary[n].append((map_id, players, hint_ids))
-
-    # サマリ出力
-    if not summary:
-        print("🎉 全ての map_id / players 組み合わせで正解タイルが1つでした！")
+    combos = list_combinations()
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = [check_combination(c) for c in combos]
     else:
-        print("\n✅ 正解が1つでないケース:")
-        for n, items in sorted(summary.items()):
-            print(f"候補数={n} のケース数={len(items)}")
-            for mid, p, hids in items:
-                print(f"  map_id={mid}, players={p} → hints={hids}")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(check_combination, combos))
+
+    total = time.perf_counter() - start
+    failures = [r for r in results if r["error"] or len(r["solutions"]) != 1]
+
+    if verbose:
+        print("⏱ 組み合わせごとの判定時間:")
+        for r in results:
+            status = r["error"] or f"候補数={len(r['solutions'])}"
+            print(f"  map_id={r['map_id']:>2}, players={r['players']} → "
+                  f"{status} ({r['elapsed'] * 1000:.2f} ms)")
+        print(f"合計: {len(results)} 組み合わせ / {total * 1000:.1f} ms")
+
+        # サマリ出力
+        if not failures:
+            print("🎉 全ての map_id / players 組み合わせで正解タイルが1つでした！")
+        else:
+            summary = defaultdict(list)  # 候補数（またはエラー） → 結果リスト
+            for r in failures:
+                summary["エラー" if r["error"] else len(r["solutions"])].append(r)
+            print("\n✅ 正解が1つでないケース:")
+            for key, items in sorted(summary.items(), key=lambda kv: str(kv[0])):
+                print(f"候補数={key} のケース数={len(items)}")
+                for r in items:
+                    detail = r["error"] or f"hints={r['hint_ids']} → {r['solutions']}"
+                    print(f"  map_id={r['map_id']}, players={r['players']} → {detail}")
+
+    return failures
+
+
+def test_all_map_hints_have_unique_solution():
+    """全組み合わせで正解タイルがちょうど1つであること（pytest から実行）"""
+    assert validate_all_map_hints(workers=1, verbose=False) == []
+
+
+def test_mask_fast_path_matches_cell_evaluator(loaders):
+    """CompactCells 上のマスク判定がセル単位の判定（HintEvaluator）と一致すること"""
+    map_loader, hint_loader = loaders
+    hints = _hints_with_negations(hint_loader)
+
+    for map_id in map_loader.get_available_map_ids():
+        board_data = map_loader.load_map(map_id)
+        index = HintIndex(board_data)
+        for hint in hints:
+            expected = [coord for coord in index.coords
+                        if HintEvaluator.hint_applies(board_data[coord], hint, board_data)]
+            assert index.coords_in(hint.mask_on(index.cells)) == expected, (map_id, hint)
+
+        # 盤面のセルビューは元のセル情報と同じ値を返す
+        engine = GameEngine(["p1"], [hints[0]], board_data, hint_index=index)
+        for coord, cell in board_data.items():
+            view = engine.board.tiles[coord]
+            assert view.to_dict() == dict(cell, discs=[], cube=None)
+
+
+def test_vectorized_evaluator_matches_cell_evaluator(loaders):
+    """NumPy の一括評価（VectorizedHintEvaluator）がセル単位の判定と一致すること"""
+    import pytest  # スクリプトとして直接実行する場合は pytest を要求しない
+    if np is None:
+        pytest.skip("NumPy が無い環境では一括評価バックエンドを使わない")
+    map_loader, hint_loader = loaders
+    hints = _hints_with_negations(hint_loader)
+
+    for map_id in map_loader.get_available_map_ids():
+        board_data = map_loader.load_map(map_id)
+        evaluator = VectorizedHintEvaluator(board_data)
+        for hint in hints:
+            expected = [coord for coord in evaluator.coords
+                        if HintEvaluator.hint_applies(board_data[coord], hint, board_data)]
+            assert evaluator.to_coords(evaluator.evaluate(hint)) == expected, (map_id, hint)
+
+        # アセットバンドル構築時の一括評価は HintIndex と同じマスクになる
+        assert build_hint_masks(board_data, hints) == HintIndex(board_data, hints).masks
+
+
+def _hints_with_negations(hint_loader):
+    """汎用ヒント全体と、その neg_ 版（肯定形のヒントのみ）"""
+    hints = []
+    for hint in hint_loader.generic_hints.values():
+        hints.append(hint)
+        if not hint.hint_type.startswith("neg_"):
+            hints.append(CompiledHint("neg_" + hint.hint_type, hint.param1, hint.param2))
+    return hints
 
 
 if __name__ == "__main__":
-    validate_all_map_hints()
+    parser = argparse.ArgumentParser(description="マップ×ヒント構成の整合性チェック")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="並列ワーカー数（1 なら逐次実行、省略時は CPU 数）")
+    args = parser.parse_args()
+    sys.exit(1 if validate_all_map_hints(workers=args.workers) else 0)
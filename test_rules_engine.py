@@ -0,0 +1,235 @@
+import random
+
+from ai.bots import HeuristicBot
+from core.board_template import BoardTemplate
+from core.game_engine import GameEngine
+from core.rules_engine import RulesEngine
+from core.zobrist import TranspositionTable
+from utils.debug_utils import find_solution_tiles
+
+
+def _cells(engine, predicate):
+    return [coord for coord in sorted(engine.board.tiles) if predicate(coord)]
+
+
+def test_question_match_and_mismatch(new_game):
+    engine, rules = new_game()
+    board = engine.board
+    asker, target = engine.players[0], engine.players[1]
+
+    match = _cells(engine, lambda c: board.apply_hint(c, target.hint))[0]
+    result = rules.question(asker.id, target.id, match)
+    assert result.ok and result.action is None
+    assert board.tiles[match]["discs"] == [target.id]
+    assert engine.state.current_player == engine.players[1].id
+
+    # 手番でないプレイヤーの質問は受理されない
+    assert rules.question(asker.id, target.id, match).reason == RulesEngine.REASON_NOT_YOUR_TURN
+
+    asker, target = engine.players[1], engine.players[2]
+    miss = _cells(engine, lambda c: not board.apply_hint(c, target.hint))[0]
+    result = rules.question(asker.id, target.id, miss)
+    assert result.ok and result.action == "place_cube"
+    assert board.tiles[miss]["cube"] == target.id
+
+    # キューブ配置待ちの間は他の行動はできず、自分のヒントに合致するマスにも置けない
+    assert rules.search(miss).reason == RulesEngine.REASON_WRONG_ACTION
+    own = _cells(engine, lambda c: board.apply_hint(c, asker.hint) and not board.tiles[c].get("cube"))
+    assert rules.place_cube(own[0]).reason == RulesEngine.REASON_HINT_MATCHES
+
+    free = _cells(engine, lambda c: not board.apply_hint(c, asker.hint)
+                  and not board.tiles[c].get("cube"))
+    result = rules.place_cube(free[0])
+    assert result.ok and engine.state.current_player == engine.players[2].id
+
+
+def test_search_on_solution_wins(new_game):
+    engine, rules = new_game(map_id=3, player_count=5)
+    solution = find_solution_tiles(engine)[0]
+
+    result = rules.search(solution, step=True)
+    assert result.ok and result.exploring
+    while result.exploring:
+        result = rules.reveal_next()
+    assert result.winner == engine.players[0].id
+    assert engine.state.phase == "end"
+    assert sorted(engine.board.tiles[solution]["discs"]) == sorted(p.id for p in engine.players)
+    assert rules.search(solution).reason == RulesEngine.REASON_GAME_OVER
+
+
+def test_search_failure_requires_cube(new_game):
+    engine, rules = new_game(map_id=5, player_count=3)
+    board = engine.board
+    searcher = engine.players[0]
+    solution = find_solution_tiles(engine)[0]
+
+    coord = _cells(engine, lambda c: c != solution and board.apply_hint(c, searcher.hint))[0]
+    result = rules.search(coord)
+    assert result.ok and not result.exploring and result.winner is None
+    assert result.action == "place_cube"
+    assert board.tiles[coord]["cube"] is not None
+    assert [e["type"] for e in result.events][-2:] == ["cube", "action"]
+
+
+def test_games_share_template_without_sharing_tokens(new_game, loaders):
+    first, rules = new_game(map_id=3, player_count=3)
+    second, _ = new_game(map_id=3, player_count=3)
+    assert first.board.template is second.board.template
+
+    solution = find_solution_tiles(first)[0]
+    coord = _cells(first, lambda c: c != solution
+                   and first.board.apply_hint(c, first.players[0].hint))[0]
+    assert rules.search(coord).ok
+    assert first.board.cube_at(coord) is not None
+    assert second.board.cube_at(coord) is None
+    map_loader, _ = loaders
+    assert "cube" not in map_loader.load_map(3)[coord]  # 共有のセル情報は書き換えない
+
+    # 複製は独立したトークンを持ち、リセットで元の盤面は空になる
+    clone = first.board.clone()
+    first.reset_game()
+    assert clone.cube_at(coord) is not None and clone.has_disc(coord, first.players[0].id)
+    assert first.board.cube_mask == 0 and not first.board.discs_at(coord)
+    assert not first.board.tiles[coord]["discs"] and first.board.tiles[coord]["cube"] is None
+
+
+def test_undo_redo_and_rollback_restore_every_step(new_game, act):
+    engine, rules = new_game(map_id=8, player_count=4)
+    rng = random.Random(3)
+    bots = {pid: HeuristicBot(pid, rng) for pid in engine.state.players}
+
+    def fingerprint():
+        return (engine.position_hash(),
+                dict(engine.board.tokens.discs), dict(engine.board.tokens.cube_owner),
+                engine.state.snapshot(), [(p.disc_count, p.cube_count) for p in engine.players])
+
+    history = [fingerprint()]
+    while engine.state.phase != "end":
+        choice = bots[engine.state.current_player].choose(rules)
+
+        # 試して戻す：控えに戻すと盤面・状態が元通りになる
+        snapshot = engine.snapshot()
+        before = fingerprint()
+        assert act(rules, choice).ok
+        engine.restore(snapshot)
+        assert fingerprint() == before
+
+        snapshot = engine.snapshot()
+        assert act(rules, choice).ok
+        engine.commit(snapshot)
+        history.append(fingerprint())
+        assert engine.board.hash == engine.board.compute_hash()
+        assert engine.state.hash == engine.state.compute_hash()
+
+    # 最初まで取り消し → 最後までやり直し
+    for expected in reversed(history[:-1]):
+        assert engine.undo()
+        assert fingerprint() == expected
+    assert not engine.undo() and engine.board.mark() == 0
+    for expected in history[1:]:
+        assert engine.redo()
+        assert fingerprint() == expected
+    assert not engine.redo() and engine.state.phase == "end"
+
+
+def test_zobrist_hash_is_order_independent(new_game):
+    first, _ = new_game(map_id=6, player_count=3)
+    second, _ = new_game(map_id=6, player_count=3)
+    coords = sorted(first.board.tiles)[:6]
+    tokens = [("disc", coords[0], "player1"), ("disc", coords[1], "player2"),
+              ("cube", coords[2], "player3"), ("disc", coords[2], "player1")]
+
+    for kind, coord, pid in tokens:
+        getattr(first.board, f"place_{kind}")(coord, pid)
+    for kind, coord, pid in reversed(tokens):
+        getattr(second.board, f"place_{kind}")(coord, pid)
+    assert first.board.hash == second.board.hash == first.board.compute_hash() != 0
+    assert first.position_hash() == second.position_hash()
+
+    # 手番・操作が違えば局面も別
+    second.next_turn()
+    assert first.position_hash() != second.position_hash()
+    second.state.current_action = "search"
+    assert second.state.hash == second.state.compute_hash()
+
+
+def test_transposition_table_evicts_least_recently_used():
+    table = TranspositionTable(max_entries=2)
+    table.put(1, "a")
+    table.put(2, "b")
+    assert table.get(1) == "a"  # 1 を使ったので次に捨てられるのは 2
+    table.put(3, "c")
+    assert 2 not in table and table.get(1) == "a" and table.get(3) == "c"
+    assert len(table) == 2 and table.get(2) is None and table.misses == 1
+
+
+def test_answer_table_resolves_turns_without_hint_evaluation(loaders, play):
+    map_loader, hint_loader = loaders
+    players = hint_loader.get_players_for_map(11, 5)
+    template = BoardTemplate(map_loader.load_map(11))  # 共有テンプレートとは別の HintIndex
+    engine = GameEngine([p["id"] for p in players], [p["hint"] for p in players], template)
+    engine.state.set_phase("active")
+    board = engine.board
+
+    # 回答表はセルごとのヒント判定と一致する
+    for player in engine.players:
+        assert engine.answers.row(player.id) == sum(
+            1 << bit for bit, coord in enumerate(template.coords)
+            if board.apply_hint(coord, player.hint))
+
+    # 開始後はヒントを一切評価せずに決着まで進む
+    def no_evaluation(*args):
+        raise AssertionError("ゲーム中にヒントを評価した")
+    board.hint_index.mask_for = no_evaluation
+    board.hint_index.applies = no_evaluation
+
+    rules = RulesEngine(engine)
+    rng = random.Random(11)
+    bots = {pid: HeuristicBot(pid, rng) for pid in engine.state.players}
+    play(rules, bots)
+    assert engine.state.exploration_target in find_solution_tiles(engine)
+
+
+def test_random_games_finish_with_solution_winner(new_game):
+    """ランダムな合法手だけでゲームを進め、正解マスの探索で決着すること"""
+    rng = random.Random(7)
+    for map_id in range(0, 19, 6):
+        engine, rules = new_game(map_id=map_id, player_count=3 + map_id % 3)
+        board = engine.board
+        solution = find_solution_tiles(engine)[0]
+
+        for _ in range(2000):
+            if engine.state.phase == "end":
+                break
+            current = engine.current_player()
+            free = [c for c in board.tiles if not board.tiles[c].get("cube")]
+            action = rules.legal_actions()[0]
+            if action == "place_cube":
+                rules.place_cube(rng.choice(
+                    [c for c in free if not board.apply_hint(c, current.hint)]))
+            elif action == "place_disc":
+                rules.place_disc(rng.choice(
+                    [c for c in free if current.id not in board.tiles[c].get("discs", [])
+                     and board.apply_hint(c, current.hint)]))
+            else:
+                # 自分のヒントに合致するマスを探索するか、他プレイヤーに質問する
+                candidates = [c for c in free if board.apply_hint(c, current.hint)]
+                coord = rng.choice(candidates)
+                if rng.random() < 0.3:
+                    rules.search(coord)
+                else:
+                    others = [p.id for p in engine.players if p.id != current.id]
+                    rules.question(current.id, rng.choice(others), coord)
+
+        assert engine.state.phase == "end"
+        assert engine.state.exploration_target == solution
+
+
+def test_simulator_bots_finish_games():
+    """シミュレータのボットが不正な操作をせず、上限内に決着すること"""
+    from simulate import run_simulation
+
+    summary = run_simulation(games=3, bot_names=("heuristic", "random"), seed=1,
+                             maps=[0, 9], workers=1)
+    assert summary["games"] == 18 and summary["unfinished"] == 0
+    assert all(abs(sum(rates) - 1) < 1e-9 for rates in summary["seat_win_rates"].values())
@@ -1,55 +1,169 @@
-import math
-from PIL import Image, ImageDraw
-from PIL import Image, ImageDraw
-from PIL.Image import Resampling
 """
+地形画像の一括ビルド：assets/terrain/ 以下の *_org.png をすべて正六角形にトリミングし、
+横幅100pxの基準画像（{地形}.png）と、ズーム用の縮尺済み画像（scaled/{地形}_{横幅}.png）を書き出す。
+
+- 入力ごとの処理はプロセスプールで並列に行う
+- 入力画像の内容ハッシュと出力設定をマニフェストに記録し、前回から変わっていない入力は処理しない
+
+使用例:
+    python trim_hex_image.py              # 変更のあった画像だけ再生成
+    python trim_hex_image.py --force      # すべて再生成
+    python trim_hex_image.py --widths 80 100 160
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+from PIL.Image import Resampling
+from utils.hex_image import crop_hex
+from utils.zoom import MAX_ZOOM_LEVEL, MIN_ZOOM_LEVEL, terrain_width, zoomed_radius
+
+DEFAULT_TERRAIN_DIR = os.path.join("assets", "terrain")
+SCALED_DIR_NAME = "scaled"               # ズーム用画像の出力先（地形フォルダ直下）
+MANIFEST_NAME = ".build_manifest.json"
+BASE_WIDTH = 100                         # 基準画像の横幅（半径 50 相当）
+BUILD_VERSION = 1                        # 処理内容を変えたら上げる（全入力を再生成させる）
+
+
+def default_variant_widths(base_radius=50):
+    """
+    既定ウィンドウサイズでの各ズーム段階の半径に対応する横幅（2×半径）の一覧。
+    BoardViewport と同じ段階・丸め方（utils.zoom）で求める。
+    """
+    return sorted({terrain_width(zoomed_radius(base_radius, level))
+                   for level in range(MIN_ZOOM_LEVEL, MAX_ZOOM_LEVEL + 1)})
+
+
+def resize_to_width(img, width):
+    """横幅 width に縮尺する（縦は比率で自動）"""
+    return img.resize((width, int(img.height * width / img.width)), Resampling.LANCZOS)
+
+
+def trim_hex_image(input_path, output_path):
+    """
     正六角形の画像をトリミングして、余白を削除し、横幅100pxにリサイズする関数
 
     元画像の横幅の99%を正六角形の幅として使用し、マスクを生成してトリミング
     """
+    with Image.open(input_path) as img:
+        hex_img = crop_hex(img)
+    resize_to_width(hex_img, BASE_WIDTH).save(output_path, format="PNG")
 
 
-def trim_hex_image(input_path, output_path):
-    # 1️⃣ 元画像読み込み
-    img = Image.open(input_path).convert("RGBA")
-    w, h = img.size
-
-    # 2️⃣ 正六角形マスク生成（横幅の99%に調整）
-    hex_width = w * 0.99
-    radius = hex_width / 2
-    center_x, center_y = w / 2, h / 2
-    hex_points = []
-
-    for i in range(6):
-        angle_deg = 60 * i
-        angle_rad = math.radians(angle_deg)
-        x = center_x + radius * math.cos(angle_rad)
-        y = center_y + radius * math.sin(angle_rad)
-        hex_points.append((x, y))
-
-    # 3️⃣ マスク作成
-    mask = Image.new("L", img.size, 0)
-    draw = ImageDraw.Draw(mask)
-    draw.polygon(hex_points, fill=255)
-
-    # 4️⃣ トリミング：画像にマスク適用
-    hex_img = Image.new("RGBA", img.size)
-    hex_img.paste(img, (0, 0), mask)
-
-    # 5️⃣ クロップして余白を消す（正六角形だけ残す）
-    bbox = mask.getbbox()
-    hex_img = hex_img.crop(bbox)
-
-    # 6️⃣ 横幅100pxにリサイズ（縦は比率で自動）
-    final_img = hex_img.resize(
-        (100, int(hex_img.height * 100 / hex_img.width)), Resampling.LANCZOS)
-
-    # 7️⃣ PNG保存（透過あり）
-    final_img.save(output_path, format="PNG")
-
-
-terrain = "mountain"
-input_path = f"assets/terrain/{terrain}_org.png"
-output_path = f"assets/terrain/{terrain}.png"
-# 使用例
-trim_hex_image(input_path, output_path)
+def file_digest(path):
+    """ファイル内容の SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def output_paths(input_path, widths):
+    """入力 {地形}_org.png に対する出力パス一覧（基準画像, ズーム用画像...）"""
+    folder = os.path.dirname(input_path)
+    terrain = os.path.basename(input_path)[:-len("_org.png")]
+    paths = [os.path.join(folder, f"{terrain}.png")]
+    paths += [os.path.join(folder, SCALED_DIR_NAME, f"{terrain}_{w}.png") for w in widths]
+    return paths
+
+
+def build_one(input_path, widths):
+    """
+    1枚の入力画像から基準画像とズーム用画像を生成する（プロセスプールのワーカーで実行）。
+    六角形の切り出しは1回だけ行い、各サイズへの縮尺はその結果から行う。
+    Returns:
+        list[str]: 書き出したファイルパス
+    """
+    paths = output_paths(input_path, widths)
+    with Image.open(input_path) as img:
+        hex_img = crop_hex(img)
+
+    if widths:
+        os.makedirs(os.path.join(os.path.dirname(input_path), SCALED_DIR_NAME), exist_ok=True)
+    for path, width in zip(paths, [BASE_WIDTH, *widths]):
+        resize_to_width(hex_img, width).save(path, format="PNG")
+    return paths
+
+
+def load_manifest(path):
+    """前回ビルドのマニフェスト（無い／壊れている場合は空）"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_terrain_assets(terrain_dir=DEFAULT_TERRAIN_DIR, widths=None, workers=None, force=False):
+    """
+    terrain_dir 以下の *_org.png を一括処理する。
+    内容ハッシュ・出力サイズ・処理バージョンが前回と同じで、出力が揃っている入力はスキップする。
+    Returns:
+        (built, skipped): 処理した入力パス一覧, スキップした入力パス一覧
+    """
+    widths = sorted(set(widths if widths is not None else default_variant_widths()))
+    manifest_path = os.path.join(terrain_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    entries = manifest.get("entries", {}) if manifest.get("version") == BUILD_VERSION else {}
+
+    inputs = sorted(glob.glob(os.path.join(terrain_dir, "*_org.png")))
+    digests = {path: file_digest(path) for path in inputs}
+
+    todo, skipped = [], []
+    for path in inputs:
+        name = os.path.basename(path)
+        entry = entries.get(name)
+        up_to_date = (
+            not force and entry is not None
+            and entry.get("sha256") == digests[path]
+            and entry.get("widths") == widths
+            and all(os.path.exists(p) for p in output_paths(path, widths))
+        )
+        (skipped if up_to_date else todo).append(path)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(build_one, todo, [widths] * len(todo)))
+        for path, outputs in zip(todo, results):
+            print(f"[Build] {os.path.basename(path)} → {len(outputs)} 枚")
+
+    # マニフェストは今回存在した入力だけで作り直す（削除された入力は消える）
+    new_entries = {
+        os.path.basename(path): {"sha256": digests[path], "widths": widths}
+        for path in inputs
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"version": BUILD_VERSION, "entries": new_entries}, f, indent=2)
+
+    return todo, skipped
+
+
+def parse_args(argv=None):
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(description="地形画像（*_org.png）の一括トリミング・縮尺")
+    parser.add_argument("--terrain-dir", default=DEFAULT_TERRAIN_DIR,
+                        help="入力・出力の地形画像フォルダ")
+    parser.add_argument("--widths", type=int, nargs="*", default=None,
+                        help="ズーム用に書き出す横幅（省略時は各ズーム段階の既定サイズ）")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="並列プロセス数（省略時は CPU 数）")
+    parser.add_argument("--force", action="store_true",
+                        help="マニフェストを無視してすべて再生成する")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    built, skipped = build_terrain_assets(args.terrain_dir, args.widths,
+                                          args.workers, args.force)
+    print(f"[Build] 生成 {len(built)} 件 / スキップ {len(skipped)} 件")
+
+
+if __name__ == "__main__":
+    main()
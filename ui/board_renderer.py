@@ -1,9 +1,16 @@
-import math
 from utils.canvas_utils import (
+    bear_segments,
     draw_regular_polygon,
     grid_to_pixel,
-    is_point_in_polygon
+    is_point_in_polygon,
+    territory_vertices
 )
+from utils.geometry_cache import (
+    FLAT_TOP_HEX_ROTATION,
+    polygon_offsets,
+    translate_flat
+)
+from ui.static_layer import StaticLayerCompositor
 
 
 class BoardRenderer:
@@ -11,9 +18,15 @@ class BoardRenderer:
     Tkinter キャンバス上に盤面を描画する描画エンジン。
     - 地形画像、六角形タイル、縄張りマーク、構造物、トークン（キューブ／ディスク）などを描画
     - ホバー時のマス強調（ハイライト）演出にも対応
+    - 静的レイヤーは盤面ごとに一度だけ描画し、以降はトークンが変化したセルだけを更新する
+    - composite_static=True なら静的レイヤーを1枚の合成画像（StaticLayerCompositor）で表示する
+    - set_geometry() で半径・余白を変更でき（ズーム／ウィンドウサイズ変更）、構造物やトークンも半径に比例して描く
     """
 
-    def __init__(self, canvas, terrain_imgs, radius, margin_x=0, margin_y=0, player_lookup=None):
+    BASE_RADIUS = 50  # 構造物・トークンの大きさの基準とする半径
+
+    def __init__(self, canvas, terrain_imgs, radius, margin_x=0, margin_y=0, player_lookup=None,
+                 composite_static=False, image_cache=None):
         self.canvas = canvas
         self.terrain_imgs = terrain_imgs
         self.radius = radius
@@ -21,17 +34,106 @@ class BoardRenderer:
         self.margin_y = margin_y
         self.player_lookup = player_lookup or {}  # プレイヤーID → Playerインスタンス
         self.hovered_cell = None  # ハイライト対象座標
+        self.hover_item = None    # ハイライト用ポリゴンのキャンバスアイテムID（使い回す）
+        self.marked_cell = None   # 推薦マスの目印を表示する座標
+        self.mark_item = None     # 目印用ポリゴンのキャンバスアイテムID
+
+        # 🧱 リテインドモード用の状態
+        self.last_tile_data = None  # 静的レイヤーを描画済みの盤面
+        self.token_state = {}       # 座標 → 最後に描画したトークン状態 (cube, discs)
+        self.token_items = {}       # 座標 → トークンのキャンバスアイテムID一覧
+        self.dirty_cells = set()    # 次回 render でトークンを描き直すセル
 
-    def render(self, tile_data, rows, cols):
+        # 🖼️ 静的レイヤー合成モード（PIL で1枚の画像にまとめて表示）
+        self.compositor = None
+        self.static_image = None  # 表示中の合成画像（Tk 側で破棄されないよう参照を保持）
+        if composite_static:
+            if StaticLayerCompositor.is_available():
+                self.compositor = StaticLayerCompositor(
+                    image_cache, structure_radius=25, reference_radius=BoardRenderer.BASE_RADIUS)
+            else:
+                print("[Renderer] Pillow が無いため静的レイヤー合成モードは無効です")
+
+    def render(self, tile_data, rows, cols, dirty=None):
         """
-        タイルデータ（全マップセル）を一括描画。
-        描画順：地形 → 六角形 → 縄張り → 構造物 → キューブ → ディスク群
+        タイルデータ（全マップセル）を描画する（リテインドモード）。
+        - 初回または盤面が変わったときだけ静的レイヤー（地形 → 六角形 → 縄張り → 構造物）を描画
+        - 以降はトークン（キューブ／ディスク）が変化したセルのアイテムだけを差し替える
+
+        dirty: 変化したセル座標の集合。省略時は全セルのトークン状態を前回描画分と比較して検出する
         """
-        self.canvas.delete("all")
-        self.last_tile_data = tile_data
         self.last_rows = rows
         self.last_cols = cols
 
+        if tile_data is not self.last_tile_data:
+            self._render_static(tile_data)
+            self.render_with_highlight()
+            self._render_mark()
+            dirty = tile_data.keys()
+        elif dirty is None:
+            dirty = [coord for coord, cell in tile_data.items()
+                     if self.token_state.get(coord) != BoardRenderer._token_key(cell)]
+
+        self.dirty_cells.update(dirty)
+        for coord in self.dirty_cells:
+            cell = tile_data.get(coord)
+            if cell is not None:
+                self._render_tokens(coord, cell)
+        self.dirty_cells.clear()
+
+        # 新しく描いたトークンより目印・ハイライトを手前に保つ
+        if self.mark_item is not None:
+            self.canvas.tag_raise(self.mark_item)
+        if self.hover_item is not None:
+            self.canvas.tag_raise(self.hover_item)
+
+    def mark_dirty(self, coords):
+        """次回 render でトークンを描き直すセルを登録する"""
+        self.dirty_cells.update(coords)
+
+    def set_geometry(self, radius, margin_x, margin_y, terrain_imgs=None):
+        """
+        六角形の半径と余白（と、その半径用の地形画像）を変更し、次回 render で全体を描き直す。
+        """
+        self.radius = radius
+        self.margin_x = margin_x
+        self.margin_y = margin_y
+        if terrain_imgs is not None:
+            self.terrain_imgs = terrain_imgs
+        self.invalidate()
+
+    def _scaled(self, size):
+        """基準半径 BASE_RADIUS での大きさ size を現在の半径に合わせて拡大縮小する"""
+        return size * self.radius / BoardRenderer.BASE_RADIUS
+
+    def invalidate(self):
+        """次回 render で静的レイヤーを含めて全体を描き直す（盤面サイズ変更時など）"""
+        self.last_tile_data = None
+
+    @staticmethod
+    def _token_key(cell):
+        """セルのトークン状態（差分検出用）"""
+        return cell.get("cube"), tuple(cell.get("discs", ()))
+
+    def _render_static(self, tile_data):
+        """
+        静的レイヤー（地形画像・六角形枠・縄張り・構造物）を全セル分描画する。
+        ゲーム中は変化しないため、盤面ごとに一度だけ描画する。
+        """
+        self.canvas.delete("all")
+        self.last_tile_data = tile_data
+        self.token_state.clear()
+        self.token_items.clear()
+        self.hover_item = None
+        self.mark_item = None
+
+        if self.compositor is not None:
+            self.static_image = self.compositor.get_photo(
+                tile_data, self.radius, self.margin_x, self.margin_y)
+            self.canvas.create_image(0, 0, anchor="nw", image=self.static_image,
+                                     tags="static")
+            return
+
         for (col, row), cell in tile_data.items():
             x, y = grid_to_pixel(col, row, self.radius,
                                  self.margin_x, self.margin_y)
@@ -40,12 +142,13 @@ class BoardRenderer:
 
             # 地形画像の描画（背景として）
             if terrain_img:
-                self.canvas.create_image(x, y, image=terrain_img)
+                self.canvas.create_image(x, y, image=terrain_img, tags="static")
 
             # 六角形枠の描画
             draw_regular_polygon(
                 self.canvas, x, y, self.radius, 6,
-                fill_color="", outline_color="white", outline_width=3
+                fill_color="", outline_color="white", outline_width=3,
+                tags="static"
             )
 
             # 縄張り（territory）演出の描画
@@ -57,14 +160,35 @@ class BoardRenderer:
                 self._draw_structure(
                     x, y, cell["structure"], cell["structure_color"])
 
-            # キューブ（1個まで）
-            if cell.get("cube"):
-                self._draw_cube(x, y, cell["cube"])
+    def _render_tokens(self, coord, cell):
+        """
+        1セル分のトークン（キューブ・ディスク群）を描き直す。
+        変化がなければ何もしない。
+        """
+        key = BoardRenderer._token_key(cell)
+        if self.token_state.get(coord) == key and coord in self.token_items:
+            return
+
+        for item in self.token_items.pop(coord, ()):
+            self.canvas.delete(item)
+
+        col, row = coord
+        x, y = grid_to_pixel(col, row, self.radius,
+                             self.margin_x, self.margin_y)
+        items = []
+
+        # キューブ（1個まで）
+        if cell.get("cube"):
+            items.append(self._draw_cube(x, y, cell["cube"]))
+
+        # ディスク群（最大複数）
+        discs = cell.get("discs", [])
+        for i, pid in enumerate(discs):
+            items.append(self._draw_disc(x, y, pid, offset=i,
+                                         total_discs=len(discs)))
 
-            # ディスク群（最大複数）
-            for i, pid in enumerate(cell.get("discs", [])):
-                self._draw_disc(x, y, pid, offset=i,
-                                total_discs=len(cell["discs"]))
+        self.token_items[coord] = items
+        self.token_state[coord] = key
 
     def _draw_territory(self, x, y, territory_type):
         """
@@ -72,72 +196,58 @@ class BoardRenderer:
         - bear: 六角辺の一部に線分を描画
         - eagle: 六角形を赤枠で囲む
         """
-        r = self.radius * 0.8
-        vertices = [
-            (x + r * math.cos(math.radians(60 * i)),
-             y + r * math.sin(math.radians(60 * i)))
-            for i in range(6)
-        ]
-
         if territory_type == "bear":
-            segments = [(0, 3/20), (7/20, 13/20), (17/20, 1)]
-            for i in range(6):
-                p_start = vertices[i]
-                p_end = vertices[(i + 1) % 6]
-                dx = p_end[0] - p_start[0]
-                dy = p_end[1] - p_start[1]
-                for r0, r1 in segments:
-                    sx = p_start[0] + dx * r0
-                    sy = p_start[1] + dy * r0
-                    ex = p_start[0] + dx * r1
-                    ey = p_start[1] + dy * r1
-                    self.canvas.create_line(
-                        sx, sy, ex, ey, fill="black", width=2.1)
+            for sx, sy, ex, ey in bear_segments(x, y, self.radius):
+                self.canvas.create_line(
+                    sx, sy, ex, ey, fill="black", width=2.1, tags="static")
 
         elif territory_type == "eagle":
+            vertices = territory_vertices(x, y, self.radius)
             flat_points = [coord for pt in vertices for coord in pt]
             self.canvas.create_polygon(
-                flat_points, outline="red", fill="", width=2.1)
+                flat_points, outline="red", fill="", width=2.1, tags="static")
 
     def _draw_structure(self, x, y, type_, color):
         """
         構造物の描画（ruin: 三角形, stone: 八角形）
         """
-        r = 25
+        r = self._scaled(25)
         if type_ == "ruin":
             draw_regular_polygon(self.canvas, x, y, r, 3,
-                                 fill_color=color, outline_color="")
+                                 fill_color=color, outline_color="", tags="static")
         elif type_ == "stone":
             draw_regular_polygon(self.canvas, x, y, r, 8,
-                                 fill_color=color, outline_color="")
+                                 fill_color=color, outline_color="", tags="static")
 
     def _draw_cube(self, x, y, player_id):
         """
-        キューブ描画（長方形として表現）
+        キューブ描画（長方形として表現）。キャンバスアイテムIDを返す
         """
         player = self.player_lookup.get(player_id)
         color = getattr(player, 'color', "gray")
-        r = 15
-        self.canvas.create_rectangle(x - r, y + 5 - r, x + r, y + 5 + r,
-                                     fill=color, outline="")
+        r = self._scaled(15)
+        dy = self._scaled(5)
+        return self.canvas.create_rectangle(x - r, y + dy - r, x + r, y + dy + r,
+                                            fill=color, outline="", tags="token")
 
     def _draw_disc(self, x, y, player_id, offset=0, total_discs=1):
         """
-        ディスク描画（複数ある場合は横並びで配置）
+        ディスク描画（複数ある場合は横並びで配置）。キャンバスアイテムIDを返す
         """
         player = self.player_lookup.get(player_id)
         color = getattr(player, 'color', "gray")
-        r = 10
+        r = self._scaled(10)
         spacing = r * 2
         center_offset = offset - (total_discs - 1) / 2
         disc_x = x + center_offset * spacing
-        disc_y = y + 5
-        self.canvas.create_oval(disc_x - r, disc_y - r, disc_x + r, disc_y + r,
-                                fill=color, outline="")
+        disc_y = y + self._scaled(5)
+        return self.canvas.create_oval(disc_x - r, disc_y - r, disc_x + r, disc_y + r,
+                                       fill=color, outline="", tags="token")
 
     def highlight_cell(self, coord):
         """
         マウスホバー時に対象マスをハイライト表示（黄色の透過六角形）
+        - ハイライトは1つのタグ付きポリゴンを使い回し、座標の移動と表示切替だけで済ませる
         """
         if coord == self.hovered_cell:
             return
@@ -146,26 +256,58 @@ class BoardRenderer:
 
     def render_with_highlight(self):
         """
-        通常描画 → ハイライト描画を重ねる
+        ハイライト用ポリゴンを hovered_cell の位置へ移動して表示する（盤面は再描画しない）
         """
-        self.render(self.last_tile_data, self.last_rows, self.last_cols)
+        if self.hovered_cell is None:
+            return
+
         col, row = self.hovered_cell
         x, y = grid_to_pixel(col, row, self.radius,
                              self.margin_x, self.margin_y)
 
-        vertices = []
-        for i in range(6):
-            angle = math.radians(60 * i)
-            vx = x + self.radius * math.cos(angle)
-            vy = y + self.radius * math.sin(angle)
-            vertices.extend([vx, vy])
+        vertices = translate_flat(
+            polygon_offsets(self.radius, 6, FLAT_TOP_HEX_ROTATION), x, y)
 
-        self.canvas.create_polygon(
-            vertices, fill="yellow", outline="", stipple="gray25", tags="hover"
-        )
+        if self.hover_item is None:
+            self.hover_item = self.canvas.create_polygon(
+                vertices, fill="yellow", outline="", stipple="gray25", tags="hover"
+            )
+        else:
+            self.canvas.coords(self.hover_item, *vertices)
+            self.canvas.itemconfigure(self.hover_item, state="normal")
+        self.canvas.tag_raise(self.hover_item)
 
     def clear_highlight(self):
-        """ハイライト解除（マウスがマス外に移動したとき）"""
+        """ハイライト解除（マウスがマス外に移動したとき）：ポリゴンを非表示にする"""
         if self.hovered_cell is not None:
             self.hovered_cell = None
-            self.render(self.last_tile_data, self.last_rows, self.last_cols)
+            if self.hover_item is not None:
+                self.canvas.itemconfigure(self.hover_item, state="hidden")
+
+    def mark_cell(self, coord):
+        """推薦マスなどの目印（水色の太枠）を表示する。None で消す"""
+        self.marked_cell = coord
+        self._render_mark()
+
+    def _render_mark(self):
+        """目印用ポリゴンを marked_cell の位置へ移動して表示（無ければ非表示）"""
+        if self.marked_cell is None:
+            if self.mark_item is not None:
+                self.canvas.itemconfigure(self.mark_item, state="hidden")
+            return
+
+        col, row = self.marked_cell
+        x, y = grid_to_pixel(col, row, self.radius,
+                             self.margin_x, self.margin_y)
+        vertices = translate_flat(
+            polygon_offsets(self.radius * 0.85, 6, FLAT_TOP_HEX_ROTATION), x, y)
+
+        if self.mark_item is None:
+            self.mark_item = self.canvas.create_polygon(
+                vertices, fill="", outline="cyan", width=4, tags="mark")
+        else:
+            self.canvas.coords(self.mark_item, *vertices)
+            self.canvas.itemconfigure(self.mark_item, state="normal")
+        self.canvas.tag_raise(self.mark_item)
+        if self.hover_item is not None:
+            self.canvas.tag_raise(self.hover_item)
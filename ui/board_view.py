@@ -0,0 +1,181 @@
+import math
+
+from utils.hit_test import HexHitTester
+from utils.zoom import clamp_zoom_level, zoomed_radius
+
+
+class BoardViewport:
+    """
+    盤面の表示倍率（ズーム）・表示位置（パン）とウィンドウサイズ変更への追従を管理する。
+
+    - キャンバスの大きさから盤面全体が収まる半径を求め、ズーム倍率を掛けた半径で配置し直す
+    - 半径は整数に丸め、ズームは utils.zoom の段階式なので、縮尺済み地形画像のキャッシュが効く
+    - ウィンドウサイズ変更は RESIZE_DEBOUNCE_MS の間イベントが途切れてから1回だけ配置し直す
+    - 盤面がキャンバスより大きいときは右ボタン／中ボタンのドラッグでパンできる
+    - 配置し直すたびに当たり判定（HexHitTester）も作り直す
+    """
+
+    MARGIN_RATIO = 0.1  # 盤面の縦横に対する余白の割合
+    RESIZE_DEBOUNCE_MS = 150
+
+    def __init__(self, canvas, renderer, image_cache, coords, rows, cols, redraw, on_layout=None):
+        """
+        redraw: 配置し直した後に盤面を描き直すコールバック
+        on_layout: 配置し直した後に呼ぶ任意のコールバック（引数はこのビューポート）
+        """
+        self.canvas = canvas
+        self.renderer = renderer
+        self.image_cache = image_cache
+        self.coords = list(coords)
+        self.rows = rows
+        self.cols = cols
+        self.redraw = redraw
+        self.on_layout = on_layout
+
+        self.zoom_level = 0
+        self.radius = None
+        self.margin_x = 0
+        self.margin_y = 0
+        self.hit_tester = None
+        self.scroll_size = (0, 0)   # 余白込みの盤面全体の大きさ（スクロール範囲）
+        self._viewport_size = None  # 直近に配置したときのキャンバスの大きさ
+        self._resize_job = None
+
+    # ------------------------------------------------------------
+    # 寸法計算
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def board_size(radius, rows, cols):
+        """半径 radius のときの盤面（余白なし）の幅と高さ"""
+        return radius * 3 / 2 * cols + radius / 2, radius * math.sqrt(3) * (rows + 1)
+
+    @classmethod
+    def canvas_size_for(cls, radius, rows, cols):
+        """半径 radius の盤面を余白込みで表示するのに必要なキャンバスの大きさ"""
+        width, height = cls.board_size(radius, rows, cols)
+        scale = 1 + cls.MARGIN_RATIO * 2
+        return int(width * scale), int(height * scale)
+
+    def fit_radius(self, width, height):
+        """幅 width × 高さ height のキャンバスに余白込みで盤面全体が収まる最大の半径"""
+        unit_width, unit_height = BoardViewport.board_size(1, self.rows, self.cols)
+        scale = 1 + BoardViewport.MARGIN_RATIO * 2
+        return min(width / (unit_width * scale), height / (unit_height * scale))
+
+    # ------------------------------------------------------------
+    # 配置
+    # ------------------------------------------------------------
+
+    def layout(self, width=None, height=None, force=False):
+        """
+        キャンバスの大きさとズーム段階から半径・余白を決め直し、変化があれば描き直す。
+        Returns:
+            bool: 配置し直したか
+        """
+        width = width or self.canvas.winfo_width()
+        height = height or self.canvas.winfo_height()
+        self._viewport_size = (width, height)
+
+        radius = zoomed_radius(self.fit_radius(width, height), self.zoom_level)
+        board_width, board_height = BoardViewport.board_size(radius, self.rows, self.cols)
+
+        # 余白は盤面の1割。キャンバスの方が大きければ盤面を中央に寄せる
+        margin_x = int(max(board_width * BoardViewport.MARGIN_RATIO, (width - board_width) / 2))
+        margin_y = int(max(board_height * BoardViewport.MARGIN_RATIO, (height - board_height) / 2))
+        if not force and (radius, margin_x, margin_y) == (self.radius, self.margin_x, self.margin_y):
+            return False
+
+        self.radius, self.margin_x, self.margin_y = radius, margin_x, margin_y
+        self.scroll_size = (int(board_width + margin_x * 2), int(board_height + margin_y * 2))
+        self.canvas.configure(scrollregion=(0, 0, *self.scroll_size))
+        self.renderer.set_geometry(radius, margin_x, margin_y,
+                                   terrain_imgs=self.image_cache.images_for(radius))
+        self.hit_tester = HexHitTester(self.coords, radius,
+                                       margin_x=margin_x, margin_y=margin_y)
+        self.redraw()
+        if self.on_layout:
+            self.on_layout(self)
+        return True
+
+    def pixel_to_coord(self, x, y):
+        """
+        ウィンドウ上のピクセル座標（イベントの x, y）に対応するマス座標（盤面外は None）
+        """
+        if self.hit_tester is None:
+            return None
+        return self.hit_tester.pixel_to_coord(self.canvas.canvasx(x), self.canvas.canvasy(y))
+
+    # ------------------------------------------------------------
+    # ズーム・パン・リサイズ
+    # ------------------------------------------------------------
+
+    def zoom(self, steps, x=None, y=None):
+        """
+        ズーム段階を steps だけ変える（正で拡大）。
+        x, y（ウィンドウ上のピクセル座標）を指定すると、その位置の盤面上の点が動かないよう表示位置を合わせる
+        """
+        level = clamp_zoom_level(self.zoom_level + steps)
+        if level == self.zoom_level or self.radius is None:
+            return
+
+        if x is None or y is None:
+            x, y = self._viewport_size[0] / 2, self._viewport_size[1] / 2
+        # 注目点を盤面上の位置（半径単位）で覚えておく
+        focus_x = (self.canvas.canvasx(x) - self.margin_x) / self.radius
+        focus_y = (self.canvas.canvasy(y) - self.margin_y) / self.radius
+
+        self.zoom_level = level
+        if not self.layout(*self._viewport_size):
+            return
+
+        total_width, total_height = self.scroll_size
+        new_x = self.margin_x + focus_x * self.radius
+        new_y = self.margin_y + focus_y * self.radius
+        self.canvas.xview_moveto(max(0.0, (new_x - x) / total_width))
+        self.canvas.yview_moveto(max(0.0, (new_y - y) / total_height))
+
+    def reset_zoom(self):
+        """ズームを解除して盤面全体を表示する"""
+        if self.zoom_level != 0:
+            self.zoom_level = 0
+            self.layout(*self._viewport_size)
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+
+    def schedule_resize(self, width, height):
+        """ウィンドウサイズ変更を間引いて反映する（最後の変更から一定時間後に1回だけ配置し直す）"""
+        if (width, height) == self._viewport_size:
+            return
+        if self._resize_job is not None:
+            self.canvas.after_cancel(self._resize_job)
+        self._resize_job = self.canvas.after(
+            BoardViewport.RESIZE_DEBOUNCE_MS, self._apply_resize, width, height)
+
+    def _apply_resize(self, width, height):
+        self._resize_job = None
+        self.layout(width, height)
+
+    def bind(self, root=None):
+        """キャンバス（とウィンドウ）にズーム・パン・リサイズのイベントを登録する"""
+        canvas = self.canvas
+
+        canvas.bind("<Configure>", lambda e: self.schedule_resize(e.width, e.height))
+
+        # 🔍 マウスホイールでズーム（Windows / macOS は <MouseWheel>、X11 は Button-4 / 5）
+        canvas.bind("<MouseWheel>", lambda e: self.zoom(1 if e.delta > 0 else -1, e.x, e.y))
+        canvas.bind("<Button-4>", lambda e: self.zoom(1, e.x, e.y))
+        canvas.bind("<Button-5>", lambda e: self.zoom(-1, e.x, e.y))
+
+        # ✋ 右ボタン／中ボタンのドラッグでパン
+        for button in (2, 3):
+            canvas.bind(f"<ButtonPress-{button}>", lambda e: canvas.scan_mark(e.x, e.y))
+            canvas.bind(f"<B{button}-Motion>", lambda e: canvas.scan_dragto(e.x, e.y, gain=1))
+
+        # ⌨️ キーボード：+ / - でズーム、0 で全体表示
+        if root is not None:
+            root.bind("<plus>", lambda e: self.zoom(1))
+            root.bind("<KP_Add>", lambda e: self.zoom(1))
+            root.bind("<minus>", lambda e: self.zoom(-1))
+            root.bind("<KP_Subtract>", lambda e: self.zoom(-1))
+            root.bind("<Key-0>", lambda e: self.reset_zoom())
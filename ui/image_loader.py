@@ -1,6 +1,19 @@
+from collections import OrderedDict
+from fractions import Fraction
 from tkinter import PhotoImage
 import os
 
+try:
+    from PIL import Image, ImageTk
+    from PIL.Image import Resampling
+except ImportError:  # Pillow が無い場合は PhotoImage の zoom / subsample で代用
+    Image = None
+
+from utils.hex_image import crop_hex
+from utils.zoom import terrain_width
+
+TERRAIN_TYPES = ["forest", "desert", "mountain", "swamp", "sea"]
+
 
 def load_terrain_images(folder="assets/terrain"):
     """
@@ -9,10 +22,9 @@ def load_terrain_images(folder="assets/terrain"):
     Returns:
         dict[str, PhotoImage]: 地形名（例: "forest"） → 読み込んだ画像
     """
-    terrain_types = ["forest", "desert", "mountain", "swamp", "sea"]
     terrain_imgs = {}
 
-    for terrain in terrain_types:
+    for terrain in TERRAIN_TYPES:
         path = os.path.join(folder, f"{terrain}.png")
         try:
             terrain_imgs[terrain] = PhotoImage(file=path)
@@ -20,3 +32,149 @@ def load_terrain_images(folder="assets/terrain"):
             print(f"[Image Load Error] {terrain} の画像読込に失敗: {e}")
 
     return terrain_imgs
+
+
+class TerrainImageCache:
+    """
+    六角形の半径ごとに縮尺済みの地形画像（PhotoImage）を保持するキャッシュ。
+    ズームのたびに画像を読み込み・再サンプリングしないためのもの。
+
+    - Pillow があれば高解像度の元画像（{地形}_org.png。無ければ {地形}.png）を地形ごとに
+      一度だけ読み込んで六角形に切り出し、半径ごとに横幅 2×半径 へ縮尺する
+    - Pillow が無ければ既定サイズの {地形}.png を PhotoImage の zoom / subsample で近似縮尺する
+    - trim_hex_image.py が書き出したズーム用画像（scaled/{地形}_{横幅}.png）があれば縮尺せずそれを使う
+    - (地形, 半径) ごとの縮尺画像は LRU で最大 max_entries 件まで保持し、古いものから破棄する
+    - 静的レイヤーの合成（StaticLayerCompositor）には同じ元画像から PIL 画像のまま縮尺して渡す（get_image）
+    """
+
+    BASE_WIDTH = 100         # {地形}.png の横幅（半径 50 相当）
+    SCALED_DIR_NAME = "scaled"  # 縮尺済み画像のフォルダ（trim_hex_image.py の出力先）
+    FALLBACK_MAX_FACTOR = 8  # zoom / subsample の分母の上限（大きいほど正確だが遅い）
+
+    def __init__(self, folder="assets/terrain", max_entries=40, terrain_types=None):
+        self.folder = folder
+        self.max_entries = max_entries
+        self.terrain_types = list(terrain_types or TERRAIN_TYPES)
+        self._sources = {}             # 地形名 → 切り出し済みの元画像（読込失敗は None）
+        self._scaled = OrderedDict()   # (地形名, 半径) → PhotoImage（末尾が最近使用）
+        self._images = OrderedDict()   # (地形名, 横幅) → PIL 画像（末尾が最近使用）
+
+    def images_for(self, radius):
+        """半径 radius 用の {地形名: PhotoImage}（画像が用意できない地形は含めない）"""
+        images = {}
+        for terrain in self.terrain_types:
+            img = self.get(terrain, radius)
+            if img is not None:
+                images[terrain] = img
+        return images
+
+    def get(self, terrain, radius):
+        """地形 terrain を横幅 2×radius に縮尺した PhotoImage（キャッシュ有り）"""
+        radius = int(round(radius))
+        key = (terrain, radius)
+        img = self._scaled.get(key)
+        if img is not None:
+            self._scaled.move_to_end(key)
+            return img
+
+        img = self._scale(terrain, radius)
+        if img is None:
+            return None
+        self._scaled[key] = img
+        while len(self._scaled) > self.max_entries:
+            self._scaled.popitem(last=False)
+        return img
+
+    def get_image(self, terrain, width):
+        """
+        地形 terrain を横幅 width に縮尺した RGBA の PIL 画像（キャッシュ有り）。
+        Pillow が無い、または画像が用意できなければ None。
+        """
+        if Image is None:
+            return None
+        width = max(1, int(round(width)))
+        key = (terrain, width)
+        img = self._images.get(key)
+        if img is not None:
+            self._images.move_to_end(key)
+            return img
+
+        img = self._scale_image(terrain, width)
+        if img is None:
+            return None
+        self._images[key] = img
+        while len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+        return img
+
+    def clear(self):
+        """縮尺済み画像を破棄する（元画像は保持）"""
+        self._scaled.clear()
+        self._images.clear()
+
+    def _scale(self, terrain, radius):
+        """元画像を縮尺して PhotoImage を作る（ビルド済みの同サイズ画像があればそれを読む）"""
+        width = terrain_width(radius)
+        if Image is not None:
+            img = self._scale_image(terrain, width)
+            return ImageTk.PhotoImage(img) if img is not None else None
+
+        prebuilt = self._prebuilt_path(terrain, width)
+        if os.path.exists(prebuilt):
+            try:
+                return PhotoImage(file=prebuilt)
+            except Exception as e:
+                print(f"[Image Load Error] {prebuilt} の読込に失敗: {e}")
+
+        source = self._source(terrain)
+        if source is None:
+            return None
+
+        ratio = Fraction(width, TerrainImageCache.BASE_WIDTH).limit_denominator(
+            TerrainImageCache.FALLBACK_MAX_FACTOR)
+        img = source
+        if ratio.numerator != 1:
+            img = img.zoom(ratio.numerator)
+        if ratio.denominator != 1:
+            img = img.subsample(ratio.denominator)
+        return img
+
+    def _scale_image(self, terrain, width):
+        """元画像を横幅 width に縮尺した PIL 画像（ビルド済みの同サイズ画像があればそれを読む）"""
+        prebuilt = self._prebuilt_path(terrain, width)
+        if os.path.exists(prebuilt):
+            try:
+                with Image.open(prebuilt) as img:
+                    return img.convert("RGBA")
+            except Exception as e:
+                print(f"[Image Load Error] {prebuilt} の読込に失敗: {e}")
+
+        source = self._source(terrain)
+        if source is None:
+            return None
+        height = max(1, int(round(source.height * width / source.width)))
+        return source.resize((width, height), Resampling.LANCZOS)
+
+    def _prebuilt_path(self, terrain, width):
+        """trim_hex_image.py が書き出した横幅 width のズーム用画像のパス"""
+        return os.path.join(self.folder, TerrainImageCache.SCALED_DIR_NAME, f"{terrain}_{width}.png")
+
+    def _source(self, terrain):
+        """縮尺元の画像（地形ごとに一度だけ読み込む）"""
+        if terrain not in self._sources:
+            try:
+                if Image is not None:
+                    path = os.path.join(self.folder, f"{terrain}_org.png")
+                    if os.path.exists(path):
+                        with Image.open(path) as img:
+                            self._sources[terrain] = crop_hex(img)
+                    else:  # 元画像が無ければ切り出し済みの既定サイズ画像を使う
+                        with Image.open(os.path.join(self.folder, f"{terrain}.png")) as img:
+                            self._sources[terrain] = img.convert("RGBA")
+                else:
+                    self._sources[terrain] = PhotoImage(
+                        file=os.path.join(self.folder, f"{terrain}.png"))
+            except Exception as e:
+                print(f"[Image Load Error] {terrain} の画像読込に失敗: {e}")
+                self._sources[terrain] = None
+        return self._sources[terrain]
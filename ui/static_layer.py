@@ -0,0 +1,142 @@
+import math
+from collections import OrderedDict
+
+try:
+    from PIL import Image, ImageColor, ImageDraw, ImageTk
+    from PIL.Image import Resampling
+except ImportError:  # Pillow は任意依存（静的レイヤー合成モードでのみ使用）
+    Image = None
+
+from utils.canvas_utils import (
+    bear_segments,
+    grid_to_pixel,
+    regular_polygon_points,
+    territory_vertices
+)
+from utils.zoom import terrain_width
+from ui.image_loader import TerrainImageCache
+
+
+class StaticLayerCompositor:
+    """
+    盤面の静的レイヤー（地形画像・六角形枠・縄張り・構造物）をオフスクリーンで
+    1枚の画像に合成するクラス（trim_hex_image.py と同じく PIL を使用）。
+
+    - 合成結果は 盤面 × 半径 × 余白 ごとにキャッシュし、同じマップの再描画では再合成しない
+      （ズームで半径が変わっても増え続けないよう、直近 max_photos 件だけを保持する）
+    - キャンバスには1つの画像アイテムとして表示するため、静的部分のアイテム数は1になる
+    - 描画順・色・線幅は BoardRenderer のアイテム描画と揃えている
+    - 地形画像はズーム表示と同じ TerrainImageCache から、合成する大きさで受け取る（{地形}_org.png 由来）
+    """
+
+    SUPERSAMPLE = 2  # 線のジャギーを抑えるため、拡大して描いてから縮小する
+
+    def __init__(self, image_cache=None, structure_radius=25, reference_radius=None, max_photos=4):
+        """
+        image_cache: 地形画像の取得元（TerrainImageCache。省略時は既定フォルダで新規作成）
+        structure_radius: 構造物の大きさ（reference_radius 指定時はその半径での大きさとして比例縮尺）
+        """
+        if Image is None:
+            raise ImportError("静的レイヤーの合成には Pillow が必要です")
+        self.image_cache = image_cache or TerrainImageCache()
+        self.structure_radius = structure_radius
+        self.reference_radius = reference_radius
+        self.max_photos = max_photos
+        self._photos = OrderedDict()  # キャッシュキー → (盤面, PhotoImage)（末尾が最近使用）
+
+    @staticmethod
+    def is_available():
+        """Pillow が利用可能か"""
+        return Image is not None
+
+    def get_photo(self, tile_data, radius, margin_x=0, margin_y=0):
+        """
+        合成済みの静的レイヤーを Tk 用の PhotoImage で返す（キャッシュ有り）。
+        盤面オブジェクトはキャッシュ側でも保持し、id の再利用による取り違えを防ぐ。
+        """
+        key = (id(tile_data), radius, margin_x, margin_y)
+        cached = self._photos.get(key)
+        if cached is None:
+            photo = ImageTk.PhotoImage(self.compose(tile_data, radius, margin_x, margin_y))
+            cached = (tile_data, photo)
+            self._photos[key] = cached
+            while len(self._photos) > self.max_photos:
+                self._photos.popitem(last=False)
+        else:
+            self._photos.move_to_end(key)
+        return cached[1]
+
+    def clear(self):
+        """キャッシュ済みの合成画像を破棄する"""
+        self._photos.clear()
+
+    def compose(self, tile_data, radius, margin_x=0, margin_y=0):
+        """
+        静的レイヤーを1枚の RGBA 画像に合成する。
+        画像の左上はキャンバス座標 (0, 0) に対応する。
+        """
+        s = StaticLayerCompositor.SUPERSAMPLE
+        width, height = self._canvas_size(tile_data, radius, margin_x, margin_y)
+        layer = Image.new("RGBA", (width * s, height * s), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        structure_radius = self.structure_radius
+        if self.reference_radius:
+            structure_radius = structure_radius * radius / self.reference_radius
+
+        for (col, row), cell in tile_data.items():
+            x, y = grid_to_pixel(col, row, radius, margin_x, margin_y)
+
+            # 地形画像（中心合わせで貼り付け）
+            terrain_img = self.image_cache.get_image(cell.get("terrain", ""), terrain_width(radius * s))
+            if terrain_img is not None:
+                w, h = terrain_img.size
+                layer.alpha_composite(terrain_img, (int(x * s - w // 2), int(y * s - h // 2)))
+
+            # 六角形枠
+            hex_points = regular_polygon_points(x * s, y * s, radius * s, 6)
+            StaticLayerCompositor._outline(draw, hex_points, "white", 3 * s)
+
+            # 縄張り
+            for territory in cell.get("territories", []):
+                if territory == "bear":
+                    for sx, sy, ex, ey in bear_segments(x * s, y * s, radius * s):
+                        draw.line((sx, sy, ex, ey), fill="black", width=round(2.1 * s))
+                elif territory == "eagle":
+                    vertices = territory_vertices(x * s, y * s, radius * s)
+                    flat_points = [c for pt in vertices for c in pt]
+                    StaticLayerCompositor._outline(draw, flat_points, "red", round(2.1 * s))
+
+            # 構造物（ruin: 三角形, stone: 八角形）
+            structure = cell.get("structure")
+            if structure in ("ruin", "stone"):
+                vertex = 3 if structure == "ruin" else 8
+                points = regular_polygon_points(x * s, y * s, structure_radius * s, vertex)
+                draw.polygon(points, fill=StaticLayerCompositor._color(cell.get("structure_color")))
+
+        if s != 1:
+            layer = layer.resize((width, height), Resampling.LANCZOS)
+        return layer
+
+    def _canvas_size(self, tile_data, radius, margin_x, margin_y):
+        """盤面全体と余白を含む画像サイズ（ピクセル）"""
+        max_x = max_y = 0
+        for col, row in tile_data:
+            x, y = grid_to_pixel(col, row, radius, margin_x, margin_y)
+            max_x = max(max_x, x)
+            max_y = max(max_y, y)
+        return (int(math.ceil(max_x + radius + margin_x)),
+                int(math.ceil(max_y + radius + margin_y)))
+
+    @staticmethod
+    def _outline(draw, flat_points, color, width):
+        """閉じた多角形の枠線を描く"""
+        points = list(zip(flat_points[0::2], flat_points[1::2]))
+        draw.line(points + points[:1], fill=color, width=width, joint="curve")
+
+    @staticmethod
+    def _color(name):
+        """Tk の色名を PIL の RGB に変換（解釈できない色は灰色）"""
+        try:
+            return ImageColor.getrgb(name)
+        except (ValueError, AttributeError):
+            return (128, 128, 128)
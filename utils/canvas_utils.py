@@ -1,27 +1,47 @@
 import math
 
+from utils.geometry_cache import (
+    FLAT_TOP_HEX_ROTATION,
+    bear_segment_offsets,
+    polygon_offsets,
+    translate_flat,
+    translate_points,
+    translate_segments,
+    upright_rotation
+)
+
 
 def pixel_to_cell_coord(x, y, radius, margin_x=0, margin_y=0):
     """
     クリックされた画面座標 (x, y) を盤面のマス座標 (col, row) に変換する。
 
     対応する六角形は flat-top（平らな上辺）形式。
-    マージン分を除いた位置で換算し、六角格子の縦横の間隔から算出する。
+    マージン分を除いた位置を axial 座標（小数）に換算し、cube 座標で丸めてから
+    offset 座標（奇数列が半マス下）に戻す。六角形の辺の近くでも正しいマスになる。
 
     Returns:
-        (col, row): グリッド座標としてのマス位置
+        (col, row): グリッド座標としてのマス位置（盤面範囲外の座標もそのまま返す）
     """
     x -= margin_x
     y -= margin_y
 
-    hex_height = math.sqrt(3) * radius
-    horiz_spacing = 1.5 * radius
-
-    col_f = x / horiz_spacing
-    row_f = (y - 0.5 * hex_height * (round(col_f) % 2)) / hex_height
-
-    col = round(col_f)
-    row = round(row_f)
+    # 📐 ピクセル → axial（小数）
+    q = (2 / 3 * x) / radius
+    r = (-1 / 3 * x + math.sqrt(3) / 3 * y) / radius
+
+    # 🎯 cube 座標の丸め：誤差が最大の軸を他の2軸から決め直す
+    cx, cz = q, r
+    cy = -cx - cz
+    rx, ry, rz = round(cx), round(cy), round(cz)
+    dx, dy, dz = abs(rx - cx), abs(ry - cy), abs(rz - cz)
+    if dx > dy and dx > dz:
+        rx = -ry - rz
+    elif dy <= dz:
+        rz = -rx - ry
+
+    # 🔁 cube → offset（奇数列が半マス下にずれる配置）
+    col = rx
+    row = rz + (rx - (rx & 1)) // 2
     return col, row
 
 
@@ -52,13 +72,8 @@ def is_point_in_hex(px, py, col, row, radius, margin_x=0, margin_y=0):
     Flat-top形式の六角形の頂点座標を求めて、内部判定を行う。
     """
     cx, cy = grid_to_pixel(col, row, radius, margin_x, margin_y)
-
-    vertices = []
-    for i in range(6):
-        angle = math.radians(60 * i - 30)
-        vx = cx + radius * math.cos(angle)
-        vy = cy + radius * math.sin(angle)
-        vertices.append((vx, vy))
+    vertices = translate_points(
+        polygon_offsets(radius, 6, FLAT_TOP_HEX_ROTATION), cx, cy)
 
     return is_point_in_polygon(px, py, vertices)
 
@@ -74,8 +89,33 @@ def grid_to_pixel(col, row, radius, margin_x=0, margin_y=0):
     return x, y
 
 
+def regular_polygon_points(x, y, radius, vertex):
+    """
+    正n角形の頂点座標を [x0, y0, x1, y1, ...] のフラットなリストで返す。
+    偶数頂点なら上辺が水平になるよう回転する（draw_regular_polygon と同じ向き）。
+    頂点オフセットは geometry_cache で (半径, 頂点数, 回転) ごとに使い回す。
+    """
+    offsets = polygon_offsets(radius, vertex, upright_rotation(vertex))
+    return translate_flat(offsets, x, y)
+
+
+def territory_vertices(x, y, radius):
+    """
+    縄張りマーク用の六角形（セル半径の80%）の頂点 [(x, y), ...] を返す。
+    """
+    return translate_points(
+        polygon_offsets(radius * 0.8, 6, FLAT_TOP_HEX_ROTATION), x, y)
+
+
+def bear_segments(x, y, radius):
+    """
+    クマの縄張りマーク（縄張り六角形の各辺を3分割した破線）の線分 [(sx, sy, ex, ey), ...] を返す。
+    """
+    return translate_segments(bear_segment_offsets(radius * 0.8), x, y)
+
+
 def draw_regular_polygon(canvas, x, y, radius, vertex, fill_color,
-                         outline_color="black", outline_width=1):
+                         outline_color="black", outline_width=1, tags=None):
     """
     指定された canvas 上に、正n角形（通常：六角形、三角形、八角形など）を描画する。
 
@@ -87,21 +127,17 @@ def draw_regular_polygon(canvas, x, y, radius, vertex, fill_color,
         fill_color: 塗りつぶしの色
         outline_color: 枠線の色
         outline_width: 枠線の太さ（px）
-    """
-    points = []
-
-    # 偶数頂点なら角度を回転して整形（上辺が水平になるように）
-    start_angle = math.pi / 2 + (math.pi / vertex if vertex % 2 == 0 else 0)
+        tags: キャンバスアイテムに付けるタグ
 
-    for i in range(vertex):
-        angle = 2 * math.pi * i / vertex - start_angle
-        px = x + radius * math.cos(angle)
-        py = y + radius * math.sin(angle)
-        points.extend([px, py])
+    Returns:
+        int: 作成したキャンバスアイテムのID
+    """
+    points = regular_polygon_points(x, y, radius, vertex)
 
-    canvas.create_polygon(
+    return canvas.create_polygon(
         points,
         fill=fill_color,
         outline=outline_color,
-        width=outline_width
+        width=outline_width,
+        tags=tags
     )
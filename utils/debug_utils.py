@@ -1,11 +1,32 @@
+import os
+
+DEBUG_ENV_VAR = "CRYPTID_DEBUG"
+
+# デバッグ出力の有効／無効（既定は有効。CRYPTID_DEBUG=0 またはシミュレーション時に無効化）
+_debug_enabled = os.environ.get(DEBUG_ENV_VAR, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def set_debug(enabled):
+    """[DEBUG] 出力の有効／無効を切り替える"""
+    global _debug_enabled
+    _debug_enabled = bool(enabled)
+
+
+def is_debug_enabled():
+    """[DEBUG] 出力が有効か"""
+    return _debug_enabled
+
+
+def debug_log(message):
+    """デバッグ出力（無効時は何もしない）"""
+    if _debug_enabled:
+        print(f"[DEBUG] {message}")
+
+
 def find_solution_tiles(engine):
     """
     すべてのプレイヤーのヒントに一致するセル座標を抽出する（デバッグ用）
+    - 回答表（AnswerTable）の各プレイヤーの行を AND するだけで求まる
     Returns: List[(col, row)]
     """
-    board = engine.board
-    candidates = []
-    for coord, cell in board.tiles.items():
-        if all(board.apply_hint(coord, p.hint) for p in engine.players):
-            candidates.append(coord)
-    return candidates
+    return engine.board.hint_index.coords_in(engine.answers.solution_mask())
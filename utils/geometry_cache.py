@@ -0,0 +1,70 @@
+"""
+六角形・三角形・八角形などの頂点オフセットを (半径, 頂点数, 回転) ごとにキャッシュする。
+
+描画・当たり判定・PIL のアセット生成はいずれも「中心 + 単位オフセット×半径」で頂点を求めるため、
+cos / sin の計算は半径と形ごとに一度だけ行い、各セルでは足し算だけで頂点を得る。
+"""
+
+import math
+from functools import lru_cache
+
+# 六角形の向き（回転角）
+FLAT_TOP_HEX_ROTATION = 0.0          # 頂点が 0°, 60°, ... （左右が尖った flat-top）
+POINTY_TOP_HEX_ROTATION = -math.pi / 6  # 頂点が -30°, 30°, ... （上下が尖った pointy-top）
+
+# クマの縄張りマーク：六角形の各辺のうち線を引く区間（辺の長さに対する割合）
+BEAR_SEGMENT_RATIOS = ((0, 3/20), (7/20, 13/20), (17/20, 1))
+
+
+def upright_rotation(vertex):
+    """偶数頂点なら上辺が水平になる回転角（奇数頂点は頂点が真上）"""
+    return -(math.pi / 2 + (math.pi / vertex if vertex % 2 == 0 else 0))
+
+
+@lru_cache(maxsize=256)
+def polygon_offsets(radius, vertex, rotation=0.0):
+    """
+    中心 (0, 0)・外接円半径 radius の正n角形の頂点オフセット ((dx, dy), ...) を返す。
+    i 番目の頂点の角度は 2πi/vertex + rotation。
+    """
+    return tuple(
+        (radius * math.cos(2 * math.pi * i / vertex + rotation),
+         radius * math.sin(2 * math.pi * i / vertex + rotation))
+        for i in range(vertex)
+    )
+
+
+@lru_cache(maxsize=64)
+def bear_segment_offsets(radius):
+    """
+    半径 radius の六角形（頂点 0°, 60°, ...）に沿ったクマの縄張り破線の
+    線分オフセット ((sx, sy, ex, ey), ...) を返す。
+    """
+    vertices = polygon_offsets(radius, 6, FLAT_TOP_HEX_ROTATION)
+    lines = []
+    for i in range(6):
+        x0, y0 = vertices[i]
+        x1, y1 = vertices[(i + 1) % 6]
+        dx, dy = x1 - x0, y1 - y0
+        for r0, r1 in BEAR_SEGMENT_RATIOS:
+            lines.append((x0 + dx * r0, y0 + dy * r0, x0 + dx * r1, y0 + dy * r1))
+    return tuple(lines)
+
+
+def translate_flat(offsets, x, y):
+    """頂点オフセットを中心 (x, y) に平行移動し、[x0, y0, x1, y1, ...] で返す"""
+    points = []
+    for dx, dy in offsets:
+        points.append(x + dx)
+        points.append(y + dy)
+    return points
+
+
+def translate_points(offsets, x, y):
+    """頂点オフセットを中心 (x, y) に平行移動し、[(x0, y0), ...] で返す"""
+    return [(x + dx, y + dy) for dx, dy in offsets]
+
+
+def translate_segments(segments, x, y):
+    """線分オフセットを中心 (x, y) に平行移動する"""
+    return [(x + sx, y + sy, x + ex, y + ey) for sx, sy, ex, ey in segments]
@@ -0,0 +1,29 @@
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # Pillow は任意依存（地形画像の生成・拡大縮小でのみ使用）
+    Image = None
+
+from utils.geometry_cache import FLAT_TOP_HEX_ROTATION, polygon_offsets, translate_points
+
+HEX_WIDTH_RATIO = 0.99  # 元画像の横幅のうち正六角形として使う割合
+
+
+def crop_hex(img, width_ratio=HEX_WIDTH_RATIO):
+    """
+    画像の中央から正六角形（flat-top）を切り出し、外側を透過にして余白を削った RGBA 画像を返す。
+    正六角形の幅は元画像の横幅 × width_ratio。
+    """
+    img = img.convert("RGBA")
+    w, h = img.size
+
+    # 正六角形マスク生成
+    radius = w * width_ratio / 2
+    hex_points = translate_points(
+        polygon_offsets(radius, 6, FLAT_TOP_HEX_ROTATION), w / 2, h / 2)
+    mask = Image.new("L", img.size, 0)
+    ImageDraw.Draw(mask).polygon(hex_points, fill=255)
+
+    # マスクを適用し、正六角形の外接矩形でクロップ
+    hex_img = Image.new("RGBA", img.size)
+    hex_img.paste(img, (0, 0), mask)
+    return hex_img.crop(mask.getbbox())
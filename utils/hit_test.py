@@ -0,0 +1,77 @@
+import math
+
+from utils.canvas_utils import pixel_to_cell_coord
+
+
+class HexHitTester:
+    """
+    キャンバス上のピクセル → 盤面マス座標 (col, row) の当たり判定サービス。
+    (半径, 余白) ごとに構築し、クリックやマウス移動のたびに呼び出す。
+
+    - 盤面を粗いバケット（既定は半径の1/4四方）に区切った参照表を事前計算
+    - 四隅がすべて同じマスに入るバケットは表引きだけで確定（六角形は凸なので内部全体が同じマス）
+    - 六角形の辺をまたぐバケットだけ cube 座標の丸めで厳密に判定する
+    - 盤面外のピクセルは None
+    """
+
+    AMBIGUOUS = -1  # 辺をまたぐバケット（厳密判定が必要）
+
+    def __init__(self, coords, radius, margin_x=0, margin_y=0, bucket_size=None):
+        self.coords = set(coords)
+        self.radius = radius
+        self.margin_x = margin_x
+        self.margin_y = margin_y
+        self.bucket_size = bucket_size or max(1.0, radius / 4)
+
+        # 参照表の範囲：盤面の外接矩形（余白は含めない）
+        max_col = max((c for c, _ in self.coords), default=0)
+        max_row = max((r for _, r in self.coords), default=0)
+        self.origin_x = margin_x - radius
+        self.origin_y = margin_y - radius
+        width = radius * 1.5 * max_col + radius * 2
+        height = radius * math.sqrt(3) * (max_row + 1.5) + radius
+        self.grid_cols = int(math.ceil(width / self.bucket_size))
+        self.grid_rows = int(math.ceil(height / self.bucket_size))
+
+        self.grid = self._build_grid()
+
+    def _resolve(self, x, y):
+        """cube 座標の丸めによる厳密判定（盤面外は None）"""
+        coord = pixel_to_cell_coord(x, y, self.radius, self.margin_x, self.margin_y)
+        return coord if coord in self.coords else None
+
+    def _build_grid(self):
+        """バケットごとの判定結果（マス座標 / None / AMBIGUOUS）を並べた参照表"""
+        size = self.bucket_size
+
+        # 格子点（バケットの四隅）のマスを先に求めて共有する（盤面外のマスも区別して保持）
+        corners = [
+            [pixel_to_cell_coord(self.origin_x + gx * size, self.origin_y + gy * size,
+                                 self.radius, self.margin_x, self.margin_y)
+             for gx in range(self.grid_cols + 1)]
+            for gy in range(self.grid_rows + 1)
+        ]
+
+        grid = []
+        for gy in range(self.grid_rows):
+            top, bottom = corners[gy], corners[gy + 1]
+            for gx in range(self.grid_cols):
+                c = top[gx]
+                if c == top[gx + 1] == bottom[gx] == bottom[gx + 1]:
+                    grid.append(c if c in self.coords else None)
+                else:
+                    grid.append(HexHitTester.AMBIGUOUS)
+        return grid
+
+    def pixel_to_coord(self, x, y):
+        """
+        ピクセル座標 (x, y) に対応するマス座標 (col, row) を返す（盤面外は None）
+        """
+        gx = int((x - self.origin_x) // self.bucket_size)
+        gy = int((y - self.origin_y) // self.bucket_size)
+        if 0 <= gx < self.grid_cols and 0 <= gy < self.grid_rows:
+            hit = self.grid[gy * self.grid_cols + gx]
+            if hit != HexHitTester.AMBIGUOUS:
+                return hit
+            return self._resolve(x, y)
+        return None  # 参照表の外側は盤面外
@@ -0,0 +1,173 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class RollingHistogram:
+    """
+    直近 window 件の計測値（ミリ秒）を保持するローリングヒストグラム。
+    - 古い値は自動的に捨てるため、メモリ使用量は一定
+    """
+
+    BUCKET_EDGES_MS = (1, 2, 5, 10, 16, 33, 50, 100, 250, 500, 1000)
+
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.total_count = 0  # 破棄分も含めた通算件数
+
+    def add(self, value):
+        self.samples.append(value)
+        self.total_count += 1
+
+    def percentile(self, p):
+        """直近サンプルの p パーセンタイル（0〜100）"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def buckets(self):
+        """BUCKET_EDGES_MS 区切りの度数分布 {"<=1ms": n, ..., ">1000ms": n}"""
+        counts = {f"<={edge}ms": 0 for edge in RollingHistogram.BUCKET_EDGES_MS}
+        overflow = 0
+        for value in self.samples:
+            for edge in RollingHistogram.BUCKET_EDGES_MS:
+                if value <= edge:
+                    counts[f"<={edge}ms"] += 1
+                    break
+            else:
+                overflow += 1
+        counts[f">{RollingHistogram.BUCKET_EDGES_MS[-1]}ms"] = overflow
+        return counts
+
+    def summary(self):
+        """件数・平均・p50・p95・最大値"""
+        n = len(self.samples)
+        return {
+            "count": self.total_count,
+            "mean": sum(self.samples) / n if n else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self.samples) if n else 0.0,
+        }
+
+
+class PerfMonitor:
+    """
+    描画・入力処理・ヒント判定の所要時間を計測する軽量インストルメンテーション。
+
+    - 環境変数 CRYPTID_PERF=1 または main.py の --perf で有効化（無効時はほぼコストなし）
+    - 計測値は項目ごとのローリングヒストグラムに蓄積
+    - キャンバスアイテム数などの瞬間値はゲージとして保持
+    - 入力（クリック）から描画完了までの遅延も計測できる
+    - report_lines() でオーバーレイ表示用の文字列、dump() でファイル出力
+    """
+
+    ENV_VAR = "CRYPTID_PERF"
+
+    def __init__(self, enabled=False, window=500):
+        self.enabled = enabled
+        self.window = window
+        self.histograms = {}   # 項目名 → RollingHistogram
+        self.gauges = {}       # 項目名 → 最新値
+        self._input_started = None
+
+    @classmethod
+    def from_env(cls, force=False, window=500):
+        """環境変数（または force=True）から有効／無効を決めて生成"""
+        value = os.environ.get(cls.ENV_VAR, "").strip().lower()
+        return cls(enabled=force or value in ("1", "true", "yes", "on"), window=window)
+
+    # ------------------------------------------------------------
+    # 計測
+    # ------------------------------------------------------------
+
+    def record(self, name, elapsed_ms):
+        """計測値（ミリ秒）を記録"""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram(self.window)
+        histogram.add(elapsed_ms)
+
+    @contextmanager
+    def timed(self, name):
+        """with ブロックの所要時間を記録"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def instrument(self, obj, method_name, name=None):
+        """
+        インスタンス（またはクラス）のメソッドを計測付きのものに差し替える（無効時は何もしない）
+        """
+        if not self.enabled:
+            return
+        original = getattr(obj, method_name)
+        metric = name or method_name
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(metric, (time.perf_counter() - start) * 1000)
+
+        setattr(obj, method_name, wrapper)
+
+    def set_gauge(self, name, value):
+        """瞬間値（キャンバスアイテム数など）を記録"""
+        if self.enabled:
+            self.gauges[name] = value
+
+    def mark_input(self):
+        """入力イベントの受付時刻を記録（input_to_paint の起点）"""
+        if self.enabled:
+            self._input_started = time.perf_counter()
+
+    def mark_painted(self):
+        """描画完了時に呼ぶ：直前の入力からの遅延を input_to_paint として記録"""
+        if self.enabled and self._input_started is not None:
+            self.record("input_to_paint", (time.perf_counter() - self._input_started) * 1000)
+            self._input_started = None
+
+    # ------------------------------------------------------------
+    # 出力
+    # ------------------------------------------------------------
+
+    def report_lines(self):
+        """オーバーレイ表示用の要約行"""
+        lines = []
+        for name in sorted(self.histograms):
+            s = self.histograms[name].summary()
+            lines.append(f"{name}: p50 {s['p50']:.1f} / p95 {s['p95']:.1f} / "
+                         f"max {s['max']:.1f} ms (n={s['count']})")
+        for name in sorted(self.gauges):
+            lines.append(f"{name}: {self.gauges[name]}")
+        return lines
+
+    def snapshot(self):
+        """全計測値の要約と度数分布"""
+        return {
+            "timestamp": time.time(),
+            "histograms": {
+                name: dict(h.summary(), buckets=h.buckets())
+                for name, h in self.histograms.items()
+            },
+            "gauges": dict(self.gauges),
+        }
+
+    def dump(self, path):
+        """計測結果を JSON ファイルに書き出す"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        print(f"[Perf] 計測結果を出力しました: {path}")
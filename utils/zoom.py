@@ -0,0 +1,26 @@
+"""
+盤面ズームの段階定義。表示側（BoardViewport）と地形画像のビルド（trim_hex_image.py）で共有する。
+
+ズームは ZOOM_STEP 倍ずつの段階式で、半径は整数に丸める。同じ段階なら常に同じ半径・画像横幅になるため、
+縮尺済みの地形画像（実行時のキャッシュ・ビルド済みファイル）をそのまま使い回せる。
+"""
+
+ZOOM_STEP = 1.25
+MIN_ZOOM_LEVEL = -3
+MAX_ZOOM_LEVEL = 6
+MIN_RADIUS = 12
+
+
+def clamp_zoom_level(level):
+    """ズーム段階を MIN_ZOOM_LEVEL〜MAX_ZOOM_LEVEL に収める"""
+    return min(MAX_ZOOM_LEVEL, max(MIN_ZOOM_LEVEL, level))
+
+
+def zoomed_radius(base_radius, level):
+    """基準の半径 base_radius をズーム段階 level で拡大縮小した半径（整数、MIN_RADIUS 以上）"""
+    return max(MIN_RADIUS, int(round(base_radius * ZOOM_STEP ** level)))
+
+
+def terrain_width(radius):
+    """半径 radius のマスに貼る地形画像の横幅（2×半径）"""
+    return max(1, int(round(radius * 2)))